@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+
+#--------------------------------------------------------------------------------
+# Benchmark incoming OSC dispatch: monome's compiled OSCDispatcher against
+# python-osc's Dispatcher. No monome device or serialosc server is required.
+#
+# Two measurements are made for each dispatcher:
+#  - decode: calling the dispatcher directly on prebuilt datagrams
+#  - flood: a local UDP packet flood received through the shared OSCTransport
+#--------------------------------------------------------------------------------
+
+from monome.dispatch import OSCDispatcher
+from monome.transport import OSCTransport
+from pythonosc.dispatcher import Dispatcher
+from pythonosc.osc_message_builder import OscMessageBuilder
+import socket
+import time
+
+PACKET_COUNT = 200000
+
+
+def build_packets(count: int) -> list[bytes]:
+    messages = [
+        ("/monome/grid/key", [3, 4, 1]),
+        ("/monome/grid/key", [3, 4, 0]),
+        ("/monome/enc/delta", [1, -2]),
+        ("/monome/enc/key", [0, 1]),
+    ]
+    datagrams = []
+    for address, args in messages:
+        builder = OscMessageBuilder(address=address)
+        for arg in args:
+            builder.add_arg(arg)
+        datagrams.append(builder.build().dgram)
+    return [datagrams[index % len(datagrams)] for index in range(count)]
+
+
+def create_dispatcher(dispatcher_class: type, counter: list):
+    def handler(address, *args):
+        counter[0] += 1
+
+    dispatcher = dispatcher_class()
+    for address in ["/monome/grid/key", "/monome/enc/delta", "/monome/enc/key"]:
+        dispatcher.map(address, handler)
+    return dispatcher
+
+
+def benchmark_decode(dispatcher_class: type, packets: list[bytes]) -> float:
+    counter = [0]
+    dispatcher = create_dispatcher(dispatcher_class, counter)
+    client_address = ("127.0.0.1", 0)
+    t0 = time.perf_counter()
+    for packet in packets:
+        dispatcher.call_handlers_for_packet(packet, client_address)
+    duration = time.perf_counter() - t0
+    assert counter[0] == len(packets)
+    return len(packets) / duration
+
+
+def benchmark_flood(dispatcher_class: type, packets: list[bytes]) -> tuple[float, int]:
+    counter = [0]
+    dispatcher = create_dispatcher(dispatcher_class, counter)
+    transport = OSCTransport()
+    sender = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+    sender.bind(("127.0.0.1", 0))
+    transport.add_endpoint(dispatcher, port=sender.getsockname()[1])
+
+    t0 = time.perf_counter()
+    for packet in packets:
+        sender.sendto(packet, ("127.0.0.1", transport.port))
+    # Wait until the receive thread has drained the socket
+    count_previous = -1
+    while counter[0] != count_previous:
+        count_previous = counter[0]
+        time.sleep(0.05)
+    duration = time.perf_counter() - t0 - 0.05
+
+    transport.remove_endpoint(dispatcher)
+    sender.close()
+    return counter[0] / duration, len(packets) - counter[0]
+
+
+if __name__ == "__main__":
+    packets = build_packets(PACKET_COUNT)
+
+    for name, dispatcher_class in [("python-osc Dispatcher", Dispatcher), ("monome OSCDispatcher", OSCDispatcher)]:
+        decode_rate = benchmark_decode(dispatcher_class, packets)
+        flood_rate, dropped = benchmark_flood(dispatcher_class, packets)
+        print("%-24s decode: %9.0f msg/s   flood: %9.0f msg/s (%d dropped)" % (name, decode_rate, flood_rate, dropped))
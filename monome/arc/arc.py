@@ -6,6 +6,10 @@ import math
 from typing import Callable
 
 from ..device import MonomeDevice
+from ..utils import as_level_array
+from ..recording import EVENT_TYPE_ENC_DELTA, EVENT_TYPE_ENC_KEY
+from ..batching import BatchHandler, DEFAULT_MAX_BATCH, DEFAULT_MAX_LATENCY_MS
+from ..batching import ENC_DELTA_BATCH_DTYPE, ENC_KEY_BATCH_DTYPE
 from .event import ArcRotationEvent, ArcKeyEvent
 
 logger = logging.getLogger(__name__)
@@ -29,6 +33,7 @@ class Arc (MonomeDevice):
                          prefix=prefix)
         self.ring_count = ring_count
         self.led_count = led_count
+        self.frame = np.zeros((ring_count, led_count), dtype=np.uint8)
         self.key_handlers: list[Callable] = []
 
         #--------------------------------------------------------------------------------
@@ -51,11 +56,13 @@ class Arc (MonomeDevice):
             level (int): The level to set. Must be between 0 and 15.
         """
         self._validate(ring, led, level)
-        self.client.send_message(f"/{self.prefix}/ring/set", [ring, led, level])
+        self.frame[ring, led] = level
+        self._send_led_update(f"/{self.prefix}/ring/set", [ring, led, self._output_level(level)], (led, ring, 1, 1))
 
     def ring_range(self, ring: int, x1: int, x2: int, level: int):
         """
         Set a range of LEDs to the specified brightness level.
+        As in serialosc, the range is inclusive, and wraps around the end of the ring if x2 < x1.
 
         Args:
             ring (int): The index of the ring. Must be less than `ring_count`.
@@ -65,7 +72,9 @@ class Arc (MonomeDevice):
         """
         for led in range(x1, x2):
             self._validate(ring, led, level)
-        self.client.send_message(f"/{self.prefix}/ring/range", [ring, x1, x2, level])
+        self.frame[ring, np.arange(x1, x1 + (x2 - x1) % self.led_count + 1) % self.led_count] = level
+        self._send_led_update(f"/{self.prefix}/ring/range", [ring, x1, x2, self._output_level(level)],
+                              (0, ring, self.led_count, 1))
 
     def ring_all(self, ring: int, level: int) -> None:
         """
@@ -76,7 +85,9 @@ class Arc (MonomeDevice):
             level (int): The level to set. Must be between 0 and 15.
         """
         self._validate(ring, None, level)
-        self.client.send_message(f"/{self.prefix}/ring/all", [ring, level])
+        self.frame[ring] = level
+        self._send_led_update(f"/{self.prefix}/ring/all", [ring, self._output_level(level)],
+                              (0, ring, self.led_count, 1), replaces=True)
 
     def ring_map(self, ring: int, levels: list[int]):
         """
@@ -85,18 +96,42 @@ class Arc (MonomeDevice):
         Args:
             ring (int): The index of the ring. Must be less than `ring_count`.
             levels (int): The list of levels to set. Must be the same length as `led_count`.
+                          May be a list, or any object supporting the buffer protocol (such as
+                          bytes, array('B') or a uint8 ndarray), which is encoded without copying.
         """
-
+        levels = as_level_array(levels)
         if len(levels) != self.led_count:
             raise ValueError("The number of levels specified must be equal to the ring's led_count (%d != %d)" % (len(levels), self.led_count))
-        for level in levels:
-            self._validate(ring, None, level)
+        self._validate(ring, None, 0)
+        if levels.min(initial=0) < 0 or levels.max(initial=0) > 15:
+            raise ValueError("Invalid brightness level. Must be between 0 and 15")
 
-        # Cast numpy array to a Python list
-        if isinstance(levels, np.ndarray):
-            levels = levels.tolist()
+        self.frame[ring] = levels
+        self._send_led_levels(f"/{self.prefix}/ring/map", [ring], self._output_levels(levels),
+                              (0, ring, self.led_count, 1), replaces=True)
 
-        self.client.send_message(f"/{self.prefix}/ring/map", [ring, *levels])
+    def ring_frame(self, frame: np.ndarray, force: bool = False):
+        """
+        Set the LED values of all rings, sending only the rings that differ from the current frame.
+
+        Args:
+            frame (np.ndarray): An array of levels, of shape (ring_count, led_count).
+            force (bool, optional): If True, send every ring regardless of whether it has changed. Defaults to False.
+        """
+        frame = np.asarray(frame, dtype=np.uint8)
+        if frame.shape != self.frame.shape:
+            raise ValueError("ring_frame: frame must have shape %s" % (self.frame.shape,))
+        if force:
+            rings = range(self.ring_count)
+        else:
+            rings = np.flatnonzero(np.any(frame != self.frame, axis=1))
+        for ring in rings:
+            self.ring_map(int(ring), frame[ring])
+
+    def _send_frame_changes(self, frame_previous: np.ndarray):
+        for ring in np.flatnonzero(np.any(self.frame != frame_previous, axis=1)):
+            self._send_levels(f"/{self.prefix}/ring/map", [int(ring)], self._output_levels(self.frame[ring]),
+                              (0, int(ring), self.led_count, 1), replaces=True)
 
     #--------------------------------------------------------------------------------
     # Validation
@@ -152,6 +187,35 @@ class Arc (MonomeDevice):
         """
         self.add_key_handler(handler)
 
+    def add_batch_handler(self,
+                          handler: Callable[[np.ndarray], None],
+                          max_batch: int = DEFAULT_MAX_BATCH,
+                          max_latency_ms: float = DEFAULT_MAX_LATENCY_MS) -> BatchHandler:
+        """
+        Add a handler to receive ring rotation events in batches, as a structured array of
+        ENC_DELTA_BATCH_DTYPE records, with fields timestamp, ring and delta.
+
+        Args:
+            handler (Callable): A function that is called with each batch.
+            max_batch (int, optional): The maximum number of events per batch. Defaults to 256.
+            max_latency_ms (float, optional): The maximum time that an event is held before its
+                                              batch is delivered, in milliseconds. Defaults to 5.
+
+        Returns:
+            BatchHandler: The batcher, which can be flushed manually.
+        """
+        return self._add_batch_handler(EVENT_TYPE_ENC_DELTA, handler, ENC_DELTA_BATCH_DTYPE, max_batch, max_latency_ms)
+
+    def add_key_batch_handler(self,
+                              handler: Callable[[np.ndarray], None],
+                              max_batch: int = DEFAULT_MAX_BATCH,
+                              max_latency_ms: float = DEFAULT_MAX_LATENCY_MS) -> BatchHandler:
+        """
+        As add_batch_handler(), for keypress events, as ENC_KEY_BATCH_DTYPE records
+        with fields timestamp, key and down.
+        """
+        return self._add_batch_handler(EVENT_TYPE_ENC_KEY, handler, ENC_KEY_BATCH_DTYPE, max_batch, max_latency_ms)
+
     def _osc_handle_enc_delta(self, address: str, ring: int, delta: int):
         logger.debug("Ring encoder delta event received: ring %d, delta %d" % (ring, delta))
         event = ArcRotationEvent(ring, delta)
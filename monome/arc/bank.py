@@ -0,0 +1,250 @@
+from __future__ import annotations
+
+import logging
+import numpy as np
+
+from ..snapshot import SnapshotBuffer
+
+from typing import Callable, Optional, TYPE_CHECKING
+if TYPE_CHECKING:
+    from .ui import ArcUI
+
+logger = logging.getLogger(__name__)
+
+PARAMETER_MODES = ["unipolar", "bipolar"]
+PARAMETER_CURVES = ["linear", "exponential"]
+
+
+class ArcParameterBank:
+    def __init__(self,
+                 arc: ArcUI,
+                 index: int = 0,
+                 bank_count: int = 1,
+                 mode: str = "unipolar",
+                 range_min: float = 0.0,
+                 range_max: float = 1.0,
+                 curve: str = "linear"):
+        """
+        A page of parameters arranged in banks of one parameter per ring.
+
+        Rather than creating ArcRing objects for each parameter, the normalised values of all
+        parameters are stored in one array of shape (bank_count, ring_count), alongside arrays
+        of per-parameter mode, range and curve metadata. Switching bank only changes
+        `current_bank`, and the rings of a bank are rendered in one vectorised operation.
+
+        Values are normalised between 0 and 1. A full rotation of a ring spans the whole range.
+        Unipolar parameters are displayed clockwise from the bottom of the ring; bipolar
+        parameters are displayed from the top of the ring, with 0.5 at the centre.
+
+        Args:
+            arc (ArcUI): The ArcUI.
+            index (int, optional): The page index. Defaults to 0.
+            bank_count (int, optional): The number of banks. Defaults to 1.
+            mode (str, optional): The initial mode of every parameter. Defaults to "unipolar".
+            range_min (float, optional): The initial minimum of every parameter. Defaults to 0.
+            range_max (float, optional): The initial maximum of every parameter. Defaults to 1.
+            curve (str, optional): The initial curve of every parameter. Defaults to "linear".
+
+        Raises:
+            ValueError: If the curve is exponential, and the range includes or spans 0.
+        """
+        self._validate_range(range_min, range_max, curve)
+        self.arc = arc
+        self.index = index
+        shape = (bank_count, arc.ring_count)
+
+        self.values = np.zeros(shape)
+        self.modes = np.full(shape, PARAMETER_MODES.index(mode), dtype=np.uint8)
+        self.range_min = np.full(shape, range_min, dtype=float)
+        self.range_max = np.full(shape, range_max, dtype=float)
+        self.curves = np.full(shape, PARAMETER_CURVES.index(curve), dtype=np.uint8)
+        self.values[self.modes == PARAMETER_MODES.index("bipolar")] = 0.5
+        self._snapshot = SnapshotBuffer(self.values)
+
+        self.current_bank = 0
+        self.sensitivity = 1.0
+        self.handlers: list[Callable] = []
+
+        self.led_intensity_fill = 4
+        self.led_intensity_cursor = 15
+
+    @property
+    def bank_count(self) -> int:
+        return self.values.shape[0]
+
+    @property
+    def ring_count(self) -> int:
+        return self.arc.ring_count
+
+    @property
+    def led_count(self) -> int:
+        return self.arc.led_count
+
+    @property
+    def is_current(self) -> bool:
+        return len(self.arc.pages) > 0 and self.arc.current_page is self
+
+    def add_handler(self, callback: Callable):
+        self.handlers.append(callback)
+
+    # Synonym to enable @bank.handler decorator
+    handler = add_handler
+
+    def set_parameter(self,
+                      bank: int,
+                      ring: int,
+                      mode: Optional[str] = None,
+                      range_min: Optional[float] = None,
+                      range_max: Optional[float] = None,
+                      curve: Optional[str] = None):
+        """
+        Set the metadata of a single parameter.
+
+        Args:
+            bank (int): The bank index.
+            ring (int): The ring index.
+            mode (str, optional): Either "unipolar" or "bipolar".
+            range_min (float, optional): The value at the start of the range.
+            range_max (float, optional): The value at the end of the range.
+            curve (str, optional): Either "linear" or "exponential".
+
+        Raises:
+            ValueError: If the curve is exponential, and the range includes or spans 0.
+        """
+        self._validate_range(self.range_min[bank, ring] if range_min is None else range_min,
+                             self.range_max[bank, ring] if range_max is None else range_max,
+                             PARAMETER_CURVES[self.curves[bank, ring]] if curve is None else curve)
+        if mode is not None:
+            self.modes[bank, ring] = PARAMETER_MODES.index(mode)
+        if range_min is not None:
+            self.range_min[bank, ring] = range_min
+        if range_max is not None:
+            self.range_max[bank, ring] = range_max
+        if curve is not None:
+            self.curves[bank, ring] = PARAMETER_CURVES.index(curve)
+        if bank == self.current_bank and self.is_current:
+            self.draw()
+
+    @staticmethod
+    def _validate_range(range_min: float, range_max: float, curve: str):
+        if curve not in PARAMETER_CURVES:
+            raise ValueError("Invalid curve: %s" % curve)
+        if curve == "exponential" and (range_min == 0 or range_max == 0 or (range_min < 0) != (range_max < 0)):
+            raise ValueError("An exponential range must be non-zero, and not span 0 (%s, %s)" % (range_min, range_max))
+
+    def set_current_bank(self, bank: int):
+        if bank not in range(self.bank_count):
+            raise ValueError("Invalid bank index: %d" % bank)
+        self.current_bank = bank
+        if self.is_current:
+            self.draw()
+
+    def scaled_values(self) -> np.ndarray:
+        """
+        Returns the values of all parameters, scaled to their ranges and curves.
+        """
+        exponential = self.curves == PARAMETER_CURVES.index("exponential")
+        with np.errstate(divide="ignore", invalid="ignore"):
+            return np.where(exponential,
+                            self.range_min * (self.range_max / self.range_min) ** self.values,
+                            self.range_min + self.values * (self.range_max - self.range_min))
+
+    def get_value(self, bank: int, ring: int) -> float:
+        return float(self.scaled_values()[bank, ring])
+
+    def set_value(self, bank: int, ring: int, value: float):
+        """
+        Set a parameter from a value within its range.
+        """
+        range_min, range_max = self.range_min[bank, ring], self.range_max[bank, ring]
+        if self.curves[bank, ring] == PARAMETER_CURVES.index("exponential"):
+            # Clip to the range first, as the log of a value of the other sign is undefined
+            value = np.clip(value, min(range_min, range_max), max(range_min, range_max))
+            value_norm = np.log(value / range_min) / np.log(range_max / range_min)
+        else:
+            value_norm = (value - range_min) / (range_max - range_min)
+        self.values[bank, ring] = np.clip(value_norm, 0, 1)
+        self._snapshot.publish(self.values)
+        if bank == self.current_bank and self.is_current:
+            self.draw()
+
+    def snapshot(self) -> np.ndarray:
+        """
+        Returns the normalised values of all parameters as an immutable array, safe to
+        read from any thread.
+        """
+        return self._snapshot.snapshot()
+
+    def render(self, bank: Optional[int] = None) -> np.ndarray:
+        """
+        Returns the LED levels of all rings for a bank, as an array of shape (ring_count, led_count).
+
+        Args:
+            bank (int, optional): The bank index. Defaults to the current bank.
+        """
+        if bank is None:
+            bank = self.current_bank
+        led_count = self.led_count
+        values = self.values[bank][:, None]
+        bipolar = (self.modes[bank] == PARAMETER_MODES.index("bipolar"))[:, None]
+        leds = np.arange(led_count)
+
+        # Unipolar: phase from 0 at the bottom of the ring, increasing clockwise
+        phase = ((leds - led_count // 2) % led_count + 0.5) / led_count
+        cursor_unipolar = (np.minimum(values * led_count, led_count - 1).astype(int) + led_count // 2) % led_count
+
+        # Bipolar: signed offset from 0.5 at the top of the ring
+        offset = (((leds + led_count // 2) % led_count) - led_count // 2 + 0.5) / led_count
+        value_offset = values - 0.5
+        lit_bipolar = (offset >= np.minimum(value_offset, 0)) & (offset <= np.maximum(value_offset, 0))
+        cursor_bipolar = np.round(value_offset * led_count).astype(int) % led_count
+
+        lit = np.where(bipolar, lit_bipolar, phase <= values)
+        cursor = np.where(bipolar, cursor_bipolar, cursor_unipolar)
+        frame = np.where(lit, self.led_intensity_fill, 0).astype(np.uint8)
+        frame[np.arange(self.ring_count), cursor[:, 0]] = self.led_intensity_cursor
+        return frame
+
+    def _handle_enc_delta(self, ring: int, delta: int):
+        from .event import ArcUIParameterEvent
+
+        logger.debug("Ring encoder delta: %d, %s" % (ring, delta))
+        bank = self.current_bank
+        self.values[bank, ring] = np.clip(self.values[bank, ring] + delta * self.sensitivity / self.led_count, 0, 1)
+        self._snapshot.publish(self.values)
+        self.draw()
+
+        value_norm = float(self.values[bank, ring])
+        event = ArcUIParameterEvent(self, bank, ring, self.get_value(bank, ring), value_norm)
+        for handler in self.handlers:
+            handler(event)
+
+    def _handle_enc_key(self, key: int, down: int):
+        logger.debug("Ring encoder key: %d, %d" % (key, down))
+
+    def draw(self):
+        self.arc.ring_frame(self.render())
+
+    def draw_ring(self, ring: int):
+        self.draw()
+
+
+if __name__ == "__main__":
+    from . import ui
+    import time
+
+    arcui = ui.ArcUI()
+    bank = arcui.add_parameter_bank(bank_count=64, range_min=20, range_max=20000, curve="exponential")
+
+    @bank.handler
+    def _(event):
+        print("Bank %d, ring %d: %f" % (event.bank, event.ring, event.value))
+
+    @arcui.key_handler
+    def _(event):
+        if event.down:
+            bank.set_current_bank((bank.current_bank + 1) % bank.bank_count)
+            print("Bank: %d" % bank.current_bank)
+
+    while True:
+        time.sleep(1)
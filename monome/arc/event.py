@@ -1,16 +1,20 @@
+from typing import Optional
+
 from ..event import MonomeEvent
 from .ring import ArcRing
 
 class ArcRotationEvent (MonomeEvent):
-    def __init__(self, ring: int, delta: int):
+    def __init__(self, ring: int, delta: int, time_ns: Optional[int] = None):
         """
         Event generated by a rotational movement on Arc.
 
         Args:
             ring (int): The ring number (0-3) on the Arc.
             delta (int) : The change in position.
+            time_ns (int, optional): The time the event was received, in time.perf_counter_ns() units.
+                                     Defaults to the receive time of the datagram being dispatched.
         """
-        super().__init__()
+        super().__init__(time_ns)
         self.ring = ring
         self.delta = delta
     
@@ -18,15 +22,17 @@ class ArcRotationEvent (MonomeEvent):
         return f"ArcRotationEvent(ring={self.ring}, delta={self.delta})"
 
 class ArcKeyEvent (MonomeEvent):
-    def __init__(self, button: int, down: bool):
+    def __init__(self, button: int, down: bool, time_ns: Optional[int] = None):
         """
         Event generated by a rotational movement on Arc.
 
         Args:
             button (int): The button index on the Arc (currently always 0)
             down (bool): Whether the button is pressed down (True) or released (False).
+            time_ns (int, optional): The time the event was received, in time.perf_counter_ns() units.
+                                     Defaults to the receive time of the datagram being dispatched.
         """
-        super().__init__()
+        super().__init__(time_ns)
         self.button = button
         self.down = down
     
@@ -49,4 +55,26 @@ class ArcUIRotationEvent (MonomeEvent):
         self.delta = delta
     
     def __repr__(self):
-        return f"ArcUIRotationEvent(ring={self.ring}, position={self.position}, delta={self.delta})"
\ No newline at end of file
+        return f"ArcUIRotationEvent(ring={self.ring}, position={self.position}, delta={self.delta})"
+
+class ArcUIParameterEvent (MonomeEvent):
+    def __init__(self, page, bank: int, ring: int, value: float, value_normalised: float):
+        """
+        Event generated when a ring changes the value of a parameter in an ArcParameterBank.
+
+        Args:
+            page (ArcParameterBank): The parameter bank.
+            bank (int): The index of the bank containing the parameter.
+            ring (int): The ring index of the parameter within the bank.
+            value (float): The parameter's value, scaled to its range.
+            value_normalised (float): The parameter's value, between 0 and 1.
+        """
+        super().__init__()
+        self.page = page
+        self.bank = bank
+        self.ring = ring
+        self.value = value
+        self.value_normalised = value_normalised
+
+    def __repr__(self):
+        return f"ArcUIParameterEvent(bank={self.bank}, ring={self.ring}, value={self.value})"
\ No newline at end of file
@@ -0,0 +1,96 @@
+import numpy as np
+import logging
+
+logger = logging.getLogger(__name__)
+
+# The rotation speed, in encoder units per second, at which an acceleration of 1.0
+# doubles the response
+ACCELERATION_REFERENCE_VELOCITY = 1000.0
+
+# Below this speed, in encoder units per second, an inertial ring comes to rest
+INERTIA_REST_VELOCITY = 0.5
+
+
+class RingMotion:
+    def __init__(self,
+                 acceleration: float = 0.0,
+                 smoothing: float = 0.0,
+                 inertia: bool = False,
+                 friction: float = 4.0):
+        """
+        A motion model for an ArcRing, evaluated on the shared TickScheduler rather than
+        on every encoder packet.
+
+        Incoming deltas are only accumulated. On each tick, the accumulated delta is scaled
+        by an acceleration curve based on its velocity, added to a target position, and the
+        ring's value is moved towards the target with exponential smoothing. With inertia,
+        the ring keeps turning at its last velocity after input stops, decaying by `friction`.
+        The ring's handlers are called at most once per tick, with the resulting delta.
+
+        Args:
+            acceleration (float, optional): The amount by which fast turns are amplified.
+                                            0 disables acceleration. Defaults to 0.
+            smoothing (float, optional): The smoothing time constant, in seconds.
+                                         0 disables smoothing. Defaults to 0.
+            inertia (bool, optional): Whether the ring continues to turn after input stops. Defaults to False.
+            friction (float, optional): The exponential decay rate of inertial motion, per second. Defaults to 4.
+        """
+        self.acceleration = acceleration
+        self.smoothing = smoothing
+        self.inertia = inertia
+        self.friction = friction
+
+        # Written only by the receive thread
+        self.delta_received = 0.0
+        # Written only by the tick thread
+        self.delta_consumed = 0.0
+        self.target = 0.0
+        self.value = 0.0
+        self.velocity = 0.0
+
+    def add_delta(self, delta: float):
+        """
+        Accumulate an encoder delta. Called from the receive thread.
+        """
+        self.delta_received += delta
+
+    def stop(self):
+        """
+        Bring the ring to rest at its current value, for example when it reaches a limit.
+        """
+        self.target = self.value
+        self.velocity = 0.0
+
+    def tick(self, dt: float) -> float:
+        """
+        Advance the model by `dt` seconds.
+
+        Returns:
+            float: The change in the ring's value since the previous tick.
+        """
+        delta_received = self.delta_received
+        delta = delta_received - self.delta_consumed
+        self.delta_consumed = delta_received
+
+        if delta != 0.0:
+            if dt > 0:
+                input_velocity = delta / dt
+                delta = delta * (1.0 + self.acceleration * abs(input_velocity) / ACCELERATION_REFERENCE_VELOCITY)
+                self.velocity = delta / dt
+            self.target += delta
+        elif self.inertia and self.velocity != 0.0:
+            self.target += self.velocity * dt
+            self.velocity *= np.exp(-self.friction * dt)
+            if abs(self.velocity) < INERTIA_REST_VELOCITY:
+                self.velocity = 0.0
+        else:
+            self.velocity = 0.0
+
+        value_previous = self.value
+        if self.smoothing > 0 and dt > 0:
+            self.value += (self.target - self.value) * (1.0 - np.exp(-dt / self.smoothing))
+            if abs(self.target - self.value) < 1e-3:
+                self.value = self.target
+        else:
+            self.value = self.target
+        return float(self.value - value_previous)
@@ -1,6 +1,10 @@
 from __future__ import annotations
 
 import logging
+import numpy as np
+
+from ..snapshot import SnapshotBuffer
+from ..batching import BatchHandler, ARC_UI_ROTATION_BATCH_DTYPE, DEFAULT_MAX_BATCH, DEFAULT_MAX_LATENCY_MS
 
 from typing import Union, Callable, TYPE_CHECKING
 if TYPE_CHECKING:
@@ -24,19 +28,24 @@ class ArcPage:
         if len(modes) != self.arc.ring_count:
             raise ValueError(f"Modes must contain either 1 or {self.arc.ring_count} values")
 
+        ring_classes = []
         for mode in modes:
-            if mode not in self.arc.ring_classes.keys():
+            try:
+                ring_classes.append(self.arc.get_ring_class(mode))
+            except ValueError:
                 raise ValueError("Invalid ring mode: %s" % mode)
 
         self.modes = modes
         self.rings: list[ArcRing] = []
-        for index, mode in enumerate(self.modes):
-            ring = self.arc.ring_classes[mode](self, index)
+        for index, ring_class in enumerate(ring_classes):
+            ring = ring_class(self, index)
             self.rings.append(ring)
+        self._snapshot = SnapshotBuffer(np.zeros(len(self.rings)))
 
         self.sensitivity = 1.0
         self.normalise = False
         self.handlers: list[Callable] = []
+        self.batch_handlers: list[BatchHandler] = []
 
         self.led_intensity_fill = 4
         self.led_intensity_cursor = 15
@@ -49,6 +58,10 @@ class ArcPage:
     def led_count(self):
         return self.arc.led_count
 
+    @property
+    def is_current(self) -> bool:
+        return len(self.arc.pages) > 0 and self.arc.current_page is self
+
     def add_handler(self, callback: Callable):
         self.handlers.append(callback)
     
@@ -61,17 +74,88 @@ class ArcPage:
     # Synonym to enable @arcpage.handler decorator
     handler = add_handler
 
+    def add_batch_handler(self,
+                          handler: Callable[[np.ndarray], None],
+                          max_batch: int = DEFAULT_MAX_BATCH,
+                          max_latency_ms: float = DEFAULT_MAX_LATENCY_MS) -> BatchHandler:
+        """
+        Add a handler to receive ring movements in batches, as a structured array of
+        ARC_UI_ROTATION_BATCH_DTYPE records, with fields timestamp, ring, position and delta.
+        Positions and deltas are as passed to the page's handlers, after sensitivity
+        and normalisation have been applied.
+
+        Args:
+            handler (Callable): A function that is called with each batch.
+            max_batch (int, optional): The maximum number of events per batch. Defaults to 256.
+            max_latency_ms (float, optional): The maximum time that an event is held before its
+                                              batch is delivered, in milliseconds. Defaults to 5.
+
+        Returns:
+            BatchHandler: The batcher, which can be flushed manually.
+        """
+        batch_handler = BatchHandler(handler, ARC_UI_ROTATION_BATCH_DTYPE,
+                                     max_batch=max_batch, max_latency_ms=max_latency_ms)
+        self.batch_handlers.append(batch_handler)
+        return batch_handler
+
+    def remove_batch_handler(self, handler: Callable):
+        for batch_handler in self.batch_handlers:
+            if batch_handler.handler is handler:
+                self.batch_handlers.remove(batch_handler)
+                batch_handler.close()
+                return
+        raise ValueError("Handler not found in page batch handlers")
+
+    def add_tick_callback(self, callback: Callable[[float], None]):
+        """
+        Register a callback with the shared TickScheduler, to animate this page.
+        The callback is called with the time since the previous tick, while this page is current.
+        """
+        from ..scheduler import TickScheduler
+        TickScheduler().add_tick_callback(callback, self.arc, self)
+
+    def remove_tick_callback(self, callback: Callable[[float], None]):
+        from ..scheduler import TickScheduler
+        TickScheduler().remove_tick_callback(callback)
+
     def _handle_enc_delta(self, ring: int, delta: int):
         logger.debug("Ring encoder delta: %d, %s" % (ring, delta))
         delta = delta * self.sensitivity
 
-        self.rings[ring]._handle_enc_delta(delta)
+        motion = self.rings[ring].motion
+        if motion is not None:
+            motion.add_delta(delta)
+            return
 
+        self.rings[ring]._handle_enc_delta(delta)
         self.draw_ring(ring)
     
+    def set_motion(self, **kwargs):
+        """
+        Give every ring on the page its own RingMotion, constructed with the given arguments.
+        See RingMotion for the available arguments.
+        """
+        from .motion import RingMotion
+        for ring in self.rings:
+            ring.motion = RingMotion(**kwargs)
+
     def _handle_enc_key(self, key: int, down: int):
         logger.debug("Ring encoder key: %d, %d" % (key, down))
 
+    def snapshot(self) -> np.ndarray:
+        """
+        Returns the positions of all rings, in LEDs (regardless of `normalise`), as an
+        immutable array. This can be called from any thread without locking, and always
+        reflects a consistent state of all rings.
+        """
+        return self._snapshot.snapshot()
+
+    def _publish_snapshot(self):
+        # Positions are updated from the receive thread, the tick thread and user threads,
+        # so they are read and published under one lock, to publish them in order.
+        with self._snapshot.lock:
+            self._snapshot.publish([ring._position for ring in self.rings])
+
     def draw(self):
         for ring in range(self.ring_count):
             self.draw_ring(ring)
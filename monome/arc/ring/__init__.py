@@ -1,5 +1,19 @@
 from .base import ArcRing
-from .bipolar import ArcRingBipolar
-from .unipolar import ArcRingUnipolar
-from .angular import ArcRingAngular
-from .reel import ArcRingReel
\ No newline at end of file
+
+#--------------------------------------------------------------------------------
+# Ring classes are imported on first access, so that importing the package does
+# not import every ring type.
+#--------------------------------------------------------------------------------
+_lazy_classes = {
+    "ArcRingBipolar": ".bipolar",
+    "ArcRingUnipolar": ".unipolar",
+    "ArcRingAngular": ".angular",
+    "ArcRingReel": ".reel",
+}
+
+
+def __getattr__(name: str):
+    if name in _lazy_classes:
+        from importlib import import_module
+        return getattr(import_module(_lazy_classes[name], __name__), name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -1,4 +1,10 @@
+import time
+
 from ..page import ArcPage
+from ..motion import RingMotion
+from ...event import get_receive_time
+
+from typing import Optional
 
 class ArcRing:
     def __init__(self, page: ArcPage, index: int):
@@ -6,15 +12,26 @@ class ArcRing:
         self.index = index
         self.arc = self.page.arc
         self._position = 0
+        self._motion: Optional[RingMotion] = None
 
     def _call_handlers(self, position: float, delta: float):
         from ..event import ArcUIRotationEvent
+
+        # Publish the updated position first, so that handlers see it in the snapshot
+        self.page._publish_snapshot()
         for handler in self.handlers + self.page.handlers:
             if self.normalise:
                 event = ArcUIRotationEvent(self, position / self.led_count, delta / self.led_count)
             else:
                 event = ArcUIRotationEvent(self, position, delta)
             handler(event)
+        batch_handlers = self.page.batch_handlers
+        if batch_handlers:
+            timestamp = get_receive_time() or time.perf_counter_ns()
+            if self.normalise:
+                position, delta = position / self.led_count, delta / self.led_count
+            for batch_handler in batch_handlers:
+                batch_handler.append(timestamp, self.index, position, delta)
 
     def get_position(self):
         if self.normalise:
@@ -27,9 +44,39 @@ class ArcRing:
             self._position = int(position * self.led_count)
         else:
             self._position = int(position)
+        self.page._publish_snapshot()
     
     position = property(get_position, set_position)
 
+    def get_motion(self) -> Optional[RingMotion]:
+        return self._motion
+
+    def set_motion(self, motion: Optional[RingMotion]):
+        """
+        Set a motion model for the ring. While a motion model is set, encoder deltas are
+        accumulated and applied on each tick of the shared TickScheduler.
+
+        Args:
+            motion (RingMotion): The motion model, or None to apply deltas immediately.
+        """
+        motion_previous = self._motion
+        self._motion = motion
+        if motion is not None and motion_previous is None:
+            self.page.add_tick_callback(self._tick_motion)
+        elif motion is None and motion_previous is not None:
+            self.page.remove_tick_callback(self._tick_motion)
+
+    motion = property(get_motion, set_motion)
+
+    def _tick_motion(self, dt: float):
+        motion = self._motion
+        if motion is None:
+            return
+        delta = motion.tick(dt)
+        if delta != 0.0:
+            self._handle_enc_delta(delta)
+            self.draw()
+
     @property
     def ring_count(self):
         return self.arc.ring_count
@@ -5,6 +5,28 @@ from ...utils import round_to_integer
 class ArcRingReel (ArcRing):
     def __init__(self, page: ArcPage, index: int):
         super().__init__(page, index)
+        self._speed = 0.0
+
+    def get_speed(self):
+        return self._speed
+
+    def set_speed(self, speed: float):
+        """
+        Set the speed at which the reel turns by itself, in LEDs per second.
+        A non-zero speed registers the reel with the shared TickScheduler.
+        """
+        if speed and not self._speed:
+            self.page.add_tick_callback(self.tick)
+        elif self._speed and not speed:
+            self.page.remove_tick_callback(self.tick)
+        self._speed = speed
+
+    speed = property(get_speed, set_speed)
+
+    def tick(self, dt: float):
+        self._position = (self._position + self._speed * dt) % self.led_count
+        self.page._publish_snapshot()
+        self.draw()
 
     def draw(self):
         if self.arc.current_page != self.page:
@@ -24,9 +24,9 @@ class ArcRingUnipolar (ArcRing):
 
     def _handle_enc_delta(self, delta: float):
         self._position += delta
-        if self._position < 0:
-            self._position = 0
-        if self._position > self.led_count:
-            self._position = self.led_count
+        if self._position < 0 or self._position > self.led_count:
+            self._position = min(max(self._position, 0), self.led_count)
+            if self.motion is not None:
+                self.motion.stop()
         
         self._call_handlers(self._position, delta)
\ No newline at end of file
@@ -2,7 +2,10 @@ import logging
 
 from typing import Union, Optional, Callable
 from .page import ArcPage
+from .bank import ArcParameterBank
 from .arc import Arc
+from ..packing import PackedFrame
+from ..registry import arc_rings
 
 logger = logging.getLogger(__name__)
 
@@ -20,20 +23,26 @@ class ArcUI (Arc):
         #--------------------------------------------------------------------------------
         self.pages: list[ArcPage] = []
         self.current_page_index = -1
+        # The last frame shown by each page, keyed by page index, restored when switching back
+        self.page_frames: dict[int, PackedFrame] = {}
         self._sensitivity = sensitivity
         self._normalise = normalise
 
-        from .ring import ArcRingBipolar, ArcRingAngular, ArcRingUnipolar, ArcRingReel
-
+        # Ring classes registered for this ArcUI only, which take precedence over the
+        # global registry in monome.registry.arc_rings
         self.ring_classes = {}
-        self.register_ring_class("bipolar", ArcRingBipolar)
-        self.register_ring_class("unipolar", ArcRingUnipolar)
-        self.register_ring_class("angular", ArcRingAngular)
-        self.register_ring_class("reel", ArcRingReel)
 
     def register_ring_class(self, name: str, cls: type):
         self.ring_classes[name] = cls
 
+    def get_ring_class(self, mode: str) -> type:
+        """
+        Returns the ring class for a mode, importing it on first use.
+        """
+        if mode in self.ring_classes:
+            return self.ring_classes[mode]
+        return arc_rings.get(mode)
+
     def add_page(self,
                  modes: Union[str, list[str]] = "bipolar",
                  handler: Optional[Callable] = None) -> ArcPage:
@@ -50,6 +59,27 @@ class ArcUI (Arc):
             self.draw()
         return page
 
+    def add_parameter_bank(self,
+                           bank_count: int = 1,
+                           handler: Optional[Callable] = None,
+                           **kwargs) -> ArcParameterBank:
+        """
+        Add a page of parameters arranged in banks, with one parameter per ring in each bank.
+        See ArcParameterBank for the available arguments.
+        """
+        page = ArcParameterBank(arc=self,
+                                index=len(self.pages),
+                                bank_count=bank_count,
+                                **kwargs)
+        self.pages.append(page)
+        if handler:
+            page.add_handler(handler)
+        page.sensitivity = self.sensitivity
+        if len(self.pages) == 1:
+            self.current_page_index = 0
+            self.draw()
+        return page
+
     @property
     def current_page(self) -> ArcPage:
         return self.pages[self.current_page_index]
@@ -57,8 +87,19 @@ class ArcUI (Arc):
     def set_current_page(self, index: int):
         if not index in list(range(len(self.pages))):
             raise ValueError("Invalid page index: %d" % index)
+        if self.current_page_index >= 0:
+            self.page_frames[self.current_page_index] = PackedFrame.from_array(self.frame)
         self.current_page_index = index
-        self.draw()
+
+        #--------------------------------------------------------------------------------
+        # Restore the page's last frame and redraw it within a batch, so that only
+        # the LEDs that differ from the outgoing page are sent.
+        #--------------------------------------------------------------------------------
+        with self.batch():
+            page_frame = self.page_frames.get(index)
+            if page_frame is not None:
+                page_frame.to_array(out=self.frame)
+            self.draw()
     
     def get_sensitivity(self):
         return self._sensitivity
@@ -76,7 +117,9 @@ class ArcUI (Arc):
     def set_normalise(self, normalise: bool):
         self._normalise = normalise
         for page in self.pages:
-            page.normalise = normalise
+            # Parameter banks report both scaled and normalised values
+            if isinstance(page, ArcPage):
+                page.normalise = normalise
 
     normalise = property(get_normalise, set_normalise)
 
@@ -131,15 +174,8 @@ if __name__ == "__main__":
     def _(event):
         print("Angular handler: ring = %d, position = %f, delta = %f" % (event.ring.index, event.position, event.delta))
 
-    import threading, time
-    def runloop():
-        while True:
-            time.sleep(0.05)
-            for ring in arcui_reel.rings:
-                ring.position += 1
-                ring.draw()
-    thread = threading.Thread(target=runloop, daemon=True)
-    thread.start()
+    for ring in arcui_reel.rings:
+        ring.speed = 20
 
     while True:
         try:
@@ -0,0 +1,141 @@
+import numpy as np
+import threading
+import logging
+import time
+
+from typing import Callable
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_BATCH = 256
+DEFAULT_MAX_LATENCY_MS = 5.0
+
+#--------------------------------------------------------------------------------
+# Record layouts of the batches passed to batch handlers. Timestamps are the
+# receive times of the events, in time.perf_counter_ns() units.
+#--------------------------------------------------------------------------------
+GRID_KEY_BATCH_DTYPE = np.dtype([
+    ("timestamp", "<u8"),
+    ("x", "<i2"),
+    ("y", "<i2"),
+    ("down", "<i2"),
+])
+
+ENC_DELTA_BATCH_DTYPE = np.dtype([
+    ("timestamp", "<u8"),
+    ("ring", "<i2"),
+    ("delta", "<i2"),
+])
+
+ENC_KEY_BATCH_DTYPE = np.dtype([
+    ("timestamp", "<u8"),
+    ("key", "<i2"),
+    ("down", "<i2"),
+])
+
+ARC_UI_ROTATION_BATCH_DTYPE = np.dtype([
+    ("timestamp", "<u8"),
+    ("ring", "<i2"),
+    ("position", "<f8"),
+    ("delta", "<f8"),
+])
+
+
+class BatchHandler:
+    def __init__(self,
+                 handler: Callable[[np.ndarray], None],
+                 dtype: np.dtype,
+                 max_batch: int = DEFAULT_MAX_BATCH,
+                 max_latency_ms: float = DEFAULT_MAX_LATENCY_MS):
+        """
+        Accumulates events into a structured array, and passes them to `handler` in a single
+        call, so that handlers that process events in bulk avoid a Python call per event.
+
+        A batch is delivered when it reaches `max_batch` events, on the thread that added the
+        last event, or `max_latency_ms` after its first event, on the batcher's own thread.
+        Batches are delivered in order, one at a time.
+
+        Args:
+            handler (Callable): Called with a structured array of `dtype`, of up to `max_batch` events.
+            dtype (np.dtype): The record layout, whose first field is the timestamp.
+            max_batch (int, optional): The maximum number of events per batch. Defaults to 256.
+            max_latency_ms (float, optional): The maximum time that an event is held before its
+                                              batch is delivered, in milliseconds. Defaults to 5.
+        """
+        self.handler = handler
+        self.max_batch = max_batch
+        self.max_latency_ns = int(max_latency_ms * 1e6)
+        self.buffer = np.zeros(max_batch, dtype=dtype)
+        self.count = 0
+        self.first_time_ns = 0
+        self.pending: list[np.ndarray] = []
+        self.condition = threading.Condition()
+        self.delivery_lock = threading.Lock()
+        self.running = True
+        self.thread = threading.Thread(target=self._run, daemon=True)
+        self.thread.start()
+
+    def append(self, *values):
+        """
+        Add an event, as a tuple of values for each field of the record layout.
+        """
+        with self.condition:
+            if self.count == 0:
+                self.first_time_ns = time.perf_counter_ns()
+                self.condition.notify()
+            self.buffer[self.count] = values
+            self.count += 1
+            if self.count < self.max_batch:
+                return
+            # Swap in a new buffer while holding the lock, so that events added by other
+            # threads before the batch is delivered start a new batch.
+            self.pending.append(self.buffer)
+            self.buffer = np.zeros_like(self.buffer)
+            self.count = 0
+        self.flush()
+
+    def flush(self):
+        """
+        Deliver any pending events now.
+        """
+        with self.delivery_lock:
+            with self.condition:
+                if self.count > 0:
+                    self.pending.append(self.buffer[:self.count].copy())
+                    self.count = 0
+                batches = self.pending
+                self.pending = []
+            for batch in batches:
+                try:
+                    self.handler(batch)
+                except Exception:
+                    logger.exception("BatchHandler: Exception in handler")
+
+    def close(self, flush: bool = True):
+        """
+        Stop the batcher's thread.
+
+        Args:
+            flush (bool, optional): If True, deliver any pending events first. Defaults to True.
+        """
+        with self.condition:
+            self.running = False
+            self.condition.notify()
+        self.thread.join()
+        if flush:
+            self.flush()
+
+    def _run(self):
+        while True:
+            with self.condition:
+                self.condition.wait_for(lambda: self.count > 0 or not self.running)
+                if not self.running:
+                    return
+                wait_ns = self.first_time_ns + self.max_latency_ns - time.perf_counter_ns()
+                if wait_ns > 0:
+                    self.condition.wait(wait_ns / 1e9)
+                    if not self.running:
+                        return
+                    if self.count > 0 and time.perf_counter_ns() < self.first_time_ns + self.max_latency_ns:
+                        continue
+            self.flush()
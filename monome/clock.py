@@ -0,0 +1,95 @@
+import threading
+import logging
+import time
+
+from typing import Callable, Optional
+
+logger = logging.getLogger(__name__)
+
+# By default, sleep until each tick is due. Clocks that need tighter timing than
+# sleep() gives (it typically overshoots by up to a millisecond) may opt in to waking
+# early and spinning for the remainder, with PRECISE_CLOCK_LOOKAHEAD.
+DEFAULT_CLOCK_LOOKAHEAD = 0.0
+PRECISE_CLOCK_LOOKAHEAD = 0.0002
+
+
+class Clock:
+    def __init__(self,
+                 interval: float,
+                 callback: Callable[[int, int], None],
+                 lookahead: float = DEFAULT_CLOCK_LOOKAHEAD):
+        """
+        A drift-compensated clock running on a dedicated thread.
+
+        Ticks are scheduled at absolute times derived from time.perf_counter_ns(), so that
+        jitter in one tick is not carried into the next. By default, the thread sleeps until
+        each tick is due, so ticks fire up to the sleep's overshoot late. With a `lookahead`,
+        the thread instead wakes that many seconds early, then spins until the tick is due,
+        yielding to other threads as it does. If the callback overruns by more than one
+        interval, the missed ticks are skipped rather than fired in a burst.
+
+        Args:
+            interval (float): The tick interval, in seconds.
+            callback (Callable): Called on each tick with (tick_index, scheduled_time_ns).
+            lookahead (float, optional): How long before each tick to stop sleeping and spin, in
+                                         seconds. Defaults to 0, which never spins. For tight timing,
+                                         use PRECISE_CLOCK_LOOKAHEAD (200us).
+        """
+        self.interval = interval
+        self.callback = callback
+        self.lookahead = lookahead
+        self.tick = 0
+        self.thread: Optional[threading.Thread] = None
+        self.stop_event = threading.Event()
+
+    @property
+    def running(self) -> bool:
+        return self.thread is not None and self.thread.is_alive()
+
+    def start(self):
+        if self.running:
+            raise RuntimeError("Clock is already running")
+        # Each run has its own stop event, so that a thread that was stopped without
+        # waiting is not revived by restarting the clock.
+        self.stop_event = threading.Event()
+        self.thread = threading.Thread(target=self._run, args=(self.stop_event,), daemon=True)
+        self.thread.start()
+
+    def stop(self, wait: bool = True):
+        """
+        Stop the clock.
+
+        Args:
+            wait (bool, optional): If True, wait for a tick in progress to finish. Defaults to True.
+        """
+        self.stop_event.set()
+        if wait and self.thread is not None and self.thread is not threading.current_thread():
+            self.thread.join()
+        self.thread = None
+
+    def _run(self, stop_event: threading.Event):
+        next_tick_ns = time.perf_counter_ns()
+        lookahead_ns = int(self.lookahead * 1e9)
+
+        while not stop_event.is_set():
+            wait_ns = next_tick_ns - time.perf_counter_ns()
+            if wait_ns > lookahead_ns:
+                stop_event.wait((wait_ns - lookahead_ns) / 1e9)
+                continue
+            while time.perf_counter_ns() < next_tick_ns:
+                time.sleep(0)
+
+            try:
+                self.callback(self.tick, next_tick_ns)
+            except Exception:
+                logger.exception("Clock: Exception in tick callback")
+
+            self.tick += 1
+            interval_ns = int(self.interval * 1e9)
+            next_tick_ns += interval_ns
+            overrun_ns = time.perf_counter_ns() - next_tick_ns
+            if overrun_ns > interval_ns:
+                missed_ticks = overrun_ns // interval_ns
+                logger.debug("Clock: Skipping %d missed ticks" % missed_ticks)
+                self.tick += missed_ticks
+                next_tick_ns += missed_ticks * interval_ns
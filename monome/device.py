@@ -1,12 +1,19 @@
-from pythonosc.osc_server import ThreadingOSCUDPServer
-from pythonosc.udp_client import SimpleUDPClient
-from pythonosc.dispatcher import Dispatcher
+from contextlib import contextmanager
+import numpy as np
 import threading
 import logging
+import time
 
-from typing import Callable
+from typing import Callable, Optional, Sequence
 
 from .serialosc import SerialOSC
+from .transport import OSCTransport
+from .dispatch import OSCDispatcher, UnknownMessageLogger
+from .recording import EventRecorder, EVENT_TYPE_GRID_KEY, EVENT_TYPE_ENC_DELTA, EVENT_TYPE_ENC_KEY
+from .framelog import FrameLog
+from .event import get_receive_time
+from .batching import BatchHandler
+from .sendqueue import SendQueue, PRIORITY_INTERACTIVE, PRIORITY_BULK, DEFAULT_SEND_RATE, DEFAULT_SEND_BYTE_RATE
 from .exceptions import NoDevicesFoundError
 
 MONOME_HOST = "127.0.0.1"
@@ -22,7 +29,46 @@ class MonomeDevice:
         """
         self.prefix = prefix
         self.handlers: list[Callable] = []
+        self.recorder: Optional[EventRecorder] = None
+        self.batch_handlers: dict[int, list[BatchHandler]] = {
+            EVENT_TYPE_GRID_KEY: [],
+            EVENT_TYPE_ENC_DELTA: [],
+            EVENT_TYPE_ENC_KEY: [],
+        }
 
+        # Subclasses allocate `frame`, a uint8 array mirroring the device's LED levels.
+        self.frame: Optional[np.ndarray] = None
+        self.frame_log: Optional[FrameLog] = None
+        # Maps frame levels to the levels sent to the device; None sends them unchanged.
+        self.brightness_table: Optional[np.ndarray] = None
+        self.output_enabled = True
+        self.send_queue: Optional[SendQueue] = None
+        self._send_priority = threading.local()
+        self._batch_lock = threading.RLock()
+        self._batch_depth = 0
+        self._batch_frame: Optional[np.ndarray] = None
+
+        #--------------------------------------------------------------------------------
+        # Set up OSC bindings
+        #--------------------------------------------------------------------------------
+        self.dispatcher = OSCDispatcher()
+        self._unknown_message_logger = UnknownMessageLogger(str(self.__class__))
+        self.dispatcher.map(f"/sys/port", self._osc_handle_sys_port)
+
+        # Input recording handlers, which also feed batch handlers, are mapped before
+        # any subclass handlers, so that events are timestamped before they are processed.
+        self.dispatcher.map(f"/{self.prefix}/grid/key", self._osc_record_grid_key)
+        self.dispatcher.map(f"/{self.prefix}/enc/delta", self._osc_record_enc_delta)
+        self.dispatcher.map(f"/{self.prefix}/enc/key", self._osc_record_enc_key)
+        self.dispatcher.set_default_handler(self._osc_handle_unknown_message)
+
+        self._connect(model_name)
+
+    def _connect(self, model_name: str):
+        """
+        Locate the device via serialosc, and start receiving its messages.
+        Subclasses that reach the device by other means override this method.
+        """
         #--------------------------------------------------------------------------------
         # Initialise SerialOSC connection and locate the first Grid device.
         # Only one Grid is currently supported.
@@ -37,21 +83,14 @@ class MonomeDevice:
             raise NoDevicesFoundError("No matching monome devices found")
 
         #--------------------------------------------------------------------------------
-        # Set up OSC bindings
+        # Register with the process-wide transport, which receives and sends on a
+        # single UDP socket shared by all devices.
         #--------------------------------------------------------------------------------
-        self.dispatcher = Dispatcher()
-        self.dispatcher.map(f"/sys/port", self._osc_handle_sys_port)
-        self.dispatcher.set_default_handler(self._osc_handle_unknown_message)
+        self.transport = OSCTransport()
+        self.transport.add_endpoint(self.dispatcher, port=device.port, prefix=self.prefix)
+        self.server_port = self.transport.port
 
-        #--------------------------------------------------------------------------------
-        # Listen on a random UDP port
-        #--------------------------------------------------------------------------------
-        self.server = ThreadingOSCUDPServer((MONOME_HOST, 0), self.dispatcher)
-        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
-        self.thread.start()
-        self.server_port = self.server.socket.getsockname()[1]
-
-        self.client = SimpleUDPClient(MONOME_HOST, device.port)
+        self.client = self.transport.client(device.port, MONOME_HOST)
         self.client.send_message("/sys/port", [self.server_port])
 
     #--------------------------------------------------------------------------------
@@ -87,6 +126,340 @@ class MonomeDevice:
         """
         self.add_handler(handler)
 
+    def _add_batch_handler(self, event_type: int, handler: Callable, dtype: np.dtype,
+                           max_batch: int, max_latency_ms: float) -> BatchHandler:
+        batch_handler = BatchHandler(handler, dtype, max_batch=max_batch, max_latency_ms=max_latency_ms)
+        self.batch_handlers[event_type].append(batch_handler)
+        return batch_handler
+
+    def remove_batch_handler(self, handler: Callable):
+        """
+        Remove a batch handler, delivering any pending events to it first.
+
+        Args:
+            handler (Callable): The handler, as passed to add_batch_handler().
+        """
+        for batch_handlers in self.batch_handlers.values():
+            for batch_handler in batch_handlers:
+                if batch_handler.handler is handler:
+                    batch_handlers.remove(batch_handler)
+                    batch_handler.close()
+                    return
+        raise ValueError("Handler not found")
+
+    #--------------------------------------------------------------------------------
+    # Output
+    #--------------------------------------------------------------------------------
+
+    def _send(self, address: str, args: list, region=None, replaces: bool = False):
+        """
+        Send a message to the device, via the send queue if one is running.
+
+        Args:
+            address (str): The OSC address.
+            args (list): The OSC arguments.
+            region (optional): The region of the device that the message updates, used to
+                               merge superseded updates in the send queue.
+            replaces (bool, optional): Whether the message sets the whole of `region`. Defaults to False.
+        """
+        if not self.output_enabled:
+            return
+        send_queue = self.send_queue
+        if send_queue is None:
+            self.client.send_message(address, args)
+        else:
+            send_queue.enqueue(self.client.build_message(address, args),
+                               priority=self._get_send_priority(),
+                               region=region,
+                               replaces=replaces)
+
+    def _send_levels(self, address: str, args: list[int], levels: np.ndarray, region=None, replaces: bool = False):
+        """
+        Send a message whose trailing arguments are an array of levels. The message is
+        encoded directly from the array, without converting each level to a Python int.
+        """
+        if not self.output_enabled:
+            return
+        data = self.client.build_int_message(address, args, levels)
+        send_queue = self.send_queue
+        if send_queue is None:
+            self.client.send(data)
+        else:
+            send_queue.enqueue(bytes(data),
+                               priority=self._get_send_priority(),
+                               region=region,
+                               replaces=replaces)
+
+    def _send_led_update(self, address: str, args: list, region=None, replaces: bool = False):
+        """
+        Send an LED update, after `frame` has been updated to reflect it.
+        Within a batch(), the update is deferred until the batch ends.
+        """
+        if self._batch_depth > 0:
+            return
+        self._send(address, args, region, replaces)
+        frame_log = self.frame_log
+        if frame_log is not None:
+            frame_log.append(self.frame)
+
+    def _send_led_levels(self, address: str, args: list[int], levels: np.ndarray, region=None, replaces: bool = False):
+        """
+        As _send_led_update(), for a message whose trailing arguments are an array of levels.
+        """
+        if self._batch_depth > 0:
+            return
+        self._send_levels(address, args, levels, region, replaces)
+        frame_log = self.frame_log
+        if frame_log is not None:
+            frame_log.append(self.frame)
+
+    @contextmanager
+    def batch(self):
+        """
+        Context manager that defers LED updates until the end of the block, then sends
+        a single update for each region of the device whose levels have changed.
+        Batches may be nested, in which case updates are sent when the outermost ends.
+
+        Example:
+            with grid.batch():
+                for x in range(grid.width):
+                    grid.led_level_set(x, 0, 15)
+        """
+        with self._batch_lock:
+            if self._batch_depth == 0:
+                self._batch_frame = self.frame.copy()
+            self._batch_depth += 1
+            try:
+                yield
+            finally:
+                self._batch_depth -= 1
+                if self._batch_depth == 0:
+                    frame_previous = self._batch_frame
+                    self._batch_frame = None
+                    if not np.array_equal(frame_previous, self.frame):
+                        self._send_frame_changes(frame_previous)
+                        frame_log = self.frame_log
+                        if frame_log is not None:
+                            frame_log.append(self.frame)
+
+    def _send_frame_changes(self, frame_previous: np.ndarray):
+        """
+        Send the regions of `frame` that differ from `frame_previous`.
+        """
+        raise NotImplementedError("Subclasses must implement _send_frame_changes() method")
+
+    def refresh(self):
+        """
+        Send the whole frame to the device, regardless of what has been sent before.
+        """
+        self._send_frame_changes(np.full(self.frame.shape, 0xFF, dtype=np.uint8))
+
+    #--------------------------------------------------------------------------------
+    # Brightness
+    #--------------------------------------------------------------------------------
+
+    def set_brightness_table(self, table: Optional[Sequence[int]]):
+        """
+        Set a lookup table that maps each of the 16 levels in `frame` to the level sent
+        to the device, and resend the frame. Frames, captures and page state keep their
+        original levels, so a whole rig can be dimmed or re-themed by swapping the table.
+
+        Args:
+            table (Sequence[int]): 16 levels, between 0 and 15, or None to send levels unchanged.
+        """
+        if table is not None:
+            table = np.asarray(table)
+            if table.shape != (16,):
+                raise ValueError("Brightness table must contain 16 levels")
+            if table.min() < 0 or table.max() > 15:
+                raise ValueError("level must be between 0 and 15")
+            table = table.astype(np.uint8)
+            if np.array_equal(table, np.arange(16)):
+                table = None
+        self.brightness_table = table
+        self.refresh()
+
+    def set_brightness_curve(self, gamma: float = 1.0, maximum: int = 15, minimum: int = 1):
+        """
+        Set the brightness table to a power curve: level 0 is off, and levels 1 to 15
+        are mapped from `minimum` to `maximum` with the given gamma.
+
+        Args:
+            gamma (float, optional): The exponent of the curve. Values above 1 darken the
+                                     lower levels. Defaults to 1.
+            maximum (int, optional): The output level of level 15. Defaults to 15.
+            minimum (int, optional): The output level of level 1. Defaults to 1.
+        """
+        table = np.zeros(16)
+        table[1:] = np.rint(minimum + (maximum - minimum) * (np.arange(15) / 14) ** gamma)
+        self.set_brightness_table(table)
+
+    def _output_level(self, level: int) -> int:
+        table = self.brightness_table
+        return level if table is None else int(table[level])
+
+    def _output_levels(self, levels: np.ndarray) -> np.ndarray:
+        table = self.brightness_table
+        return levels if table is None else table[levels]
+
+    #--------------------------------------------------------------------------------
+    # Send queue
+    #--------------------------------------------------------------------------------
+
+    def start_send_queue(self,
+                         rate: float = DEFAULT_SEND_RATE,
+                         byte_rate: float = DEFAULT_SEND_BYTE_RATE) -> SendQueue:
+        """
+        Start sending all output through a rate-limited queue on a dedicated thread.
+
+        Updates sent from the transport's receive thread (that is, from within input event
+        handlers) are treated as interactive, and are sent before bulk updates from any
+        other thread. Use send_priority() to override this. Updates that are superseded
+        before they are sent are merged.
+
+        Args:
+            rate (float, optional): The maximum number of datagrams per second.
+            byte_rate (float, optional): The maximum number of bytes per second.
+
+        Returns:
+            SendQueue: The send queue.
+        """
+        if self.send_queue is not None:
+            raise RuntimeError("Device already has a send queue")
+        self.send_queue = SendQueue(self.client, rate=rate, byte_rate=byte_rate)
+        return self.send_queue
+
+    def stop_send_queue(self, flush: bool = True):
+        """
+        Stop the send queue, and resume sending output directly.
+
+        Args:
+            flush (bool, optional): If True, send any queued updates first. Defaults to True.
+        """
+        if self.send_queue is None:
+            raise RuntimeError("Device does not have a send queue")
+        send_queue = self.send_queue
+        self.send_queue = None
+        send_queue.close(flush=flush)
+
+    @contextmanager
+    def send_priority(self, priority: int):
+        """
+        Context manager that sets the priority of updates sent from the current thread
+        within the block, when a send queue is running.
+
+        Example:
+            with grid.send_priority(PRIORITY_INTERACTIVE):
+                grid.led_level_set(x, y, 15)
+        """
+        priority_previous = getattr(self._send_priority, "priority", None)
+        self._send_priority.priority = priority
+        try:
+            yield
+        finally:
+            self._send_priority.priority = priority_previous
+
+    def _get_send_priority(self) -> int:
+        priority = getattr(self._send_priority, "priority", None)
+        if priority is not None:
+            return priority
+        if threading.current_thread() is self.transport.thread:
+            return PRIORITY_INTERACTIVE
+        return PRIORITY_BULK
+
+    #--------------------------------------------------------------------------------
+    # Frame capture
+    #--------------------------------------------------------------------------------
+
+    def start_frame_capture(self,
+                            path: str,
+                            capacity: int = 1024,
+                            output: bool = True,
+                            packed: bool = False) -> FrameLog:
+        """
+        Start appending every full-device LED frame to a memory-mapped ring file.
+        Other processes can read the live LED state with FrameLog.open(path).
+
+        Args:
+            path (str): The path of the frame log to write.
+            capacity (int, optional): The number of frames retained in the ring. Defaults to 1024.
+            output (bool, optional): If False, LED updates are captured but not sent to the hardware. Defaults to True.
+            packed (bool, optional): If True, frames are stored 4-bit packed, halving the size of the log.
+                                     Defaults to False.
+
+        Returns:
+            FrameLog: The frame log.
+        """
+        if self.frame_log is not None:
+            raise RuntimeError("Device is already capturing frames")
+        frame_log = FrameLog(path, shape=self.frame.shape, capacity=capacity, packed=packed)
+        frame_log.append(self.frame)
+        self.output_enabled = output
+        self.frame_log = frame_log
+        return frame_log
+
+    def stop_frame_capture(self):
+        """
+        Stop capturing frames, and resume sending LED updates to the hardware.
+        """
+        if self.frame_log is None:
+            raise RuntimeError("Device is not capturing frames")
+        frame_log = self.frame_log
+        self.frame_log = None
+        self.output_enabled = True
+        frame_log.close()
+
+    #--------------------------------------------------------------------------------
+    # Input recording
+    #--------------------------------------------------------------------------------
+
+    def start_recording(self, path: str) -> EventRecorder:
+        """
+        Start recording all incoming input events to a binary log.
+        The log can be replayed with monome.recording.EventReplayer.
+
+        Args:
+            path (str): The path of the log file to write.
+
+        Returns:
+            EventRecorder: The recorder.
+        """
+        if self.recorder is not None:
+            raise RuntimeError("Device is already recording")
+        self.recorder = EventRecorder(path)
+        return self.recorder
+
+    def stop_recording(self):
+        """
+        Stop recording input events, and close the log file.
+        """
+        if self.recorder is None:
+            raise RuntimeError("Device is not recording")
+        recorder = self.recorder
+        self.recorder = None
+        recorder.close()
+
+    def _osc_record_grid_key(self, address: str, x: int, y: int, down: int):
+        self._record_event(EVENT_TYPE_GRID_KEY, x, y, down)
+
+    def _osc_record_enc_delta(self, address: str, ring: int, delta: int):
+        self._record_event(EVENT_TYPE_ENC_DELTA, ring, delta)
+
+    def _osc_record_enc_key(self, address: str, key: int, down: int):
+        self._record_event(EVENT_TYPE_ENC_KEY, key, down)
+
+    def _record_event(self, event_type: int, *args):
+        timestamp = get_receive_time()
+        recorder = self.recorder
+        if recorder is not None:
+            recorder.record(event_type, *args, timestamp=timestamp)
+        batch_handlers = self.batch_handlers[event_type]
+        if batch_handlers:
+            if timestamp is None:
+                timestamp = time.perf_counter_ns()
+            for batch_handler in batch_handlers:
+                batch_handler.append(timestamp, *args)
+
     #--------------------------------------------------------------------------------
     # OSC handlers
     #--------------------------------------------------------------------------------
@@ -95,4 +468,4 @@ class MonomeDevice:
         pass
 
     def _osc_handle_unknown_message(self, address: str, *args):
-        logger.warning(f"{self.__class__}: No handler for message: {address}, {args}")
+        self._unknown_message_logger.log(address, args)
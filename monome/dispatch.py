@@ -0,0 +1,170 @@
+from pythonosc import osc_packet
+import logging
+import struct
+import time
+
+from typing import Callable, Optional
+
+logger = logging.getLogger(__name__)
+
+# Unknown addresses are logged at most once per interval, per address
+UNKNOWN_MESSAGE_LOG_INTERVAL = 5.0
+
+# The maximum number of compiled decoders retained, bounding memory if a peer sends
+# many distinct addresses
+MAX_COMPILED_DECODERS = 256
+
+
+class OSCDispatcher:
+    def __init__(self):
+        """
+        Dispatches incoming OSC datagrams to handlers, keyed on the raw bytes of their address.
+        Implements the subset of python-osc's Dispatcher interface used by this package:
+        map(), set_default_handler() and call_handlers_for_packet().
+
+        The first time an (address, type tag) pair is seen, a decoder is compiled for it.
+        For messages whose arguments are all int32 or float32, which covers every message
+        sent by a monome device, the arguments are unpacked with a single precompiled
+        struct.unpack_from(). Other messages, and bundles, fall back to python-osc's parser.
+
+        Handlers are called as handler(address, *args), as with python-osc.
+        Only exact addresses are supported, not OSC address patterns.
+        """
+        self.handlers: dict[bytes, list[Callable]] = {}
+        self.default_handler: Optional[Callable] = None
+        # (address, type tag) -> (address str, struct or None, handlers)
+        self._decoders: dict[bytes, tuple] = {}
+
+    def map(self, address: str, handler: Callable, first: bool = False):
+        """
+        Map an address to a handler. Several handlers may be mapped to one address,
+        and are called in the order that they were mapped. If a handler raises an
+        exception, the handlers after it are not called.
+
+        Args:
+            address (str): The OSC address.
+            handler (Callable): The handler.
+            first (bool, optional): If True, call the handler before those already mapped.
+                                    Defaults to False.
+        """
+        handlers = self.handlers.setdefault(address.encode("ascii"), [])
+        if first:
+            handlers.insert(0, handler)
+        else:
+            handlers.append(handler)
+        self._decoders.clear()
+
+    def unmap(self, address: str, handler: Callable):
+        self.handlers[address.encode("ascii")].remove(handler)
+        self._decoders.clear()
+
+    def set_default_handler(self, handler: Callable):
+        """
+        Set a handler to receive messages whose address is not mapped.
+        """
+        self.default_handler = handler
+
+    def dispatch(self, address: str, *args):
+        """
+        Call the handlers for a message that has already been decoded.
+        """
+        handlers = self.handlers.get(address.encode("ascii"))
+        if handlers:
+            for handler in handlers:
+                handler(address, *args)
+        elif self.default_handler is not None:
+            self.default_handler(address, *args)
+
+    def call_handlers_for_packet(self, data: bytes, client_address: tuple):
+        """
+        Decode a datagram and call the handlers for its message.
+        """
+        address_end = data.find(b"\0")
+        if address_end <= 0 or data[:1] != b"/":
+            self._call_handlers_for_packet_slow(data)
+            return
+
+        #--------------------------------------------------------------------------------
+        # The key is the address and type tag, with their null padding, which together
+        # form the fixed-layout header of the message.
+        #--------------------------------------------------------------------------------
+        type_tag_start = (address_end + 4) & ~3
+        type_tag_end = data.find(b"\0", type_tag_start)
+        if type_tag_end < 0:
+            return
+        arguments_start = (type_tag_end + 4) & ~3
+        key = data[:arguments_start]
+
+        decoder = self._decoders.get(key)
+        if decoder is None:
+            decoder = self._compile_decoder(data[:address_end], data[type_tag_start:type_tag_end])
+            if len(self._decoders) >= MAX_COMPILED_DECODERS:
+                self._decoders.clear()
+            self._decoders[key] = decoder
+        address, decoder_struct, handlers = decoder
+
+        if decoder_struct is None:
+            self._call_handlers_for_packet_slow(data)
+            return
+        try:
+            args = decoder_struct.unpack_from(data, arguments_start)
+        except struct.error:
+            return
+        if handlers:
+            for handler in handlers:
+                handler(address, *args)
+        elif self.default_handler is not None:
+            self.default_handler(address, *args)
+
+    def _compile_decoder(self, address: bytes, type_tag: bytes) -> tuple:
+        handlers = self.handlers.get(address, [])
+        address_str = address.decode("ascii", errors="replace")
+        if type_tag[:1] != b"," or type_tag.strip(b",if"):
+            return (address_str, None, handlers)
+        return (address_str, struct.Struct(">" + type_tag[1:].decode("ascii")), handlers)
+
+    def _call_handlers_for_packet_slow(self, data: bytes):
+        try:
+            packet = osc_packet.OscPacket(data)
+        except osc_packet.ParseError:
+            return
+        for timed_message in packet.messages:
+            message = timed_message.message
+            handlers = self.handlers.get(message.address.encode("ascii", errors="replace"))
+            if handlers:
+                for handler in handlers:
+                    handler(message.address, *message.params)
+            elif self.default_handler is not None:
+                self.default_handler(message.address, *message.params)
+
+
+class UnknownMessageLogger:
+    def __init__(self, name: str, interval: float = UNKNOWN_MESSAGE_LOG_INTERVAL):
+        """
+        Logs warnings for unknown OSC messages, at most once per `interval` seconds for
+        each address, with a count of the messages suppressed in between.
+
+        Args:
+            name (str): The name to include in log messages.
+            interval (float, optional): The minimum interval between warnings for an address, in seconds.
+        """
+        self.name = name
+        self.interval = interval
+        # address -> [last logged time, suppressed count]
+        self.addresses: dict[str, list] = {}
+
+    def log(self, address: str, args: tuple):
+        now = time.monotonic()
+        state = self.addresses.get(address)
+        if state is None:
+            state = self.addresses[address] = [now - self.interval, 0]
+        if now - state[0] < self.interval:
+            state[1] += 1
+            return
+        if state[1] > 0:
+            logger.warning(f"{self.name}: No handler for message: {address}, {args} "
+                           f"({state[1]} similar messages suppressed)")
+        else:
+            logger.warning(f"{self.name}: No handler for message: {address}, {args}")
+        state[0] = now
+        state[1] = 0
@@ -1,8 +1,45 @@
+import threading
+import time
+
+from typing import Optional
+
+# The receive time of the datagram being dispatched on each thread
+_dispatch_state = threading.local()
+
+
+def set_receive_time(time_ns: Optional[int]):
+    """
+    Set the receive time of the datagram whose handlers are about to be called on this
+    thread, so that events created by the handlers are stamped with it. Set to None
+    once the handlers have returned.
+    """
+    _dispatch_state.time_ns = time_ns
+
+
+def get_receive_time() -> Optional[int]:
+    return getattr(_dispatch_state, "time_ns", None)
+
+
 class MonomeEvent:
     """
     A generic event generated by a Monome device.
     This class is intended to be subclassed for specific event types.
+
+    Every event carries two timestamps, in time.perf_counter_ns() units:
+     - time_ns: when the datagram that caused the event was received, or when the
+                event was created if it was not caused by a datagram
+     - dispatch_time_ns: when the event was created, to be passed to handlers
     """
 
-    def __init__(self):
-        pass
+    def __init__(self, time_ns: Optional[int] = None):
+        self.dispatch_time_ns = time.perf_counter_ns()
+        if time_ns is None:
+            time_ns = get_receive_time()
+        self.time_ns = self.dispatch_time_ns if time_ns is None else time_ns
+
+    @property
+    def latency_ns(self) -> int:
+        """
+        The time between the event's datagram being received and the event being dispatched.
+        """
+        return self.dispatch_time_ns - self.time_ns
@@ -0,0 +1,180 @@
+from __future__ import annotations
+
+import numpy as np
+import threading
+import logging
+import time
+
+from typing import Optional
+
+from .packing import PackedFrame
+
+logger = logging.getLogger(__name__)
+
+FRAME_LOG_MAGIC = b"MNMFRMS1"
+
+#--------------------------------------------------------------------------------
+# A frame log file consists of a fixed 32-byte header followed by `capacity`
+# fixed-size records, each holding a timestamp and one full-device frame of
+# uint8 LED levels. Records are written as a ring: once the log is full, the
+# oldest frame is overwritten. `frame_count` is the total number of frames ever
+# written, and is updated after each record so that readers never see a
+# record whose index has been published before its contents.
+#
+# If FRAME_LOG_FLAG_PACKED is set, each frame is stored as a PackedFrame, with
+# two LEDs per byte, halving the size of the log.
+#--------------------------------------------------------------------------------
+FRAME_LOG_HEADER_DTYPE = np.dtype([
+    ("magic", "S8"),
+    ("height", "<u4"),
+    ("width", "<u4"),
+    ("capacity", "<u4"),
+    ("flags", "<u4"),
+    ("frame_count", "<u8"),
+])
+
+FRAME_LOG_FLAG_PACKED = 0x01
+
+
+def frame_log_record_dtype(height: int, width: int, packed: bool = False) -> np.dtype:
+    return np.dtype([
+        ("timestamp", "<u8"),
+        ("frame", "u1", (height, (width + 1) // 2 if packed else width)),
+    ])
+
+
+class FrameLog:
+    def __init__(self,
+                 path: str,
+                 shape: Optional[tuple[int, int]] = None,
+                 capacity: int = 1024,
+                 packed: bool = False):
+        """
+        A memory-mapped ring of fixed-size LED frames.
+
+        If `shape` is specified, a new log is created for writing, overwriting any existing file.
+        Otherwise, an existing log is opened read-only, so that another process can read
+        the live LED state without copying.
+
+        Args:
+            path (str): The path of the log file.
+            shape (tuple[int, int], optional): The (height, width) of each frame, when creating a log.
+            capacity (int, optional): The number of frames in the ring, when creating a log. Defaults to 1024.
+            packed (bool, optional): If True, frames are stored 4-bit packed, when creating a log. Defaults to False.
+        """
+        self.path = path
+        self.lock = threading.Lock()
+
+        if shape is not None:
+            height, width = shape
+            record_dtype = frame_log_record_dtype(height, width, packed)
+            size = FRAME_LOG_HEADER_DTYPE.itemsize + capacity * record_dtype.itemsize
+            with open(path, "wb") as fd:
+                fd.truncate(size)
+            self.header = np.memmap(path, dtype=FRAME_LOG_HEADER_DTYPE, mode="r+", shape=(1,))
+            self.header[0] = (FRAME_LOG_MAGIC, height, width, capacity, FRAME_LOG_FLAG_PACKED if packed else 0, 0)
+            self.writable = True
+        else:
+            self.header = np.memmap(path, dtype=FRAME_LOG_HEADER_DTYPE, mode="r", shape=(1,))
+            if self.header["magic"][0] != FRAME_LOG_MAGIC:
+                raise ValueError("Not a frame log: %s" % path)
+            height = int(self.header["height"][0])
+            width = int(self.header["width"][0])
+            capacity = int(self.header["capacity"][0])
+            packed = bool(self.header["flags"][0] & FRAME_LOG_FLAG_PACKED)
+            record_dtype = frame_log_record_dtype(height, width, packed)
+            self.writable = False
+
+        self.shape = (height, width)
+        self.capacity = capacity
+        self.packed = packed
+        self.records = np.memmap(path,
+                                 dtype=record_dtype,
+                                 mode="r+" if self.writable else "r",
+                                 offset=FRAME_LOG_HEADER_DTYPE.itemsize,
+                                 shape=(capacity,))
+
+    @classmethod
+    def open(cls, path: str) -> FrameLog:
+        """
+        Open an existing frame log for reading.
+
+        Args:
+            path (str): The path of the log file.
+
+        Returns:
+            FrameLog: The log.
+        """
+        return cls(path)
+
+    @property
+    def frame_count(self) -> int:
+        """
+        The total number of frames written since the log was created.
+        """
+        return int(self.header["frame_count"][0])
+
+    def __len__(self):
+        # The writer may be overwriting the oldest record, so one fewer can be read
+        return min(self.frame_count, self.capacity - 1)
+
+    def __getitem__(self, index: int) -> tuple[int, np.ndarray]:
+        """
+        Returns the (timestamp, frame) of a retained frame, where index 0 is the oldest
+        frame still in the ring and -1 is the latest. The frame is a read-only copy.
+
+        The writer may lap the ring while a record is being copied, so after copying,
+        `frame_count` is checked again, and if the record may have been overwritten, the
+        read is retried against the new contents of the ring. As the writer may be
+        overwriting the oldest record at any time, only `capacity - 1` frames can be read.
+        """
+        while True:
+            frame_count = self.frame_count
+            count = min(frame_count, self.capacity - 1)
+            position = index + count if index < 0 else index
+            if position < 0 or position >= count:
+                raise IndexError("Frame index out of range")
+            record_index = frame_count - count + position
+            record = self.records[record_index % self.capacity].copy()
+            # The record being written after frame_count overwrites frame_count - capacity
+            if record_index > self.frame_count - self.capacity:
+                break
+        if self.packed:
+            frame = PackedFrame(self.shape, record["frame"].tobytes()).to_array()
+        else:
+            frame = record["frame"]
+        frame.flags.writeable = False
+        return int(record["timestamp"]), frame
+
+    def latest(self) -> tuple[int, np.ndarray]:
+        """
+        Returns the (timestamp, frame) of the most recently written frame.
+        """
+        return self[-1]
+
+    def append(self, frame: np.ndarray, timestamp: Optional[int] = None):
+        """
+        Write a frame to the ring.
+
+        Args:
+            frame (np.ndarray): The frame, with shape equal to the log's shape.
+            timestamp (int, optional): The timestamp in nanoseconds. Defaults to time.perf_counter_ns().
+        """
+        if not self.writable:
+            raise RuntimeError("Frame log is open read-only")
+        if timestamp is None:
+            timestamp = time.perf_counter_ns()
+        with self.lock:
+            frame_count = self.frame_count
+            record = self.records[frame_count % self.capacity]
+            if self.packed:
+                record["frame"] = PackedFrame.from_array(frame).packed
+            else:
+                record["frame"] = frame
+            record["timestamp"] = timestamp
+            self.header["frame_count"] = frame_count + 1
+
+    def close(self):
+        if self.writable:
+            self.records.flush()
+            self.header.flush()
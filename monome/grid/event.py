@@ -1,7 +1,9 @@
+from typing import Optional
+
 from ..event import MonomeEvent
 
 class GridKeyEvent (MonomeEvent):
-    def __init__(self, x: int, y: int, down: bool):
+    def __init__(self, x: int, y: int, down: bool, time_ns: Optional[int] = None):
         """
         Event generated by a Grid key up/down.
 
@@ -9,8 +11,10 @@ class GridKeyEvent (MonomeEvent):
             x (int): The x position of the key, where 0 == left.
             y (int): The y position of the key, where 0 == top.
             down (bool): Whether the key is pressed down (True) or released (False).
+            time_ns (int, optional): The time the key event was received, in time.perf_counter_ns() units.
+                                     Defaults to the receive time of the datagram being dispatched.
         """
-        super().__init__()
+        super().__init__(time_ns)
         self.x = x
         self.y = y
         self.down = down
@@ -49,4 +53,111 @@ class GridUIMidiNoteEvent (GridUIKeyEvent):
         self.note = note
 
     def __repr__(self):
-        return f"GridUIMidiNoteEvent(page={self.page}, x={self.x}, y={self.y}, down={self.down}, note={self.note})"
\ No newline at end of file
+        return f"GridUIMidiNoteEvent(page={self.page}, x={self.x}, y={self.y}, down={self.down}, note={self.note})"
+
+class GridUIFaderEvent (GridUIKeyEvent):
+    def __init__(self, page, x: int, y: int, down: bool, fader: int, level: int):
+        """
+        Event generated by a GridUI key press that sets the level of a fader.
+
+        Args:
+            page (GridPage): The GridPage that generated the event.
+            x (int): The x position of the key, where 0 == left.
+            y (int): The y position of the key, where 0 == top.
+            down (bool): Whether the key is pressed down (True) or released (False).
+            fader (int): The index of the fader within the page.
+            level (int): The new level of the fader.
+        """
+        super().__init__(page, x, y, down)
+        self.fader = fader
+        self.level = level
+
+    def __repr__(self):
+        return (f"GridUIFaderEvent(page={self.page}, x={self.x}, y={self.y}, down={self.down}, "
+                f"fader={self.fader}, level={self.level})")
+
+class GridUIGestureEvent (MonomeEvent):
+    def __init__(self, page, x: int, y: int):
+        """
+        Base class for events generated by the GridGestureRecogniser.
+
+        Args:
+            page (GridPage): The GridPage that was current when the gesture was recognised.
+            x (int): The x position of the key that completed the gesture.
+            y (int): The y position of the key that completed the gesture.
+        """
+        super().__init__()
+        self.page = page
+        self.x = x
+        self.y = y
+
+class GridUILongPressEvent (GridUIGestureEvent):
+    def __init__(self, page, x: int, y: int, duration: float):
+        """
+        Event generated when a key has been held for the long-press duration.
+
+        Args:
+            page (GridPage): The current GridPage.
+            x (int): The x position of the key.
+            y (int): The y position of the key.
+            duration (float): The time that the key has been held, in seconds.
+        """
+        super().__init__(page, x, y)
+        self.duration = duration
+
+    def __repr__(self):
+        return f"GridUILongPressEvent(page={self.page}, x={self.x}, y={self.y}, duration={self.duration:.3f})"
+
+class GridUIDoubleTapEvent (GridUIGestureEvent):
+    def __init__(self, page, x: int, y: int, interval: float):
+        """
+        Event generated when a key is tapped twice in quick succession.
+
+        Args:
+            page (GridPage): The current GridPage.
+            x (int): The x position of the key.
+            y (int): The y position of the key.
+            interval (float): The time between the first release and the second press, in seconds.
+        """
+        super().__init__(page, x, y)
+        self.interval = interval
+
+    def __repr__(self):
+        return f"GridUIDoubleTapEvent(page={self.page}, x={self.x}, y={self.y}, interval={self.interval:.3f})"
+
+class GridUIChordEvent (GridUIGestureEvent):
+    def __init__(self, page, keys: list[tuple[int, int]]):
+        """
+        Event generated when two or more keys are pressed together.
+
+        Args:
+            page (GridPage): The current GridPage.
+            keys (list[tuple[int, int]]): The (x, y) positions of the keys, in order of pressing.
+        """
+        super().__init__(page, *keys[-1])
+        self.keys = keys
+
+    def __repr__(self):
+        return f"GridUIChordEvent(page={self.page}, keys={self.keys})"
+
+class GridUIRangeEvent (GridUIGestureEvent):
+    def __init__(self, page, x_start: int, y_start: int, x_end: int, y_end: int):
+        """
+        Event generated when a key is held and a second key is pressed in the same row or column.
+
+        Args:
+            page (GridPage): The current GridPage.
+            x_start (int): The x position of the held key.
+            y_start (int): The y position of the held key.
+            x_end (int): The x position of the second key.
+            y_end (int): The y position of the second key.
+        """
+        super().__init__(page, x_end, y_end)
+        self.x_start = x_start
+        self.y_start = y_start
+        self.x_end = x_end
+        self.y_end = y_end
+
+    def __repr__(self):
+        return (f"GridUIRangeEvent(page={self.page}, start=({self.x_start}, {self.y_start}), "
+                f"end=({self.x_end}, {self.y_end}))")
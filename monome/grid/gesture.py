@@ -0,0 +1,128 @@
+from __future__ import annotations
+
+import numpy as np
+import logging
+import time
+
+from ..timerwheel import TimerWheel
+from .event import GridUILongPressEvent, GridUIDoubleTapEvent, GridUIChordEvent, GridUIRangeEvent
+
+from typing import TYPE_CHECKING
+if TYPE_CHECKING:
+    from .ui import GridUI
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_LONG_PRESS_DURATION = 0.5
+DEFAULT_DOUBLE_TAP_INTERVAL = 0.25
+DEFAULT_CHORD_WINDOW = 0.05
+
+
+class GridGestureRecogniser:
+    def __init__(self,
+                 grid: GridUI,
+                 long_press: float = DEFAULT_LONG_PRESS_DURATION,
+                 double_tap: float = DEFAULT_DOUBLE_TAP_INTERVAL,
+                 chord_window: float = DEFAULT_CHORD_WINDOW):
+        """
+        Recognises gestures from a GridUI's key events, and sends them to the gesture
+        handlers of the current page.
+
+        Key state is held in (height, width) arrays of held state and press and release
+        timestamps. Timeouts for long presses and chords are scheduled on a single
+        TimerWheel, and check on expiry whether the press they were scheduled for is still
+        in progress, so no per-key timers are created or cancelled.
+
+        Gestures:
+         - long press: a key held for `long_press` seconds.
+         - double tap: a key pressed within `double_tap` seconds of a short press being released.
+         - chord: two or more keys pressed within `chord_window` seconds of each other.
+         - range: a key pressed while exactly one other key in the same row or column is held.
+
+        Args:
+            grid (GridUI): The GridUI.
+            long_press (float, optional): The long-press duration, in seconds. Defaults to 0.5.
+            double_tap (float, optional): The maximum interval of a double tap, in seconds. Defaults to 0.25.
+            chord_window (float, optional): The window within which chorded keys must be pressed. Defaults to 0.05.
+        """
+        self.grid = grid
+        self.long_press = long_press
+        self.double_tap = double_tap
+        self.chord_window = chord_window
+
+        shape = (grid.height, grid.width)
+        self.held = np.zeros(shape, dtype=bool)
+        self.press_time_ns = np.zeros(shape, dtype=np.int64)
+        self.release_time_ns = np.zeros(shape, dtype=np.int64)
+        # Whether the key's previous press was short enough to be the first tap of a double tap
+        self.tapped = np.zeros(shape, dtype=bool)
+        self.chord_start_ns = 0
+
+        self.timer_wheel = TimerWheel()
+        self.timer_wheel.start()
+
+    def held_keys(self) -> list[tuple[int, int]]:
+        """
+        Returns the (x, y) positions of all held keys, in order of pressing.
+        """
+        ys, xs = np.nonzero(self.held)
+        order = np.argsort(self.press_time_ns[ys, xs], kind="stable")
+        return [(int(xs[i]), int(ys[i])) for i in order]
+
+    def close(self):
+        self.timer_wheel.stop()
+
+    def _handle_grid_key(self, x: int, y: int, down: int, time_ns: int = None):
+        if x not in range(self.grid.width) or y not in range(self.grid.height):
+            return
+        if time_ns is None:
+            time_ns = time.perf_counter_ns()
+        if down:
+            self._handle_key_down(x, y, time_ns)
+        else:
+            self._handle_key_up(x, y, time_ns)
+
+    def _handle_key_down(self, x: int, y: int, time_ns: int):
+        interval_ns = time_ns - self.release_time_ns[y, x]
+        if self.tapped[y, x] and interval_ns <= self.double_tap * 1e9:
+            self.tapped[y, x] = False
+            self._emit(GridUIDoubleTapEvent(self._current_page(), x, y, interval_ns / 1e9))
+
+        held_ys, held_xs = np.nonzero(self.held)
+        if len(held_xs) == 1 and (held_xs[0] == x or held_ys[0] == y):
+            self._emit(GridUIRangeEvent(self._current_page(), int(held_xs[0]), int(held_ys[0]), x, y))
+
+        self.held[y, x] = True
+        self.press_time_ns[y, x] = time_ns
+        self.timer_wheel.schedule(self.long_press, self._handle_long_press_timeout, x, y, time_ns)
+        if len(held_xs) == 0 or time_ns - self.chord_start_ns > self.chord_window * 1e9:
+            self.chord_start_ns = time_ns
+            self.timer_wheel.schedule(self.chord_window, self._handle_chord_timeout, time_ns)
+
+    def _handle_key_up(self, x: int, y: int, time_ns: int):
+        self.held[y, x] = False
+        self.release_time_ns[y, x] = time_ns
+        self.tapped[y, x] = time_ns - self.press_time_ns[y, x] < self.long_press * 1e9
+
+    def _handle_long_press_timeout(self, x: int, y: int, press_time_ns: int):
+        if self.held[y, x] and self.press_time_ns[y, x] == press_time_ns:
+            duration = (time.perf_counter_ns() - press_time_ns) / 1e9
+            self._emit(GridUILongPressEvent(self._current_page(), x, y, duration))
+
+    def _handle_chord_timeout(self, chord_start_ns: int):
+        chord = self.held & (self.press_time_ns >= chord_start_ns)
+        if np.count_nonzero(chord) < 2:
+            return
+        keys = [key for key in self.held_keys() if chord[key[1], key[0]]]
+        self._emit(GridUIChordEvent(self._current_page(), keys))
+
+    def _current_page(self):
+        return self.grid.current_page if len(self.grid.pages) > 0 else None
+
+    def _emit(self, event):
+        page = event.page
+        if page is None:
+            return
+        logger.debug("Gesture: %s" % event)
+        for handler in page.gesture_handlers:
+            handler(event)
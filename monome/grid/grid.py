@@ -1,8 +1,15 @@
+import numpy as np
 import logging
 import random
 import time
 
+from typing import Callable
+
 from ..device import MonomeDevice
+from ..sendqueue import REGION_ALL
+from ..utils import as_level_array
+from ..recording import EVENT_TYPE_GRID_KEY
+from ..batching import BatchHandler, GRID_KEY_BATCH_DTYPE, DEFAULT_MAX_BATCH, DEFAULT_MAX_LATENCY_MS
 from .event import GridKeyEvent
 
 GRID_HOST = "127.0.0.1"
@@ -32,6 +39,7 @@ class Grid (MonomeDevice):
         self.width = width
         self.height = height
         self.prefix = prefix
+        self.frame = np.zeros((height, width), dtype=np.uint8)
 
         self.dispatcher.map(f"/{self.prefix}/grid/key", self._osc_handle_grid_key)
 
@@ -46,7 +54,7 @@ class Grid (MonomeDevice):
         Args:
             level (int): The intensity, from 1 to 15.
         """
-        self.client.send_message(f"/{self.prefix}/grid/led/intensity", [level])
+        self._send(f"/{self.prefix}/grid/led/intensity", [level])
 
     #--------------------------------------------------------------------------------
     # led_set/led_level_set
@@ -54,11 +62,15 @@ class Grid (MonomeDevice):
 
     def led_set(self, x: int, y: int, on: int):
         self._validate_binary(x, y, on)
-        self.client.send_message(f"/{self.prefix}/grid/led/set", [x, y, on])
+        if self.brightness_table is not None:
+            return self.led_level_set(x, y, on * 15)
+        self.frame[y, x] = on * 15
+        self._send_led_update(f"/{self.prefix}/grid/led/set", [x, y, on], (x, y, 1, 1))
 
     def led_level_set(self, x: int, y: int, level: int):
         self._validate_varibright(x, y, level)
-        self.client.send_message(f"/{self.prefix}/grid/led/level/set", [x, y, level])
+        self.frame[y, x] = level
+        self._send_led_update(f"/{self.prefix}/grid/led/level/set", [x, y, self._output_level(level)], (x, y, 1, 1))
 
     #--------------------------------------------------------------------------------
     # led_all/led_level_all
@@ -66,11 +78,16 @@ class Grid (MonomeDevice):
 
     def led_all(self, on: int):
         self._validate_binary(0, 0, on)
-        self.client.send_message(f"/{self.prefix}/grid/led/all", [on])
+        if self.brightness_table is not None:
+            return self.led_level_all(on * 15)
+        self.frame[:] = on * 15
+        self._send_led_update(f"/{self.prefix}/grid/led/all", [on], REGION_ALL, replaces=True)
 
     def led_level_all(self, level: int):
         self._validate_varibright(0, 0, level)
-        self.client.send_message(f"/{self.prefix}/grid/led/level/all", [level])
+        self.frame[:] = level
+        self._send_led_update(f"/{self.prefix}/grid/led/level/all", [self._output_level(level)],
+                              REGION_ALL, replaces=True)
 
     #--------------------------------------------------------------------------------
     # led_row/led_level_row
@@ -79,23 +96,33 @@ class Grid (MonomeDevice):
     def led_row(self, x_offset: int, y: int, on: list[int]):
         for value in on:
             self._validate_binary(x_offset, y, value)
+        if self.brightness_table is not None:
+            return self.led_level_row(x_offset, y, [value * 15 for value in on])
 
         # For convenience, pad missing trailing entries with zeroes
         if len(on) < self.width:
             on = on + [0] * (self.width - len(on))
         values_packed = self._pack_binary(on)
 
-        self.client.send_message(f"/{self.prefix}/grid/led/row", [x_offset, y, *values_packed])
+        self._update_frame_row(x_offset, y, [value * 15 for value in on])
+        self._send_led_update(f"/{self.prefix}/grid/led/row", [x_offset, y, *values_packed],
+                              (x_offset, y, len(on), 1), replaces=True)
 
     def led_level_row(self, x_offset: int, y: int, levels: list[int]):
-        for level in levels:
-            self._validate_varibright(x_offset, y, level)
+        """
+        Set the levels of a row. `levels` may be a list, or any object supporting the
+        buffer protocol (such as bytes or a uint8 ndarray), which is encoded without copying.
+        """
+        levels = as_level_array(levels)
+        self._validate_varibright_array(x_offset, y, levels)
 
         # For convenience, pad missing trailing entries with zeroes
         if len(levels) < self.width:
-            levels = levels + [0] * (self.width - len(levels))
+            levels = np.pad(levels, (0, self.width - len(levels)))
 
-        self.client.send_message(f"/{self.prefix}/grid/led/level/row", [x_offset, y, *levels])
+        self._update_frame_row(x_offset, y, levels)
+        self._send_led_levels(f"/{self.prefix}/grid/led/level/row", [x_offset, y], self._output_levels(levels),
+                              (x_offset, y, len(levels), 1), replaces=True)
 
     #--------------------------------------------------------------------------------
     # led_col/led_level_col
@@ -104,20 +131,135 @@ class Grid (MonomeDevice):
     def led_col(self, x: int, y_offset: int, on: list[int]):
         for value in on:
             self._validate_binary(x, y_offset, value)
+        if self.brightness_table is not None:
+            return self.led_level_col(x, y_offset, [value * 15 for value in on])
         values_packed = self._pack_binary(on)
-        self.client.send_message(f"/{self.prefix}/grid/led/row", [x, y_offset, *values_packed])
+        self._update_frame_col(x, y_offset, [value * 15 for value in on])
+        self._send_led_update(f"/{self.prefix}/grid/led/col", [x, y_offset, *values_packed],
+                              (x, y_offset, 1, 8 * len(values_packed)), replaces=True)
 
-    def led_level_col(self, x: int, y_offset: int, levels: int):
-        for level in levels:
-            self._validate_varibright(x, y_offset, level)
-        self.client.send_message(f"/{self.prefix}/grid/led/level/col", [x, y_offset, *levels])
+    def led_level_col(self, x: int, y_offset: int, levels: list[int]):
+        """
+        Set the levels of a column. `levels` may be a list, or any object supporting the
+        buffer protocol, which is encoded without copying.
+        """
+        levels = as_level_array(levels)
+        self._validate_varibright_array(x, y_offset, levels)
+        self._update_frame_col(x, y_offset, levels)
+        self._send_led_levels(f"/{self.prefix}/grid/led/level/col", [x, y_offset], self._output_levels(levels),
+                              (x, y_offset, 1, len(levels)), replaces=True)
 
     #--------------------------------------------------------------------------------
     # led_map
     #--------------------------------------------------------------------------------
 
     def led_map(self, x: int, y_offset: int, levels: list[int]):
-        self.client.send_message(f"/{self.prefix}/grid/led/map", [x, y_offset, *levels])
+        """
+        Set the on/off state of an 8x8 quad.
+
+        Args:
+            x (int): The x position of the quad's left edge. Must be a multiple of 8.
+            y_offset (int): The y position of the quad's top edge. Must be a multiple of 8.
+            levels (list[int]): 8 bitmasks, one per row of the quad, where the most significant
+                                bit is the leftmost LED. May be a list, or any object supporting
+                                the buffer protocol (such as bytes), which is encoded without copying.
+        """
+        levels = as_level_array(levels)
+        if len(levels) != 8:
+            raise ValueError("led_map: levels must contain 8 values")
+        if levels.min(initial=0) < 0 or levels.max(initial=0) > 255:
+            raise ValueError("led_map: levels must be between 0 and 255")
+        bits = np.unpackbits(levels.astype(np.uint8)[:, None], axis=1)
+        if self.brightness_table is not None:
+            return self.led_level_map(x, y_offset, (bits * 15).reshape(-1))
+        for row in range(8):
+            self._update_frame_row(x, y_offset + row, bits[row] * 15)
+        self._send_led_levels(f"/{self.prefix}/grid/led/map", [x, y_offset], levels,
+                              (x, y_offset, 8, 8), replaces=True)
+
+    def led_level_map(self, x_offset: int, y_offset: int, levels: list[int]):
+        """
+        Set the levels of an 8x8 quad.
+
+        Args:
+            x_offset (int): The x position of the quad's left edge. Must be a multiple of 8.
+            y_offset (int): The y position of the quad's top edge. Must be a multiple of 8.
+            levels (list[int]): The 64 levels of the quad, in row-major order. May be a list,
+                                or any object supporting the buffer protocol (such as bytes or
+                                a uint8 ndarray), which is encoded without copying.
+        """
+        levels = as_level_array(levels)
+        if len(levels) != 64:
+            raise ValueError("led_level_map: levels must contain 64 values")
+        self._validate_varibright_array(x_offset, y_offset, levels)
+        for row in range(8):
+            self._update_frame_row(x_offset, y_offset + row, levels[row * 8:(row + 1) * 8])
+        self._send_led_levels(f"/{self.prefix}/grid/led/level/map", [x_offset, y_offset], self._output_levels(levels),
+                              (x_offset, y_offset, 8, 8), replaces=True)
+
+    #--------------------------------------------------------------------------------
+    # led_level_frame
+    #--------------------------------------------------------------------------------
+
+    def led_level_frame(self, frame: np.ndarray, force: bool = False):
+        """
+        Set the levels of the entire grid, sending only the 8x8 quads that differ
+        from the current frame.
+
+        Args:
+            frame (np.ndarray): An array of levels, of shape (height, width).
+            force (bool, optional): If True, send every quad regardless of whether it has changed. Defaults to False.
+        """
+        frame = np.asarray(frame, dtype=np.uint8)
+        if frame.shape != self.frame.shape:
+            raise ValueError("led_level_frame: frame must have shape %s" % (self.frame.shape,))
+        if frame.max(initial=0) > 15:
+            raise ValueError("level must be between 0 and 15")
+        for x_offset, y_offset in self._changed_quads(frame, force):
+            quad = frame[y_offset:y_offset + 8, x_offset:x_offset + 8]
+            self.led_level_map(x_offset, y_offset, quad.reshape(-1))
+
+    def _changed_quads(self,
+                       frame: np.ndarray,
+                       force: bool = False,
+                       frame_reference: np.ndarray = None) -> list[tuple[int, int]]:
+        """
+        Returns the (x_offset, y_offset) of each 8x8 quad in which `frame` differs from
+        `frame_reference`, which defaults to the current frame.
+        """
+        if frame_reference is None:
+            frame_reference = self.frame
+        quads_y, quads_x = -(-self.height // 8), -(-self.width // 8)
+        if force:
+            changed = np.ones((quads_y, quads_x), dtype=bool)
+        else:
+            changed = np.zeros((quads_y, quads_x), dtype=bool)
+            y_changed, x_changed = np.nonzero(frame != frame_reference)
+            changed[y_changed // 8, x_changed // 8] = True
+        return [(int(quad_x) * 8, int(quad_y) * 8) for quad_y, quad_x in zip(*np.nonzero(changed))]
+
+    def _send_frame_changes(self, frame_previous: np.ndarray):
+        for x_offset, y_offset in self._changed_quads(self.frame, frame_reference=frame_previous):
+            quad = self.frame[y_offset:y_offset + 8, x_offset:x_offset + 8]
+            self._send_levels(f"/{self.prefix}/grid/led/level/map", [x_offset, y_offset],
+                              self._output_levels(quad.reshape(-1)),
+                              (x_offset, y_offset, 8, 8), replaces=True)
+
+    #--------------------------------------------------------------------------------
+    # Frame mirror
+    #--------------------------------------------------------------------------------
+
+    def _update_frame_row(self, x_offset: int, y: int, levels: list[int]):
+        if y not in range(self.height):
+            return
+        levels = levels[:max(0, self.width - x_offset)]
+        self.frame[y, x_offset:x_offset + len(levels)] = levels
+
+    def _update_frame_col(self, x: int, y_offset: int, levels: list[int]):
+        if x not in range(self.width):
+            return
+        levels = levels[:max(0, self.height - y_offset)]
+        self.frame[y_offset:y_offset + len(levels), x] = levels
 
     #--------------------------------------------------------------------------------
     # Validation and packing
@@ -139,6 +281,14 @@ class Grid (MonomeDevice):
         if level not in range(16):
             raise ValueError("level must be between 0 and 15")
 
+    def _validate_varibright_array(self, x: int, y: int, levels: np.ndarray):
+        if x not in range(self.width):
+            raise ValueError(f"x must be between 0 and {self.width - 1}")
+        if y not in range(self.height):
+            raise ValueError(f"y must be between 0 and {self.height - 1}")
+        if len(levels) and (levels.min() < 0 or levels.max() > 15):
+            raise ValueError("level must be between 0 and 15")
+
     def _pack_binary(self, on: list[int]):
         if len(on) not in [8, 16]:
             raise ValueError("led_row: Invalid length of on (must be 8 or 16)")
@@ -148,6 +298,29 @@ class Grid (MonomeDevice):
             values_packed.append(sum(j << i for i, j in enumerate(reversed(on[8:16]))))
         return values_packed
 
+    #--------------------------------------------------------------------------------
+    # Batch handlers
+    #--------------------------------------------------------------------------------
+
+    def add_batch_handler(self,
+                          handler: Callable[[np.ndarray], None],
+                          max_batch: int = DEFAULT_MAX_BATCH,
+                          max_latency_ms: float = DEFAULT_MAX_LATENCY_MS) -> BatchHandler:
+        """
+        Add a handler to receive key events in batches, as a structured array of
+        GRID_KEY_BATCH_DTYPE records, with fields timestamp, x, y and down.
+
+        Args:
+            handler (Callable): A function that is called with each batch.
+            max_batch (int, optional): The maximum number of events per batch. Defaults to 256.
+            max_latency_ms (float, optional): The maximum time that an event is held before its
+                                              batch is delivered, in milliseconds. Defaults to 5.
+
+        Returns:
+            BatchHandler: The batcher, which can be flushed manually.
+        """
+        return self._add_batch_handler(EVENT_TYPE_GRID_KEY, handler, GRID_KEY_BATCH_DTYPE, max_batch, max_latency_ms)
+
     #--------------------------------------------------------------------------------
     # OSC handlers
     #--------------------------------------------------------------------------------
@@ -0,0 +1,229 @@
+from __future__ import annotations
+
+import threading
+import numpy as np
+
+from typing import Optional, TYPE_CHECKING
+if TYPE_CHECKING:
+    from .ui import GridUI
+
+LAYER_BLEND_MODES = ["over", "max", "add"]
+
+
+class GridLayer:
+    def __init__(self,
+                 compositor: GridCompositor,
+                 blend: str = "over",
+                 opacity: float = 1.0):
+        """
+        A layer composited over the grid's pages, such as a playhead or a menu.
+
+        Each layer has its own frame of levels, and a mask of the LEDs that it has drawn;
+        LEDs outside the mask are transparent. Drawing to a layer recomposites the grid,
+        and sends only the 8x8 quads whose composited levels have changed.
+
+        Args:
+            compositor (GridCompositor): The compositor that owns the layer.
+            blend (str, optional): How the layer combines with the layers beneath it:
+                                   "over" (replace, mixed by `opacity`), "max" (the brighter
+                                   of the two levels) or "add" (the sum, saturating at 15).
+                                   Defaults to "over".
+            opacity (float, optional): The opacity of the layer, between 0 and 1. Defaults to 1.
+        """
+        if blend not in LAYER_BLEND_MODES:
+            raise ValueError("Invalid blend mode: %s" % blend)
+        self.compositor = compositor
+        self.width = compositor.grid.width
+        self.height = compositor.grid.height
+        self.frame = np.zeros((self.height, self.width), dtype=np.uint8)
+        self.mask = np.zeros((self.height, self.width), dtype=bool)
+        self._blend = blend
+        self._opacity = opacity
+        self._visible = True
+
+    def get_blend(self) -> str:
+        return self._blend
+
+    def set_blend(self, blend: str):
+        if blend not in LAYER_BLEND_MODES:
+            raise ValueError("Invalid blend mode: %s" % blend)
+        self._blend = blend
+        self.compositor.update()
+
+    blend = property(get_blend, set_blend)
+
+    def get_opacity(self) -> float:
+        return self._opacity
+
+    def set_opacity(self, opacity: float):
+        self._opacity = opacity
+        self.compositor.update()
+
+    opacity = property(get_opacity, set_opacity)
+
+    def get_visible(self) -> bool:
+        return self._visible
+
+    def set_visible(self, visible: bool):
+        self._visible = visible
+        self.compositor.update()
+
+    visible = property(get_visible, set_visible)
+
+    def led_level_set(self, x: int, y: int, level: int):
+        self._validate_position(x, y)
+        self._validate(level)
+        self.frame[y, x] = level
+        self.mask[y, x] = True
+        self.compositor.update()
+
+    def led_level_all(self, level: int):
+        self._validate(level)
+        self.frame[:] = level
+        self.mask[:] = True
+        self.compositor.update()
+
+    def led_level_row(self, x_offset: int, y: int, levels: list[int]):
+        levels = np.asarray(levels)
+        self._validate_position(x_offset, y)
+        self._validate_position(x_offset + len(levels) - 1, y)
+        self._validate(levels)
+        self.frame[y, x_offset:x_offset + len(levels)] = levels
+        self.mask[y, x_offset:x_offset + len(levels)] = True
+        self.compositor.update()
+
+    def led_level_col(self, x: int, y_offset: int, levels: list[int]):
+        levels = np.asarray(levels)
+        self._validate_position(x, y_offset)
+        self._validate_position(x, y_offset + len(levels) - 1)
+        self._validate(levels)
+        self.frame[y_offset:y_offset + len(levels), x] = levels
+        self.mask[y_offset:y_offset + len(levels), x] = True
+        self.compositor.update()
+
+    def led_level_frame(self, frame: np.ndarray, mask: Optional[np.ndarray] = None):
+        """
+        Set the levels of the whole layer.
+
+        Args:
+            frame (np.ndarray): An array of levels, of shape (height, width).
+            mask (np.ndarray, optional): A boolean array of the LEDs that the layer covers.
+                                         Defaults to the LEDs whose level is non-zero.
+        """
+        frame = np.asarray(frame)
+        if frame.shape != self.frame.shape:
+            raise ValueError("led_level_frame: frame must have shape %s" % (self.frame.shape,))
+        self._validate(frame)
+        self.frame[:] = frame
+        self.mask[:] = (frame > 0) if mask is None else mask
+        self.compositor.update()
+
+    def erase(self, x: int, y: int):
+        """
+        Make an LED of the layer transparent.
+        """
+        self._validate_position(x, y)
+        self.frame[y, x] = 0
+        self.mask[y, x] = False
+        self.compositor.update()
+
+    def clear(self):
+        """
+        Make the whole layer transparent.
+        """
+        self.frame[:] = 0
+        self.mask[:] = False
+        self.compositor.update()
+
+    def _validate_position(self, x: int, y: int):
+        if x not in range(self.width):
+            raise ValueError(f"x must be between 0 and {self.width - 1}")
+        if y not in range(self.height):
+            raise ValueError(f"y must be between 0 and {self.height - 1}")
+
+    def _validate(self, levels):
+        if np.any(np.asarray(levels) < 0) or np.any(np.asarray(levels) > 15):
+            raise ValueError("level must be between 0 and 15")
+
+    def __repr__(self):
+        return f"GridLayer(blend={self._blend}, opacity={self._opacity}, visible={self._visible})"
+
+
+class GridCompositor:
+    def __init__(self, grid: GridUI):
+        """
+        Composites a stack of GridLayers over the grid's page frame.
+
+        While a compositor is attached, `grid.frame` holds the page layer: the levels
+        drawn by the current page. `output` holds the composited levels, as last sent
+        to the device.
+
+        Args:
+            grid (GridUI): The grid.
+        """
+        self.grid = grid
+        self.layers: list[GridLayer] = []
+        self.output = grid.frame.copy()
+        self.dirty = False
+        self.lock = threading.RLock()
+
+    def add_layer(self, blend: str = "over", opacity: float = 1.0) -> GridLayer:
+        """
+        Add a layer at the top of the stack.
+        """
+        layer = GridLayer(self, blend=blend, opacity=opacity)
+        with self.lock:
+            self.layers.append(layer)
+        return layer
+
+    def remove_layer(self, layer: GridLayer):
+        with self.lock:
+            self.layers.remove(layer)
+        self.update()
+
+    def composite(self) -> np.ndarray:
+        """
+        Returns the page frame with each visible layer blended over it, bottom first.
+        """
+        output = self.grid.frame.astype(np.int16)
+        for layer in self.layers:
+            if not layer._visible or not layer.mask.any():
+                continue
+            levels = layer.frame.astype(np.int16)
+            if layer._blend == "over":
+                if layer._opacity < 1.0:
+                    levels = np.rint(output + (levels - output) * layer._opacity).astype(np.int16)
+            elif layer._blend == "max":
+                levels = np.maximum(output, np.rint(levels * layer._opacity).astype(np.int16))
+            elif layer._blend == "add":
+                levels = np.minimum(output + np.rint(levels * layer._opacity).astype(np.int16), 15)
+            np.copyto(output, levels, where=layer.mask)
+        return output.astype(np.uint8)
+
+    def update(self):
+        """
+        Recomposite and send the changes, or if the grid is within a batch(), defer
+        them until the batch ends.
+        """
+        if self.grid._batch_depth > 0:
+            self.dirty = True
+            return
+        self.flush()
+
+    def flush(self, force: bool = False):
+        grid = self.grid
+        with self.lock:
+            self.dirty = False
+            output = self.composite()
+            changed_quads = grid._changed_quads(output, force, frame_reference=self.output)
+            if not changed_quads:
+                return
+            for x_offset, y_offset in changed_quads:
+                quad = output[y_offset:y_offset + 8, x_offset:x_offset + 8]
+                grid._send_levels(f"/{grid.prefix}/grid/led/level/map", [x_offset, y_offset],
+                                  grid._output_levels(quad.reshape(-1)),
+                                  (x_offset, y_offset, 8, 8), replaces=True)
+            self.output = output
+            frame_log = grid.frame_log
+            if frame_log is not None:
+                frame_log.append(output)
@@ -1,5 +1,23 @@
 from .page import GridPage
-from .freeform import GridPageFreeform
-from .keyboard import GridPageKeyboard
-from .scale_matrix import GridPageScaleMatrix
-from .levels import GridPageHorizontalLevels
\ No newline at end of file
+
+#--------------------------------------------------------------------------------
+# Page classes are imported on first access, so that importing the package does
+# not import every page type.
+#--------------------------------------------------------------------------------
+_lazy_classes = {
+    "GridPageFreeform": ".freeform",
+    "GridPageKeyboard": ".keyboard",
+    "GridPageScaleMatrix": ".scale_matrix",
+    "GridPageFaders": ".faders",
+    "FaderBank": ".faders",
+    "GridPageHorizontalLevels": ".levels",
+    "GridPageSequencer": ".sequencer",
+    "GridPageCanvas": ".canvas",
+}
+
+
+def __getattr__(name: str):
+    if name in _lazy_classes:
+        from importlib import import_module
+        return getattr(import_module(_lazy_classes[name], __name__), name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
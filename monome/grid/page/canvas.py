@@ -0,0 +1,155 @@
+from __future__ import annotations
+
+import logging
+import numpy as np
+
+from .page import GridPage
+from ..event import GridUIKeyEvent
+from ...snapshot import SnapshotBuffer
+
+from typing import Callable, TYPE_CHECKING
+if TYPE_CHECKING:
+    from ..ui import GridUI
+
+logger = logging.getLogger(__name__)
+
+
+class GridPageCanvas (GridPage):
+    def __init__(self,
+                 grid: GridUI,
+                 canvas_width: int = 64,
+                 canvas_height: int = 32,
+                 handler: Callable = None):
+        """
+        A page backed by a virtual canvas of levels larger than the grid, of which a
+        grid-sized viewport is displayed. Levels are set in canvas coordinates, and key
+        events are mapped back into canvas coordinates before being passed to handlers.
+
+        Moving the viewport slices the canvas and sends only the 8x8 quads of the grid
+        whose levels have changed. Snapshots are taken lazily, so that setting cells one
+        at a time does not copy the whole canvas for each cell.
+
+        Args:
+            grid (GridUI): The GridUI.
+            canvas_width (int, optional): The width of the canvas. Defaults to 64.
+            canvas_height (int, optional): The height of the canvas. Defaults to 32.
+            handler (Callable, optional): A handler to receive GridUIKeyEvents, in canvas coordinates.
+        """
+        super().__init__(grid)
+
+        if canvas_width < self.width or canvas_height < self.height:
+            raise ValueError("Canvas must be at least as large as the grid")
+        self.canvas = np.zeros((canvas_height, canvas_width), dtype=np.uint8)
+        self._snapshot = SnapshotBuffer(self.canvas)
+        self._snapshot_dirty = False
+        self.viewport_x = 0
+        self.viewport_y = 0
+        if handler is not None:
+            self.add_handler(handler)
+
+    @property
+    def canvas_width(self) -> int:
+        return self.canvas.shape[1]
+
+    @property
+    def canvas_height(self) -> int:
+        return self.canvas.shape[0]
+
+    @property
+    def viewport(self) -> np.ndarray:
+        """
+        The displayed region of the canvas, as a view of shape (height, width).
+        """
+        return self.canvas[self.viewport_y:self.viewport_y + self.height,
+                           self.viewport_x:self.viewport_x + self.width]
+
+    def snapshot(self) -> np.ndarray:
+        """
+        Returns the canvas as an immutable array, safe to read from any thread.
+        """
+        with self._snapshot.lock:
+            if self._snapshot_dirty:
+                self._snapshot_dirty = False
+                self._snapshot.publish(self.canvas)
+            return self._snapshot.snapshot()
+
+    def set_viewport(self, x: int, y: int):
+        """
+        Move the viewport so that its top-left corner is at (x, y) on the canvas.
+        The position is clamped so that the viewport lies within the canvas.
+        """
+        x = max(0, min(x, self.canvas_width - self.width))
+        y = max(0, min(y, self.canvas_height - self.height))
+        if (x, y) == (self.viewport_x, self.viewport_y):
+            return
+        self.viewport_x = x
+        self.viewport_y = y
+        if self.is_current:
+            self.draw()
+
+    def scroll(self, dx: int, dy: int):
+        """
+        Move the viewport by (dx, dy).
+        """
+        self.set_viewport(self.viewport_x + dx, self.viewport_y + dy)
+
+    def led_level_set(self, x: int, y: int, level: int):
+        """
+        Set the level of a cell of the canvas, updating the grid if it is within the viewport.
+        """
+        if x not in range(self.canvas_width):
+            raise ValueError(f"x must be between 0 and {self.canvas_width - 1}")
+        if y not in range(self.canvas_height):
+            raise ValueError(f"y must be between 0 and {self.canvas_height - 1}")
+        if level not in range(16):
+            raise ValueError("level must be between 0 and 15")
+        with self._snapshot.lock:
+            self.canvas[y, x] = level
+            self._snapshot_dirty = True
+        grid_x, grid_y = x - self.viewport_x, y - self.viewport_y
+        if self.is_current and 0 <= grid_x < self.width and 0 <= grid_y < self.height:
+            self.grid.led_level_set(grid_x, grid_y, level)
+
+    def led_level_canvas(self, levels: np.ndarray):
+        """
+        Set the levels of the whole canvas, from an array of shape (canvas_height, canvas_width).
+        """
+        levels = np.asarray(levels)
+        if levels.shape != self.canvas.shape:
+            raise ValueError("led_level_canvas: levels must have shape %s" % (self.canvas.shape,))
+        if levels.min(initial=0) < 0 or levels.max(initial=0) > 15:
+            raise ValueError("level must be between 0 and 15")
+        with self._snapshot.lock:
+            self.canvas[:] = levels
+            self._snapshot_dirty = True
+        if self.is_current:
+            self.draw()
+
+    def _handle_grid_key(self, x: int, y: int, down: int):
+        event = GridUIKeyEvent(self, x + self.viewport_x, y + self.viewport_y, down)
+        for handler in self.handlers:
+            handler(event)
+
+    def draw(self):
+        self.grid.led_level_frame(self.viewport)
+
+
+if __name__ == "__main__":
+    from .. import ui
+    import time
+
+    gridui = ui.GridUI()
+    page = gridui.add_page(mode="canvas",
+                           canvas_width=64,
+                           canvas_height=32)
+    page.led_level_canvas(np.indices(page.canvas.shape).sum(axis=0) % 16)
+
+    @page.handler
+    def _(event):
+        if event.down:
+            print(f"Canvas key: {event.x}, {event.y}")
+
+    while True:
+        for x in range(page.canvas_width - page.width):
+            page.set_viewport(x, 0)
+            time.sleep(0.1)
@@ -0,0 +1,200 @@
+from __future__ import annotations
+
+import logging
+import numpy as np
+
+from .page import GridPage
+from ...snapshot import SnapshotBuffer
+
+from typing import Callable, Optional, TYPE_CHECKING
+if TYPE_CHECKING:
+    from ..ui import GridUI
+
+logger = logging.getLogger(__name__)
+
+
+class FaderBank:
+    def __init__(self, num_faders: int, initial: int = 0):
+        """
+        The levels of a bank of faders, stored in a single array.
+        A bank can be shared between several GridPageFaders, on one or more Grids, each of
+        which displays a contiguous slice of the bank.
+
+        Args:
+            num_faders (int): The number of faders.
+            initial (int, optional): The initial level of every fader. Defaults to 0.
+        """
+        self.levels = np.full(num_faders, initial, dtype=np.int32)
+        self.pages: list[GridPageFaders] = []
+        self._snapshot = SnapshotBuffer(self.levels)
+
+    def __len__(self):
+        return len(self.levels)
+
+    def set_levels(self, start: int, levels: np.ndarray):
+        """
+        Set the levels of the faders from index `start`, and redraw the pages that display them.
+
+        Args:
+            start (int): The index of the first fader to set.
+            levels (np.ndarray): The new levels.
+        """
+        self.levels[start:start + len(levels)] = levels
+        self._snapshot.publish(self.levels)
+        for page in self.pages:
+            if page.bank_offset < start + len(levels) and start < page.bank_offset + page.num_faders:
+                page._draw_changed()
+
+    def snapshot(self) -> np.ndarray:
+        """
+        Returns the levels of all faders as an immutable array, safe to read from any thread.
+        """
+        return self._snapshot.snapshot()
+
+
+class GridPageFaders (GridPage):
+    def __init__(self,
+                 grid: GridUI,
+                 num_faders: Optional[int] = None,
+                 orientation: str = "horizontal",
+                 bipolar: bool = False,
+                 bank: Optional[FaderBank] = None,
+                 bank_offset: int = 0,
+                 handler: Callable = None):
+        """
+        A page of faders, one per row (horizontal) or column (vertical).
+        Pressing a key sets the fader's level to that key's position. Vertical faders have
+        level 0 at the bottom. Bipolar faders are lit from the centre to the current level.
+
+        Frames are rendered from the levels array in a single vectorised operation, and only
+        the rows (horizontal) or columns (vertical) that differ from the device are sent.
+
+        Args:
+            grid (GridUI): The GridUI.
+            num_faders (int, optional): The number of faders. Defaults to the number of rows or columns.
+            orientation (str, optional): Either "horizontal" or "vertical". Defaults to "horizontal".
+            bipolar (bool, optional): Whether faders are bipolar. Defaults to False.
+            bank (FaderBank, optional): A bank to display faders from, which may be shared with other pages.
+                                        Defaults to a new bank.
+            bank_offset (int, optional): The index within the bank of the page's first fader. Defaults to 0.
+            handler (Callable, optional): A handler to receive GridUIFaderEvents.
+        """
+        super().__init__(grid)
+
+        if orientation not in ["horizontal", "vertical"]:
+            raise ValueError("Invalid orientation: %s" % orientation)
+        self.orientation = orientation
+        self.bipolar = bipolar
+        if orientation == "horizontal":
+            self.length, max_faders = self.width, self.height
+        else:
+            self.length, max_faders = self.height, self.width
+
+        if num_faders is None:
+            num_faders = max_faders if bank is None else min(max_faders, len(bank) - bank_offset)
+        if num_faders > max_faders:
+            raise ValueError("A %s page can display at most %d faders" % (orientation, max_faders))
+        if bank is None:
+            bank = FaderBank(num_faders, initial=self.length // 2 if bipolar else 0)
+        if bank_offset < 0 or bank_offset + num_faders > len(bank):
+            raise ValueError("Faders extend beyond the end of the bank")
+
+        self.bank = bank
+        self.bank_offset = bank_offset
+        self.num_faders = num_faders
+        self.bank.pages.append(self)
+        if handler is not None:
+            self.add_handler(handler)
+
+    def get_levels(self) -> np.ndarray:
+        return self.bank.levels[self.bank_offset:self.bank_offset + self.num_faders]
+
+    def set_levels(self, levels: list[int]):
+        if len(levels) != self.num_faders:
+            raise ValueError("Length of levels must match number of levels")
+        for level in levels:
+            if level < 0 or level >= self.length:
+                raise ValueError("Level must be between 0 and %d" % (self.length - 1))
+        self.bank.set_levels(self.bank_offset, np.asarray(levels))
+
+    levels = property(get_levels, set_levels)
+
+    def set_level(self, index: int, level: int):
+        if level < 0 or level >= self.length:
+            raise ValueError("Level must be between 0 and %d" % (self.length - 1))
+        self.bank.set_levels(self.bank_offset + index, [level])
+
+    def snapshot(self) -> np.ndarray:
+        """
+        Returns the page's fader levels as an immutable array, safe to read from any thread.
+        """
+        return self.bank.snapshot()[self.bank_offset:self.bank_offset + self.num_faders]
+
+    def _handle_grid_key(self, x: int, y: int, down: int):
+        from ..event import GridUIFaderEvent
+
+        if not down:
+            return
+        if self.orientation == "horizontal":
+            fader, level = y, x
+        else:
+            fader, level = x, self.height - 1 - y
+        if fader >= self.num_faders:
+            return
+
+        self.bank.set_levels(self.bank_offset + fader, [level])
+        event = GridUIFaderEvent(self, x, y, down, fader, level)
+        for handler in self.handlers:
+            handler(event)
+
+    def render(self) -> np.ndarray:
+        """
+        Returns the page's LED levels, as an array of shape (height, width).
+        """
+        positions = np.arange(self.length)
+        levels = self.levels[:, None]
+        if self.bipolar:
+            centre = self.length // 2
+            lit = (positions >= np.minimum(levels, centre)) & (positions <= np.maximum(levels, centre))
+        else:
+            lit = positions <= levels
+        faders = np.where(lit, self.grid.led_intensity_high, self.grid.led_intensity_low).astype(np.uint8)
+
+        frame = np.zeros((self.height, self.width), dtype=np.uint8)
+        if self.orientation == "horizontal":
+            frame[:self.num_faders, :] = faders
+        else:
+            frame[:, :self.num_faders] = faders.T[::-1]
+        return frame
+
+    def _draw_changed(self):
+        if not self.is_current:
+            return
+        frame = self.render()
+        changed = frame != self.grid.frame
+        if self.orientation == "horizontal":
+            for y in np.flatnonzero(changed.any(axis=1)):
+                self.grid.led_level_row(0, int(y), frame[y])
+        else:
+            for x in np.flatnonzero(changed.any(axis=0)):
+                self.grid.led_level_col(int(x), 0, frame[:, x])
+
+    def draw(self):
+        self.grid.led_level_frame(self.render())
+
+
+if __name__ == "__main__":
+    from .. import ui
+    import time
+
+    def fader_handler(event):
+        print(f"Fader handler: page={event.page}, fader={event.fader}, level={event.level}")
+
+    gridui = ui.GridUI()
+    page = gridui.add_page(mode="faders",
+                           orientation="vertical",
+                           bipolar=True,
+                           handler=fader_handler)
+
+    while True:
+        time.sleep(1)
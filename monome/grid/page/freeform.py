@@ -2,9 +2,11 @@ from __future__ import annotations
 
 import time
 import logging
+import numpy as np
 
 from .page import GridPage
 from ..event import GridUIKeyEvent
+from ...snapshot import SnapshotBuffer
 
 from dataclasses import dataclass
 from typing import TYPE_CHECKING, Callable
@@ -65,6 +67,20 @@ class GridUIKeyRadioEvent(GridUIKeyEvent):
         return f"GridUIKeyRadioEvent(page={self.page}, x={self.x}, y={self.y}, down={self.down}, group={self.group}, selected_index={self.selected_index})"
 
 
+#--------------------------------------------------------------------------------
+# Control modes, as stored in GridPageFreeform.control_modes
+#--------------------------------------------------------------------------------
+CONTROL_MODE_NONE = 0
+CONTROL_MODE_MOMENTARY = 1
+CONTROL_MODE_TOGGLE = 2
+CONTROL_MODE_RADIO = 3
+CONTROL_MODES = {
+    "momentary": CONTROL_MODE_MOMENTARY,
+    "toggle": CONTROL_MODE_TOGGLE,
+    "radio": CONTROL_MODE_RADIO,
+}
+
+
 class GridPageFreeform (GridPage):
     def __init__(self,
                  grid: GridUI):
@@ -72,62 +88,105 @@ class GridPageFreeform (GridPage):
 
         self.keys = [[GridUIControl(grid, x, y) for x in range(grid.width)] for y in range(grid.height)]
         self.control_groups = []
+
+        #--------------------------------------------------------------------------------
+        # The render plan: the mode and state of every key, as arrays, so that drawing
+        # the page is a masked assignment rather than a walk over the keys.
+        #--------------------------------------------------------------------------------
+        self.control_modes = np.zeros((grid.height, grid.width), dtype=np.uint8)
+        self.control_states = np.zeros((grid.height, grid.width), dtype=np.uint8)
+        self._snapshot = SnapshotBuffer(self.control_states)
+        self._mode_handlers = {
+            "toggle": self._handle_toggle_key,
+            "momentary": self._handle_momentary_key,
+            "radio": self._handle_radio_key,
+        }
+
+    def snapshot(self) -> np.ndarray:
+        """
+        Returns the states of all keys as an immutable array of shape (height, width),
+        safe to read from any thread.
+        """
+        return self._snapshot.snapshot()
+
+    def _publish_snapshot(self):
+        self._snapshot.publish(self.control_states)
+
+    def _set_state(self, key: GridUIControl, state: int):
+        key.state = state
+        self.control_states[key.y, key.x] = state
     
     def _handle_grid_key(self, x: int, y: int, down: int):
-        from ..event import GridUIKeyEvent
-        
         logger.debug("Grid key: %d, %d, %s" % (x, y, down))
         key = self.keys[y][x]
+        mode_handler = self._mode_handlers.get(key.mode)
+        if mode_handler is not None:
+            mode_handler(key, down)
+
+    def _handle_toggle_key(self, key: GridUIControl, down: int):
+        if down:
+            self._set_state(key, 1 - key.state)
+            self._publish_snapshot()
+            level = self.grid.led_intensity_high if key.state else self.grid.led_intensity_low
+            self.grid.led_level_set(key.x, key.y, level)
+            if key.handler:
+                event = GridUIKeyEvent(self, key.x, key.y, key.state)
+                key.handler(event)
+
+    def _handle_momentary_key(self, key: GridUIControl, down: int):
+        if down:
+            self.grid.led_level_set(key.x, key.y, self.grid.led_intensity_high)
+        else:
+            self.grid.led_level_set(key.x, key.y, self.grid.led_intensity_low)
+        if key.handler:
+            event = GridUIKeyEvent(self, key.x, key.y, down)
+            key.handler(event)
 
-        if key.mode is None:
-            return
-        elif key.mode == "toggle":
-            if down:
-                key.state = 1 - key.state
-                self.grid.led_level_set(x, y, self.grid.led_intensity_high if key.state else self.grid.led_intensity_low)
-                if key.handler:
-                    event = GridUIKeyEvent(self, x, y, key.state)
-                    key.handler(event)
-        elif key.mode == "momentary":
-            if down:
-                self.grid.led_level_set(x, y, self.grid.led_intensity_high)
-            else:
-                self.grid.led_level_set(x, y, self.grid.led_intensity_low)
+    def _handle_radio_key(self, key: GridUIControl, down: int):
+        if down:
+            group = key.group
+            for other_key in group.controls:
+                if other_key.state:
+                    self._set_state(other_key, 0)
+                    self.grid.led_level_set(other_key.x, other_key.y, self.grid.led_intensity_low)
+            self._set_state(key, 1)
+            self._publish_snapshot()
+            self.grid.led_level_set(key.x, key.y, self.grid.led_intensity_high)
+            selected_index = group.controls.index(key)
             if key.handler:
-                event = GridUIKeyEvent(self, x, y, down)
+                event = GridUIKeyRadioEvent(self, key.x, key.y, down, group=group, selected_index=selected_index)
                 key.handler(event)
-        elif key.mode == "radio":
-            if down:
-                group = key.group
-                for other_key in group.controls:
-                    if other_key.state:
-                        other_key.state = 0
-                        self.grid.led_level_set(other_key.x, other_key.y, self.grid.led_intensity_low)
-                key.state = 1
-                self.grid.led_level_set(key.x, key.y, self.grid.led_intensity_high)
-                selected_index = group.controls.index(key)
-                if key.handler:
-                    event = GridUIKeyRadioEvent(self, x, y, down, group=group, selected_index=selected_index)
-                    key.handler(event)
     
     def add_control(self, mode: str, x: int, y: int, handler: Callable, group: GridUIControlGroup = None):
+        self._add_control(mode, x, y, handler, group)
+        self.draw()
+
+    def _add_control(self, mode: str, x: int, y: int, handler: Callable, group: GridUIControlGroup = None):
+        if mode not in CONTROL_MODES:
+            raise ValueError("Invalid control mode: %s" % mode)
         key = self.keys[y][x]
         if key.mode is not None:
             raise ValueError("Key already has a control assigned (%d, %d)" % (x, y))
         key.mode = mode
         key.handler = handler
         key.group = group
+        self.control_modes[y, x] = CONTROL_MODES[mode]
         if group:
             group.controls.append(key)
             if len(group.controls) == 1:
-                key.state = 1
-        self.draw()
+                self._set_state(key, 1)
+                self._publish_snapshot()
     
     def remove_control(self, x: int, y: int):
         key = self.keys[y][x]
+        if key.group is not None and key in key.group.controls:
+            key.group.controls.remove(key)
         key.mode = None
         key.handler = None
         key.group = None
+        self.control_modes[y, x] = CONTROL_MODE_NONE
+        self._set_state(key, 0)
+        self._publish_snapshot()
         self.draw()
 
     # To enable @control_for_key decorator
@@ -135,19 +194,96 @@ class GridPageFreeform (GridPage):
         def wrapper(handler):
             self.add_control_for_key(mode, x, y, handler)
         return wrapper
+
+    def load_layout(self, layout: dict, handlers: dict[str, Callable] = None):
+        """
+        Add the controls described by a layout, then draw the page once.
+
+        A layout is a dict (for example, loaded from YAML or JSON) with any of the keys:
+         - "controls": a list of single keys: {"mode", "x", "y", "handler"}
+         - "regions": a list of rectangles of keys sharing a mode and handler:
+                      {"mode", "x", "y", "width", "height", "handler"}
+         - "groups": a list of radio groups, each a rectangle of keys, in row-major order:
+                     {"x", "y", "width", "height", "handler"}
+
+        Each "handler" may be a callable, or the name of a handler in `handlers`.
+
+        Example:
+            page.load_layout({
+                "controls": [{"mode": "toggle", "x": 0, "y": 0, "handler": "mute"}],
+                "regions": [{"mode": "momentary", "x": 0, "y": 4, "width": 8, "height": 4, "handler": "pad"}],
+                "groups": [{"x": 0, "y": 2, "width": 4, "height": 1, "handler": "waveform"}],
+            }, handlers={"mute": on_mute, "pad": on_pad, "waveform": on_waveform})
+
+        Args:
+            layout (dict): The layout.
+            handlers (dict[str, Callable], optional): Handlers, by the names used in the layout.
+
+        Raises:
+            ValueError: If the layout is invalid, in which case the page is left unchanged.
+        """
+        handlers = handlers or {}
+
+        def get_handler(spec: dict) -> Callable:
+            handler = spec.get("handler")
+            if isinstance(handler, str):
+                if handler not in handlers:
+                    raise ValueError("Unknown handler in layout: %s" % handler)
+                return handlers[handler]
+            return handler
+
+        def get_keys(spec: dict) -> list[tuple[int, int]]:
+            return [(x, y)
+                    for y in range(spec["y"], spec["y"] + spec.get("height", 1))
+                    for x in range(spec["x"], spec["x"] + spec.get("width", 1))]
+
+        #--------------------------------------------------------------------------------
+        # Compile and validate the whole layout before changing the page, so that an
+        # invalid layout leaves the page as it was.
+        #--------------------------------------------------------------------------------
+        controls = []
+        for spec in layout.get("controls", []):
+            controls.append((spec["mode"], spec["x"], spec["y"], get_handler(spec), None))
+        for spec in layout.get("regions", []):
+            handler = get_handler(spec)
+            controls.extend((spec["mode"], x, y, handler, None) for x, y in get_keys(spec))
+        group_specs = layout.get("groups", [])
+        for group_index, spec in enumerate(group_specs):
+            handler = get_handler(spec)
+            controls.extend(("radio", x, y, handler, group_index) for x, y in get_keys(spec))
+
+        assigned = set()
+        for mode, x, y, handler, group_index in controls:
+            if mode not in CONTROL_MODES:
+                raise ValueError("Invalid control mode: %s" % mode)
+            if not (0 <= x < self.width and 0 <= y < self.height):
+                raise ValueError("Control is outside the grid (%d, %d)" % (x, y))
+            if self.keys[y][x].mode is not None or (x, y) in assigned:
+                raise ValueError("Key already has a control assigned (%d, %d)" % (x, y))
+            assigned.add((x, y))
+
+        groups = [self.add_control_group() for _ in group_specs]
+        for mode, x, y, handler, group_index in controls:
+            group = groups[group_index] if group_index is not None else None
+            self._add_control(mode, x, y, handler, group)
+        self.draw()
+
+    def load_layout_file(self, path: str, handlers: dict[str, Callable] = None):
+        """
+        Load a layout from a YAML file. See load_layout() for the format. Requires PyYAML.
+        """
+        import yaml
+
+        with open(path, "r") as fd:
+            layout = yaml.safe_load(fd)
+        self.load_layout(layout, handlers)
     
     def draw(self):
-        for y, row in enumerate(self.keys):
-            for x, key in enumerate(row):
-                if key.mode is None:
-                    pass
-                elif key.mode == "momentary":
-                    self.grid.led_level_set(key.x, key.y, self.grid.led_intensity_low)
-                elif key.mode == "toggle":
-                    self.grid.led_level_set(key.x, key.y, self.grid.led_intensity_high if key.state else self.grid.led_intensity_low)
-                elif key.mode == "radio":
-                    self.grid.led_level_set(key.x, key.y, self.grid.led_intensity_high if key.state else self.grid.led_intensity_low)
-
+        mask = self.control_modes != CONTROL_MODE_NONE
+        lit = (self.control_states != 0) & (self.control_modes != CONTROL_MODE_MOMENTARY)
+        frame = self.grid.frame.copy()
+        frame[mask] = np.where(lit, self.grid.led_intensity_high, self.grid.led_intensity_low)[mask]
+        self.grid.led_level_frame(frame)
     
     def add_control_group(self):
         control_group = GridUIControlGroup(len(self.control_groups), [])
@@ -1,6 +1,7 @@
 from __future__ import annotations
 
 import logging
+import numpy as np
 
 from typing import Callable, TYPE_CHECKING
 if TYPE_CHECKING:
@@ -15,6 +16,7 @@ class GridPage:
 
         self.grid = grid
         self.handlers: list[Callable] = []
+        self.gesture_handlers: list[Callable] = []
     
     def __str__(self):
         return str(self.__class__.__name__)
@@ -27,11 +29,43 @@ class GridPage:
     def height(self):
         return self.grid.height
 
+    @property
+    def is_current(self) -> bool:
+        return len(self.grid.pages) > 0 and self.grid.current_page is self
+
     def add_handler(self, callback: Callable):
         self.handlers.append(callback)
     
     handler = add_handler
 
+    def add_gesture_handler(self, callback: Callable):
+        """
+        Add a handler to receive gesture events (long press, double tap, chord and range)
+        while this page is current. Requires gestures to be enabled with GridUI.enable_gestures().
+        """
+        self.gesture_handlers.append(callback)
+
+    gesture_handler = add_gesture_handler
+
+    def add_tick_callback(self, callback: Callable[[float], None]):
+        """
+        Register a callback with the shared TickScheduler, to animate this page.
+        The callback is called with the time since the previous tick, while this page is current.
+        """
+        from ...scheduler import TickScheduler
+        TickScheduler().add_tick_callback(callback, self.grid, self)
+
+    def remove_tick_callback(self, callback: Callable[[float], None]):
+        from ...scheduler import TickScheduler
+        TickScheduler().remove_tick_callback(callback)
+
+    def snapshot(self) -> np.ndarray:
+        """
+        Returns the page's state as an immutable array. This can be called from any thread
+        without locking, and always reflects a consistent state of the whole page.
+        """
+        raise NotImplementedError("%s does not support snapshot()" % self.__class__.__name__)
+
     def _handle_grid_key(self, x: int, y: int, down: int):
         raise NotImplementedError("Subclasses must implement _handle_grid_key() method")
 
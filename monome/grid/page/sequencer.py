@@ -0,0 +1,140 @@
+from __future__ import annotations
+
+import logging
+import numpy as np
+
+from .page import GridPage
+from ...event import MonomeEvent
+from ...clock import Clock, PRECISE_CLOCK_LOOKAHEAD
+from ...snapshot import SnapshotBuffer
+
+from typing import Callable, TYPE_CHECKING
+if TYPE_CHECKING:
+    from ..ui import GridUI
+
+logger = logging.getLogger(__name__)
+
+
+class GridUISequencerStepEvent (MonomeEvent):
+    def __init__(self, page: GridPage, step: int, tracks: list[int], time_ns: int):
+        """
+        Event generated when a GridPageSequencer's playhead advances to a new step.
+
+        Args:
+            page (GridPage): The GridPage that generated the event.
+            step (int): The index of the new step.
+            tracks (list[int]): The indices of the tracks (rows) that are active at this step.
+            time_ns (int): The scheduled time of the step, in time.perf_counter_ns() units.
+        """
+        super().__init__(time_ns)
+        self.page = page
+        self.step = step
+        self.tracks = tracks
+
+    def __repr__(self):
+        return f"GridUISequencerStepEvent(page={self.page}, step={self.step}, tracks={self.tracks})"
+
+
+class GridPageSequencer (GridPage):
+    def __init__(self,
+                 grid: GridUI,
+                 bpm: float = 120.0,
+                 steps_per_beat: int = 4,
+                 handler: Callable = None):
+        """
+        A step sequencer, with one track per row and one step per column.
+        Pressing a key toggles the step. The pattern is stored in `pattern`, an array of
+        shape (height, width), and played by a dedicated Clock. On each step, handlers
+        receive a GridUISequencerStepEvent, and only the previous and new playhead
+        columns are redrawn.
+
+        Args:
+            grid (GridUI): The GridUI.
+            bpm (float, optional): The tempo, in beats per minute. Defaults to 120.
+            steps_per_beat (int, optional): The number of steps per beat. Defaults to 4.
+            handler (Callable, optional): A handler to receive step events.
+        """
+        super().__init__(grid)
+
+        self.pattern = np.zeros((self.height, self.width), dtype=np.uint8)
+        self._snapshot = SnapshotBuffer(self.pattern)
+        self.playhead = 0
+        self.steps_per_beat = steps_per_beat
+        self._bpm = bpm
+        self.clock = Clock(self._step_interval(), self._handle_clock_tick, lookahead=PRECISE_CLOCK_LOOKAHEAD)
+        if handler is not None:
+            self.add_handler(handler)
+
+    def _step_interval(self) -> float:
+        return 60.0 / self._bpm / self.steps_per_beat
+
+    def get_bpm(self) -> float:
+        return self._bpm
+
+    def set_bpm(self, bpm: float):
+        self._bpm = bpm
+        self.clock.interval = self._step_interval()
+
+    bpm = property(get_bpm, set_bpm)
+
+    def start(self):
+        self.clock.start()
+
+    def stop(self):
+        self.clock.stop()
+
+    def _handle_grid_key(self, x: int, y: int, down: int):
+        if down:
+            self.pattern[y, x] ^= 1
+            self._snapshot.publish(self.pattern)
+            if self.is_current:
+                self.grid.led_level_set(x, y, int(self._column_levels(x)[y]))
+
+    def snapshot(self) -> np.ndarray:
+        """
+        Returns the pattern as an immutable array, safe to read from any thread.
+        """
+        return self._snapshot.snapshot()
+
+    def _handle_clock_tick(self, tick: int, time_ns: int):
+        previous_step = self.playhead
+        self.playhead = tick % self.width
+
+        if self.is_current:
+            if previous_step != self.playhead:
+                self.grid.led_level_col(previous_step, 0, self._column_levels(previous_step))
+            self.grid.led_level_col(self.playhead, 0, self._column_levels(self.playhead))
+
+        active_rows = np.flatnonzero(self.pattern[:, self.playhead]).tolist()
+        event = GridUISequencerStepEvent(self, self.playhead, active_rows, time_ns)
+        for handler in self.handlers:
+            handler(event)
+
+    def _column_levels(self, x: int) -> np.ndarray:
+        if x == self.playhead:
+            return np.where(self.pattern[:, x], self.grid.led_intensity_high, self.grid.led_intensity_low)
+        else:
+            return np.where(self.pattern[:, x], self.grid.led_intensity_medium, 0)
+
+    def draw(self):
+        self._snapshot.publish(self.pattern)
+        frame = np.where(self.pattern, self.grid.led_intensity_medium, 0)
+        frame[:, self.playhead] = self._column_levels(self.playhead)
+        self.grid.led_level_frame(frame)
+
+
+if __name__ == "__main__":
+    from .. import ui
+    import time
+
+    def step_handler(event):
+        print(f"Step {event.step}: tracks {event.tracks}")
+
+    gridui = ui.GridUI()
+    page = gridui.add_page(mode="sequencer",
+                           bpm=120,
+                           handler=step_handler)
+    page.start()
+
+    while True:
+        time.sleep(1)
@@ -1,7 +1,15 @@
 import logging
+import numpy as np
 
-from .page import GridPage, GridPageKeyboard, GridPageScaleMatrix, GridPageFreeform, GridPageHorizontalLevels
+from contextlib import contextmanager
+from typing import Optional
+
+from .page import GridPage
 from .grid import Grid
+from .gesture import GridGestureRecogniser
+from .layer import GridCompositor, GridLayer
+from ..packing import PackedFrame
+from ..registry import grid_pages
 
 logger = logging.getLogger(__name__)
 
@@ -14,22 +22,32 @@ class GridUI (Grid):
         #--------------------------------------------------------------------------------
         self.pages: list[GridPage] = []
         self.current_page_index = -1
+        self.gestures: Optional[GridGestureRecogniser] = None
+        self.compositor: Optional[GridCompositor] = None
+        # The last frame shown by each page, keyed by page index, restored when switching back
+        self.page_frames: dict[int, PackedFrame] = {}
 
         self.led_intensity_high = 15
         self.led_intensity_medium = 10
         self.led_intensity_low = 3
 
+        # Page classes registered for this GridUI only, which take precedence over the
+        # global registry in monome.registry.grid_pages
         self.page_classes = {}
-        self.register_page_class("keyboard", GridPageKeyboard)
-        self.register_page_class("scale_matrix", GridPageScaleMatrix)
-        self.register_page_class("freeform", GridPageFreeform)
-        self.register_page_class("levels", GridPageHorizontalLevels)
 
     def register_page_class(self, name: str, cls: type):
         self.page_classes[name] = cls
 
+    def get_page_class(self, mode: str) -> type:
+        """
+        Returns the page class for a mode, importing it on first use.
+        """
+        if mode in self.page_classes:
+            return self.page_classes[mode]
+        return grid_pages.get(mode)
+
     def add_page(self, mode: str = "freeform", **kwargs) -> GridPage:
-        page = self.page_classes[mode](self, **kwargs)
+        page = self.get_page_class(mode)(self, **kwargs)
         self.pages.append(page)
         if len(self.pages) == 1:
             self.current_page_index = 0
@@ -37,6 +55,73 @@ class GridUI (Grid):
             self.draw()
         return page
 
+    def enable_gestures(self, **kwargs) -> GridGestureRecogniser:
+        """
+        Start recognising gestures from key events, and sending them to the gesture handlers
+        of the current page. See GridGestureRecogniser for the available arguments.
+        """
+        if self.gestures is None:
+            self.gestures = GridGestureRecogniser(self, **kwargs)
+        return self.gestures
+
+    def disable_gestures(self):
+        if self.gestures is not None:
+            self.gestures.close()
+            self.gestures = None
+
+    def add_layer(self, blend: str = "over", opacity: float = 1.0) -> GridLayer:
+        """
+        Add a layer, composited over the current page and any existing layers.
+        See GridLayer for the available arguments.
+
+        Example:
+            playhead = gridui.add_layer(blend="max")
+            playhead.led_level_col(step, 0, [8] * gridui.height)
+        """
+        if self.compositor is None:
+            self.compositor = GridCompositor(self)
+        return self.compositor.add_layer(blend, opacity)
+
+    def remove_layer(self, layer: GridLayer):
+        self.compositor.remove_layer(layer)
+
+    @contextmanager
+    def batch(self):
+        with super().batch():
+            yield
+        compositor = self.compositor
+        if compositor is not None and compositor.dirty and self._batch_depth == 0:
+            compositor.flush()
+
+    #--------------------------------------------------------------------------------
+    # While layers are present, updates to the page frame are composited with the
+    # layers before they are sent.
+    #--------------------------------------------------------------------------------
+
+    def _send_led_update(self, address: str, args: list, region=None, replaces: bool = False):
+        if self.compositor is None:
+            super()._send_led_update(address, args, region, replaces)
+        else:
+            self.compositor.update()
+
+    def _send_led_levels(self, address: str, args: list, levels: np.ndarray, region=None, replaces: bool = False):
+        if self.compositor is None:
+            super()._send_led_levels(address, args, levels, region, replaces)
+        else:
+            self.compositor.update()
+
+    def _send_frame_changes(self, frame_previous: np.ndarray):
+        if self.compositor is None:
+            super()._send_frame_changes(frame_previous)
+        else:
+            self.compositor.flush()
+
+    def refresh(self):
+        if self.compositor is None:
+            super().refresh()
+        else:
+            self.compositor.flush(force=True)
+
     @property
     def current_page(self) -> GridPage:
         return self.pages[self.current_page_index]
@@ -44,9 +129,21 @@ class GridUI (Grid):
     def set_current_page(self, index: int):
         if not index in list(range(len(self.pages))):
             raise ValueError("Invalid page index: %d" % index)
+        if self.current_page_index >= 0:
+            self.page_frames[self.current_page_index] = PackedFrame.from_array(self.frame)
         self.current_page_index = index
-        self.clear()
-        self.draw()
+
+        #--------------------------------------------------------------------------------
+        # Restore the page's last frame and redraw it within a batch, so that only
+        # the LEDs that differ from the outgoing page are sent.
+        #--------------------------------------------------------------------------------
+        with self.batch():
+            page_frame = self.page_frames.get(index)
+            if page_frame is not None:
+                page_frame.to_array(out=self.frame)
+            else:
+                self.clear()
+            self.draw()
     
     def clear(self):
         self.led_all(0)
@@ -60,4 +157,7 @@ class GridUI (Grid):
         Override the default OSC handler, and forward it to the current page.
         """
         logger.debug("Grid key: %d, %d, %d" % (x, y, down))
+        gestures = self.gestures
+        if gestures is not None:
+            gestures._handle_grid_key(x, y, down)
         self.current_page._handle_grid_key(x, y, down)
\ No newline at end of file
@@ -0,0 +1,229 @@
+from __future__ import annotations
+
+import numpy as np
+
+from typing import Optional, Union
+
+
+def rle_encode(data: np.ndarray) -> bytes:
+    """
+    Run-length encode bytes with the PackBits scheme. Each packet begins with a header byte n:
+    if n < 128, n + 1 literal bytes follow; if n > 128, the following byte is repeated 257 - n times.
+    Runs are located with a single vectorised comparison, so encoding cost scales with the
+    number of runs rather than the number of bytes.
+
+    Args:
+        data (np.ndarray): A one-dimensional uint8 array.
+
+    Returns:
+        bytes: The encoded data.
+    """
+    data = np.asarray(data, dtype=np.uint8).reshape(-1)
+    if len(data) == 0:
+        return b""
+    run_starts = np.concatenate(([0], np.flatnonzero(data[1:] != data[:-1]) + 1))
+    run_lengths = np.diff(np.append(run_starts, len(data)))
+
+    output = bytearray()
+    literal_start = None
+    for start, length in zip(run_starts.tolist(), run_lengths.tolist()):
+        if length < 3:
+            if literal_start is None:
+                literal_start = start
+            continue
+        if literal_start is not None:
+            _append_literals(output, data, literal_start, start)
+            literal_start = None
+        value = int(data[start])
+        while length > 0:
+            count = min(length, 128)
+            if count < 2:
+                output += bytes((0, value))
+            else:
+                output += bytes((257 - count, value))
+            length -= count
+    if literal_start is not None:
+        _append_literals(output, data, literal_start, len(data))
+    return bytes(output)
+
+
+def _append_literals(output: bytearray, data: np.ndarray, start: int, end: int):
+    while start < end:
+        count = min(end - start, 128)
+        output.append(count - 1)
+        output += data[start:start + count].tobytes()
+        start += count
+
+
+def rle_decode(data: bytes, size: int) -> np.ndarray:
+    """
+    Decode data written by rle_encode().
+
+    Args:
+        data (bytes): The encoded data.
+        size (int): The number of decoded bytes.
+
+    Returns:
+        np.ndarray: A one-dimensional uint8 array of `size` bytes.
+    """
+    output = np.zeros(size, dtype=np.uint8)
+    position = 0
+    index = 0
+    while index < len(data) and position < size:
+        header = data[index]
+        index += 1
+        if header < 128:
+            count = header + 1
+            output[position:position + count] = np.frombuffer(data, dtype=np.uint8, count=count, offset=index)
+            index += count
+        elif header > 128:
+            count = 257 - header
+            output[position:position + count] = data[index]
+            index += 1
+        else:
+            continue
+        position += count
+    if position != size:
+        raise ValueError("rle_decode: Decoded %d bytes, expected %d" % (position, size))
+    return output
+
+
+class PackedFrame:
+    def __init__(self, shape: tuple[int, int], data: Optional[Union[bytes, bytearray]] = None):
+        """
+        A frame of 4-bit LED levels, stored in a bytearray with two LEDs per byte: the first
+        LED of each pair in the high nibble. Each row is packed separately, so a row of
+        odd width ends with a padding nibble.
+
+        A 16x8 grid frame occupies 64 bytes, and a 4-ring arc frame 128 bytes, so frames
+        can be cached for many pages or logged at little cost. Comparison and XOR operate
+        on both nibbles of the packed bytes at once, via a NumPy view of the buffer; blending
+        splits the bytes into arrays of high and low nibbles.
+
+        Args:
+            shape (tuple[int, int]): The (rows, columns) of the frame: (height, width) for
+                                     a grid, or (ring_count, led_count) for an arc.
+            data (bytes, optional): Packed data to copy, as returned by tobytes(). Defaults to a dark frame.
+        """
+        self.shape = (int(shape[0]), int(shape[1]))
+        packed_shape = (self.shape[0], (self.shape[1] + 1) // 2)
+        size = packed_shape[0] * packed_shape[1]
+        if data is None:
+            self.data = bytearray(size)
+        else:
+            if len(data) != size:
+                raise ValueError("PackedFrame: data must be %d bytes" % size)
+            self.data = bytearray(data)
+        self.packed = np.frombuffer(self.data, dtype=np.uint8).reshape(packed_shape)
+
+    @classmethod
+    def from_array(cls, levels: np.ndarray) -> PackedFrame:
+        """
+        Returns a new PackedFrame holding the levels of a 2D array.
+        """
+        levels = np.asarray(levels)
+        frame = cls(levels.shape)
+        frame.set(levels)
+        return frame
+
+    @property
+    def nbytes(self) -> int:
+        return len(self.data)
+
+    def tobytes(self) -> bytes:
+        return bytes(self.data)
+
+    def copy(self) -> PackedFrame:
+        return PackedFrame(self.shape, self.data)
+
+    def to_array(self, out: Optional[np.ndarray] = None) -> np.ndarray:
+        """
+        Returns the levels as a uint8 array of the frame's shape.
+
+        Args:
+            out (np.ndarray, optional): An array to write the levels into, rather than allocating one.
+        """
+        if out is None:
+            out = np.empty(self.shape, dtype=np.uint8)
+        width = self.shape[1]
+        out[:, 0::2] = self.packed[:, :(width + 1) // 2] >> 4
+        out[:, 1::2] = self.packed[:, :width // 2] & 0x0F
+        return out
+
+    def set(self, levels: np.ndarray):
+        """
+        Set every level of the frame from an array of the frame's shape.
+        """
+        levels = np.asarray(levels)
+        if levels.shape != self.shape:
+            raise ValueError("PackedFrame: levels must have shape %s" % (self.shape,))
+        if levels.size and (levels.min() < 0 or levels.max() > 15):
+            raise ValueError("level must be between 0 and 15")
+        levels = levels.astype(np.uint8, copy=False)
+        self.packed[:] = 0
+        self.packed[:, :(self.shape[1] + 1) // 2] = levels[:, 0::2] << 4
+        self.packed[:, :self.shape[1] // 2] |= levels[:, 1::2]
+
+    def __getitem__(self, key) -> np.ndarray:
+        return self.to_array()[key]
+
+    def __setitem__(self, key, value):
+        levels = self.to_array()
+        levels[key] = value
+        self.set(levels)
+
+    def __eq__(self, other) -> bool:
+        if not isinstance(other, PackedFrame):
+            return NotImplemented
+        return self.shape == other.shape and self.data == other.data
+
+    def __xor__(self, other: PackedFrame) -> PackedFrame:
+        """
+        Returns the XOR of two frames, in which unchanged LEDs are zero.
+        XOR-ing the result with either frame yields the other.
+        """
+        self._validate_shape(other)
+        return PackedFrame(self.shape, (self.packed ^ other.packed).tobytes())
+
+    def diff(self, other: PackedFrame) -> np.ndarray:
+        """
+        Returns a boolean array of the frame's shape, which is True where the levels differ.
+        """
+        self._validate_shape(other)
+        delta = self.packed ^ other.packed
+        changed = np.empty((self.shape[0], delta.shape[1] * 2), dtype=bool)
+        changed[:, 0::2] = (delta & 0xF0) != 0
+        changed[:, 1::2] = (delta & 0x0F) != 0
+        return changed[:, :self.shape[1]]
+
+    def blend(self, other: PackedFrame, mode: str = "max", amount: float = 0.5) -> PackedFrame:
+        """
+        Returns a new frame combining this frame with another.
+
+        Args:
+            other (PackedFrame): The frame to blend with.
+            mode (str, optional): One of "max" (the brighter of each pair of LEDs), "add"
+                                  (the sum, saturating at 15) or "mix" (a weighted average).
+                                  Defaults to "max".
+            amount (float, optional): For "mix", the weight of `other`, between 0 and 1. Defaults to 0.5.
+        """
+        self._validate_shape(other)
+        high_a, low_a = self.packed >> 4, self.packed & 0x0F
+        high_b, low_b = other.packed >> 4, other.packed & 0x0F
+        if mode == "max":
+            high, low = np.maximum(high_a, high_b), np.maximum(low_a, low_b)
+        elif mode == "add":
+            high, low = np.minimum(high_a + high_b, 15), np.minimum(low_a + low_b, 15)
+        elif mode == "mix":
+            high = np.rint(high_a + (high_b.astype(float) - high_a) * amount).astype(np.uint8)
+            low = np.rint(low_a + (low_b.astype(float) - low_a) * amount).astype(np.uint8)
+        else:
+            raise ValueError("Invalid blend mode: %s" % mode)
+        return PackedFrame(self.shape, ((high << 4) | low).astype(np.uint8).tobytes())
+
+    def _validate_shape(self, other: PackedFrame):
+        if other.shape != self.shape:
+            raise ValueError("PackedFrame: shapes differ (%s != %s)" % (self.shape, other.shape))
+
+    def __repr__(self):
+        return f"PackedFrame(shape={self.shape}, nbytes={self.nbytes})"
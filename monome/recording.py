@@ -0,0 +1,145 @@
+from __future__ import annotations
+
+import numpy as np
+import threading
+import logging
+import time
+import os
+
+from typing import Optional, TYPE_CHECKING
+if TYPE_CHECKING:
+    from .device import MonomeDevice
+
+logger = logging.getLogger(__name__)
+
+EVENT_TYPE_GRID_KEY = 1
+EVENT_TYPE_ENC_DELTA = 2
+EVENT_TYPE_ENC_KEY = 3
+
+#--------------------------------------------------------------------------------
+# Each event is stored as a fixed-size 16-byte little-endian record, so that a
+# log can be memory-mapped directly as a NumPy structured array.
+#--------------------------------------------------------------------------------
+EVENT_RECORD_DTYPE = np.dtype([
+    ("timestamp", "<u8"),
+    ("type", "u1"),
+    ("reserved", "u1"),
+    ("a", "<i2"),
+    ("b", "<i2"),
+    ("c", "<i2"),
+])
+
+
+class EventRecorder:
+    def __init__(self, path: str):
+        """
+        Records incoming device events to a binary log of fixed-size records.
+
+        Args:
+            path (str): The path of the log file to write. Any existing file is overwritten.
+        """
+        self.path = path
+        self.fd = open(path, "wb")
+        self.record_count = 0
+        self.lock = threading.Lock()
+        self._record = np.zeros(1, dtype=EVENT_RECORD_DTYPE)
+
+    def record(self, event_type: int, a: int, b: int, c: int = 0, timestamp: Optional[int] = None):
+        """
+        Append an event to the log.
+
+        Args:
+            event_type (int): One of the EVENT_TYPE_* constants.
+            a (int): The first event argument (x, ring or key).
+            b (int): The second event argument (y, delta or down).
+            c (int, optional): The third event argument (down). Defaults to 0.
+            timestamp (int, optional): The capture time in nanoseconds. Defaults to time.perf_counter_ns().
+        """
+        if timestamp is None:
+            timestamp = time.perf_counter_ns()
+        with self.lock:
+            if self.fd is None:
+                return
+            self._record[0] = (timestamp, event_type, 0, a, b, c)
+            self.fd.write(self._record.tobytes())
+            self.record_count += 1
+
+    def close(self):
+        with self.lock:
+            if self.fd is not None:
+                self.fd.close()
+                self.fd = None
+
+
+class EventReplayer:
+    def __init__(self, path: str):
+        """
+        Replays a log written by EventRecorder into a Grid, Arc, GridUI or ArcUI.
+
+        Args:
+            path (str): The path of the log file to read.
+        """
+        self.path = path
+        if os.path.getsize(path) == 0:
+            self.events = np.zeros(0, dtype=EVENT_RECORD_DTYPE)
+        else:
+            self.events = np.memmap(path, dtype=EVENT_RECORD_DTYPE, mode="r")
+
+    def __len__(self):
+        return len(self.events)
+
+    @property
+    def duration(self) -> float:
+        """
+        The duration of the recording, in seconds.
+        """
+        if len(self.events) == 0:
+            return 0.0
+        return (int(self.events["timestamp"][-1]) - int(self.events["timestamp"][0])) / 1e9
+
+    def replay(self, device: MonomeDevice, speed: Optional[float] = 1.0) -> float:
+        """
+        Inject the recorded events into `device`, blocking until all events have been replayed.
+        Events are injected via the device's OSC handlers, so the page and ring logic of
+        GridUI and ArcUI is exercised exactly as for live input.
+
+        Args:
+            device (MonomeDevice): The device to inject events into.
+            speed (float, optional): The playback rate relative to real time. If None or 0,
+                                     events are replayed as fast as possible. Defaults to 1.0.
+
+        Returns:
+            float: The time taken to replay the events, in seconds.
+        """
+        handlers = {
+            EVENT_TYPE_GRID_KEY: getattr(device, "_osc_handle_grid_key", None),
+            EVENT_TYPE_ENC_DELTA: getattr(device, "_osc_handle_enc_delta", None),
+            EVENT_TYPE_ENC_KEY: getattr(device, "_osc_handle_enc_key", None),
+        }
+        addresses = {
+            EVENT_TYPE_GRID_KEY: f"/{device.prefix}/grid/key",
+            EVENT_TYPE_ENC_DELTA: f"/{device.prefix}/enc/delta",
+            EVENT_TYPE_ENC_KEY: f"/{device.prefix}/enc/key",
+        }
+
+        if len(self.events) == 0:
+            return 0.0
+        t0 = time.perf_counter_ns()
+        timestamp_first = int(self.events["timestamp"][0])
+
+        for timestamp, event_type, _, a, b, c in self.events.tolist():
+            handler = handlers.get(event_type)
+            if handler is None:
+                logger.warning("EventReplayer: Device %s cannot handle event type %d" % (device, event_type))
+                continue
+            if speed:
+                t_event = t0 + (timestamp - timestamp_first) / speed
+                t_wait = (t_event - time.perf_counter_ns()) / 1e9
+                if t_wait > 0:
+                    time.sleep(t_wait)
+            if event_type == EVENT_TYPE_GRID_KEY:
+                handler(addresses[event_type], a, b, c)
+            else:
+                handler(addresses[event_type], a, b)
+
+        return (time.perf_counter_ns() - t0) / 1e9
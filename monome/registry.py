@@ -0,0 +1,111 @@
+import threading
+import logging
+
+from importlib import import_module
+from importlib.metadata import entry_points, EntryPoint
+from typing import Union
+
+logger = logging.getLogger(__name__)
+
+GRID_PAGE_ENTRY_POINT_GROUP = "monome.grid_pages"
+ARC_RING_ENTRY_POINT_GROUP = "monome.arc_rings"
+
+
+class ClassRegistry:
+    def __init__(self, entry_point_group: str):
+        """
+        A registry of classes by mode name, which are imported on first use.
+
+        Classes may be registered directly, or as a "module:attribute" path to import when
+        the mode is first requested. Packages may also provide classes through the
+        `entry_point_group` entry point group, which is only scanned when a mode is
+        requested that has not been registered, so that unused plugins cost nothing at
+        startup. For example, in a plugin's setup.py:
+
+            entry_points={"monome.grid_pages": ["waveform = monome_waveform:GridPageWaveform"]}
+
+        Args:
+            entry_point_group (str): The entry point group to scan for plugins.
+        """
+        self.entry_point_group = entry_point_group
+        self.classes: dict[str, Union[type, str, EntryPoint]] = {}
+        self.entry_points_loaded = False
+        self.lock = threading.Lock()
+
+    def register(self, name: str, cls: Union[type, str]):
+        """
+        Register a class, or the "module:attribute" path of a class, under a mode name.
+        """
+        with self.lock:
+            self.classes[name] = cls
+
+    def get(self, name: str) -> type:
+        """
+        Returns the class registered under a mode name, importing it if needed.
+
+        Raises:
+            ValueError: If no class is registered under the name.
+        """
+        with self.lock:
+            if name not in self.classes and not self.entry_points_loaded:
+                self._load_entry_points()
+            try:
+                reference = self.classes[name]
+            except KeyError:
+                raise ValueError("Invalid mode: %s" % name)
+        if isinstance(reference, type):
+            return reference
+
+        # Import outside the lock, as the imported module may itself call register()
+        if isinstance(reference, EntryPoint):
+            cls = reference.load()
+        else:
+            module_name, attribute = reference.split(":")
+            cls = getattr(import_module(module_name), attribute)
+        with self.lock:
+            # Keep any class registered while the module was being imported
+            if self.classes.get(name) is reference:
+                self.classes[name] = cls
+            return self.classes[name]
+
+    def names(self) -> list[str]:
+        """
+        Returns the names of all registered modes, including those provided by plugins.
+        """
+        with self.lock:
+            if not self.entry_points_loaded:
+                self._load_entry_points()
+            return list(self.classes.keys())
+
+    def __contains__(self, name: str) -> bool:
+        return name in self.names()
+
+    def _load_entry_points(self):
+        try:
+            group_entry_points = entry_points(group=self.entry_point_group)
+        except TypeError:
+            # Python < 3.10 returns a dict of groups
+            group_entry_points = entry_points().get(self.entry_point_group, [])
+        for entry_point in group_entry_points:
+            if entry_point.name in self.classes:
+                logger.warning("%s: Ignoring plugin that redefines mode: %s" %
+                               (self.entry_point_group, entry_point.name))
+                continue
+            self.classes[entry_point.name] = entry_point
+        self.entry_points_loaded = True
+
+
+grid_pages = ClassRegistry(GRID_PAGE_ENTRY_POINT_GROUP)
+grid_pages.register("keyboard", "monome.grid.page.keyboard:GridPageKeyboard")
+grid_pages.register("scale_matrix", "monome.grid.page.scale_matrix:GridPageScaleMatrix")
+grid_pages.register("freeform", "monome.grid.page.freeform:GridPageFreeform")
+grid_pages.register("levels", "monome.grid.page.levels:GridPageHorizontalLevels")
+grid_pages.register("faders", "monome.grid.page.faders:GridPageFaders")
+grid_pages.register("sequencer", "monome.grid.page.sequencer:GridPageSequencer")
+grid_pages.register("canvas", "monome.grid.page.canvas:GridPageCanvas")
+
+arc_rings = ClassRegistry(ARC_RING_ENTRY_POINT_GROUP)
+arc_rings.register("bipolar", "monome.arc.ring.bipolar:ArcRingBipolar")
+arc_rings.register("unipolar", "monome.arc.ring.unipolar:ArcRingUnipolar")
+arc_rings.register("angular", "monome.arc.ring.angular:ArcRingAngular")
+arc_rings.register("reel", "monome.arc.ring.reel:ArcRingReel")
@@ -0,0 +1,398 @@
+from __future__ import annotations
+
+from pythonosc.osc_message_builder import OscMessageBuilder
+from pythonosc.osc_message import OscMessage
+import numpy as np
+import threading
+import logging
+import socket
+import struct
+import time
+
+from typing import Optional
+
+from .grid import Grid
+from .arc import Arc
+from .device import MonomeDevice
+from .event import set_receive_time
+from .packing import PackedFrame, rle_encode, rle_decode
+from .recording import EVENT_RECORD_DTYPE, EVENT_TYPE_GRID_KEY, EVENT_TYPE_ENC_DELTA, EVENT_TYPE_ENC_KEY
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_REMOTE_PORT = 12100
+DEFAULT_REMOTE_FRAME_RATE = 120.0
+
+#--------------------------------------------------------------------------------
+# Protocol. Each message is a 5-byte header (type: u8, payload length: u32),
+# followed by the payload.
+#
+#  HELLO  (client -> bridge): the model name, "one" or "arc", in UTF-8.
+#  INFO   (bridge -> client): the device's frame shape, as two u16 values.
+#  ERROR  (bridge -> client): a description of the error, in UTF-8.
+#  FRAME  (client -> bridge): a u8 flags byte, then the XOR of the frame with the previous
+#                             frame, packed to 4 bits per LED and run-length encoded.
+#  EVENTS (bridge -> client): one or more input events, as EVENT_RECORD_DTYPE records.
+#  OSC    (client -> bridge): an OSC message to pass to the device, such as led/intensity,
+#                             with the address prefix removed.
+#--------------------------------------------------------------------------------
+REMOTE_HEADER = struct.Struct(">BI")
+REMOTE_INFO = struct.Struct(">HH")
+
+MESSAGE_HELLO = 1
+MESSAGE_INFO = 2
+MESSAGE_ERROR = 3
+MESSAGE_FRAME = 4
+MESSAGE_EVENTS = 5
+MESSAGE_OSC = 6
+
+# The frame is relative to an all-zero frame, rather than the previous frame
+FRAME_FLAG_KEYFRAME = 0x01
+
+
+def _receive_exactly(connection: socket.socket, size: int) -> bytes:
+    data = bytearray()
+    while len(data) < size:
+        chunk = connection.recv(size - len(data))
+        if not chunk:
+            raise ConnectionError("Remote connection closed")
+        data += chunk
+    return bytes(data)
+
+
+def _receive_message(connection: socket.socket) -> tuple[int, bytes]:
+    message_type, length = REMOTE_HEADER.unpack(_receive_exactly(connection, REMOTE_HEADER.size))
+    return message_type, _receive_exactly(connection, length)
+
+
+def _send_message(connection: socket.socket, message_type: int, payload: bytes):
+    connection.sendall(REMOTE_HEADER.pack(message_type, len(payload)) + payload)
+
+
+def encode_frame_delta(frame: PackedFrame, frame_previous: Optional[PackedFrame]) -> bytes:
+    """
+    Encode a frame relative to the previous frame, as the payload of a FRAME message.
+    Unchanged LEDs are zero in the XOR, so a small change encodes to a few bytes.
+    """
+    if frame_previous is None:
+        flags, delta = FRAME_FLAG_KEYFRAME, frame
+    else:
+        flags, delta = 0, frame ^ frame_previous
+    return bytes((flags,)) + rle_encode(delta.packed)
+
+
+def decode_frame_delta(payload: bytes, frame_previous: PackedFrame) -> PackedFrame:
+    """
+    Decode the payload of a FRAME message, returning the new frame.
+    """
+    delta = PackedFrame(frame_previous.shape, rle_decode(payload[1:], frame_previous.nbytes))
+    if payload[0] & FRAME_FLAG_KEYFRAME:
+        return delta
+    return frame_previous ^ delta
+
+
+class RemoteBridge:
+    def __init__(self, host: str = "0.0.0.0", port: int = DEFAULT_REMOTE_PORT):
+        """
+        Serves locally-attached monome devices to RemoteGrid and RemoteArc clients over TCP.
+        Run this next to serialosc, with `python -m monome.remote`.
+
+        Each client connection drives one device. LED frames from the client are applied to
+        the device within a batch(), so only the regions that have changed are sent to
+        serialosc. Input events are sent to the client in batches: every event that arrives
+        while the previous batch is being sent is included in the next.
+
+        Args:
+            host (str, optional): The interface to listen on. Defaults to all interfaces.
+            port (int, optional): The TCP port to listen on. Defaults to 12100.
+        """
+        self.server = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self.server.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        self.server.bind((host, port))
+        self.server.listen()
+        self.port = self.server.getsockname()[1]
+        self.devices: dict[str, MonomeDevice] = {}
+        self.lock = threading.Lock()
+        self.thread = threading.Thread(target=self._run, daemon=True)
+        self.thread.start()
+
+    def _get_device(self, model_name: str) -> MonomeDevice:
+        with self.lock:
+            if model_name not in self.devices:
+                if model_name == "arc":
+                    self.devices[model_name] = Arc()
+                else:
+                    self.devices[model_name] = Grid()
+            return self.devices[model_name]
+
+    def _run(self):
+        while True:
+            connection, address = self.server.accept()
+            connection.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            logger.info("RemoteBridge: Client connected from %s:%d" % address)
+            threading.Thread(target=self._run_connection, args=(connection,), daemon=True).start()
+
+    def _run_connection(self, connection: socket.socket):
+        events = []
+        condition = threading.Condition()
+        connected = True
+
+        def record_event(event_type: int):
+            def handler(address, a, b, c=0):
+                with condition:
+                    events.append((time.perf_counter_ns(), event_type, 0, a, b, c))
+                    condition.notify()
+            return handler
+
+        def run_events():
+            while True:
+                with condition:
+                    condition.wait_for(lambda: events or not connected)
+                    if not connected:
+                        return
+                    records = np.array(events, dtype=EVENT_RECORD_DTYPE)
+                    events.clear()
+                try:
+                    _send_message(connection, MESSAGE_EVENTS, records.tobytes())
+                except OSError:
+                    return
+
+        device = None
+        mappings = []
+        try:
+            message_type, payload = _receive_message(connection)
+            if message_type != MESSAGE_HELLO:
+                raise ValueError("Expected HELLO message")
+            try:
+                device = self._get_device(payload.decode("utf-8"))
+            except Exception as e:
+                _send_message(connection, MESSAGE_ERROR, str(e).encode("utf-8"))
+                return
+            _send_message(connection, MESSAGE_INFO, REMOTE_INFO.pack(*device.frame.shape))
+
+            prefix = device.prefix
+            mappings = [(f"/{prefix}/grid/key", record_event(EVENT_TYPE_GRID_KEY)),
+                        (f"/{prefix}/enc/delta", record_event(EVENT_TYPE_ENC_DELTA)),
+                        (f"/{prefix}/enc/key", record_event(EVENT_TYPE_ENC_KEY))]
+            for address, handler in mappings:
+                device.dispatcher.map(address, handler)
+            threading.Thread(target=run_events, daemon=True).start()
+
+            # The client's frame starts dark, and the hardware state is unknown, so clear
+            # the whole device.
+            device.frame[:] = 0
+            device.refresh()
+
+            frame = PackedFrame(device.frame.shape)
+            while True:
+                message_type, payload = _receive_message(connection)
+                if message_type == MESSAGE_FRAME:
+                    frame = decode_frame_delta(payload, frame)
+                    with device.batch():
+                        frame.to_array(out=device.frame)
+                elif message_type == MESSAGE_OSC:
+                    message = OscMessage(payload)
+                    device._send(f"/{prefix}{message.address}", list(message.params))
+                else:
+                    logger.warning("RemoteBridge: Unknown message type: %d" % message_type)
+        except (ConnectionError, OSError):
+            pass
+        except Exception:
+            logger.exception("RemoteBridge: Exception in connection")
+        finally:
+            with condition:
+                connected = False
+                condition.notify()
+            if device is not None:
+                for address, handler in mappings:
+                    device.dispatcher.unmap(address, handler)
+            connection.close()
+            logger.info("RemoteBridge: Client disconnected")
+
+    def close(self):
+        self.server.close()
+
+
+class RemoteDevice:
+    """
+    Mixin that connects a Grid or Arc to a RemoteBridge over TCP, rather than to a
+    local serialosc. Must precede the device class in the base classes.
+
+    LED updates are applied to `frame` as usual. A sender thread then sends the changes
+    to the bridge as a delta-encoded frame, at most `frame_rate` times per second, so
+    that many updates in quick succession are coalesced into one message.
+    """
+
+    def _init_remote(self, host: str, port: int, frame_rate: float):
+        self.remote_address = (host, port)
+        self.frame_rate = frame_rate
+        self._frame_condition = threading.Condition()
+        self._frame_dirty = False
+        self._frame_sent: Optional[PackedFrame] = None
+        # OSC messages and frames are sent from different threads, over the same connection
+        self._send_lock = threading.Lock()
+
+    def _connect(self, model_name: str):
+        self.transport = None
+        self.client = None
+        self.connection = socket.create_connection(self.remote_address)
+        self.connection.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        _send_message(self.connection, MESSAGE_HELLO, model_name.encode("utf-8"))
+        message_type, payload = _receive_message(self.connection)
+        if message_type == MESSAGE_ERROR:
+            raise ConnectionError("RemoteBridge: %s" % payload.decode("utf-8"))
+        self.remote_shape = REMOTE_INFO.unpack(payload)
+
+    def _start_remote(self):
+        threading.Thread(target=self._run_receive, daemon=True).start()
+        threading.Thread(target=self._run_send, daemon=True).start()
+
+    def start_send_queue(self, *args, **kwargs):
+        raise RuntimeError("Remote devices coalesce their output, and do not support a send queue")
+
+    def _get_send_priority(self) -> int:
+        from .sendqueue import PRIORITY_BULK
+        return PRIORITY_BULK
+
+    def _send(self, address: str, args: list, region=None, replaces: bool = False):
+        if not self.output_enabled:
+            return
+        builder = OscMessageBuilder(address=address[len(self.prefix) + 1:])
+        for arg in args:
+            builder.add_arg(arg)
+        with self._send_lock:
+            _send_message(self.connection, MESSAGE_OSC, builder.build().dgram)
+
+    def _mark_frame_dirty(self):
+        with self._frame_condition:
+            self._frame_dirty = True
+            self._frame_condition.notify()
+
+    def _send_led_update(self, address: str, args: list, region=None, replaces: bool = False):
+        if self._batch_depth > 0:
+            return
+        self._mark_frame_dirty()
+        frame_log = self.frame_log
+        if frame_log is not None:
+            frame_log.append(self.frame)
+
+    def _send_led_levels(self, address: str, args: list, levels: np.ndarray, region=None, replaces: bool = False):
+        self._send_led_update(address, args, region, replaces)
+
+    def _send_frame_changes(self, frame_previous: np.ndarray):
+        self._mark_frame_dirty()
+
+    def _run_send(self):
+        interval = 1.0 / self.frame_rate
+        while True:
+            with self._frame_condition:
+                self._frame_condition.wait_for(lambda: self._frame_dirty)
+                self._frame_dirty = False
+            if not self.output_enabled:
+                continue
+            brightness_table = self.brightness_table
+            if brightness_table is None:
+                frame = PackedFrame.from_array(self.frame)
+            else:
+                frame = PackedFrame.from_array(brightness_table[self.frame])
+            payload = encode_frame_delta(frame, self._frame_sent)
+            try:
+                with self._send_lock:
+                    _send_message(self.connection, MESSAGE_FRAME, payload)
+            except OSError:
+                logger.warning("%s: Connection to bridge lost" % self.__class__.__name__)
+                return
+            self._frame_sent = frame
+            time.sleep(interval)
+
+    def _run_receive(self):
+        addresses = {
+            EVENT_TYPE_GRID_KEY: f"/{self.prefix}/grid/key",
+            EVENT_TYPE_ENC_DELTA: f"/{self.prefix}/enc/delta",
+            EVENT_TYPE_ENC_KEY: f"/{self.prefix}/enc/key",
+        }
+        while True:
+            try:
+                message_type, payload = _receive_message(self.connection)
+            except (ConnectionError, OSError):
+                logger.warning("%s: Connection to bridge lost" % self.__class__.__name__)
+                return
+            if message_type != MESSAGE_EVENTS:
+                continue
+            # Event timestamps are on the bridge's clock, so events are stamped with
+            # the time that they were received here.
+            set_receive_time(time.perf_counter_ns())
+            for timestamp, event_type, _, a, b, c in np.frombuffer(payload, dtype=EVENT_RECORD_DTYPE).tolist():
+                try:
+                    if event_type == EVENT_TYPE_GRID_KEY:
+                        self.dispatcher.dispatch(addresses[event_type], a, b, c)
+                    else:
+                        self.dispatcher.dispatch(addresses[event_type], a, b)
+                except Exception:
+                    logger.exception("%s: Exception in handler" % self.__class__.__name__)
+            set_receive_time(None)
+
+    def close(self):
+        self.connection.close()
+
+
+class RemoteGrid (RemoteDevice, Grid):
+    def __init__(self,
+                 host: str,
+                 port: int = DEFAULT_REMOTE_PORT,
+                 prefix: str = "monome",
+                 frame_rate: float = DEFAULT_REMOTE_FRAME_RATE):
+        """
+        A Grid attached to another host, driven via a RemoteBridge.
+        The Grid's dimensions are provided by the bridge.
+
+        Args:
+            host (str): The host running the RemoteBridge.
+            port (int, optional): The bridge's TCP port. Defaults to 12100.
+            prefix (str, optional): The OSC prefix used for this Grid's handlers. Defaults to "monome".
+            frame_rate (float, optional): The maximum rate at which frames are sent. Defaults to 120.
+        """
+        self._init_remote(host, port, frame_rate)
+        super().__init__(prefix=prefix)
+        self.height, self.width = self.remote_shape
+        self.frame = np.zeros(self.remote_shape, dtype=np.uint8)
+        self._start_remote()
+
+
+class RemoteArc (RemoteDevice, Arc):
+    def __init__(self,
+                 host: str,
+                 port: int = DEFAULT_REMOTE_PORT,
+                 prefix: str = "monome",
+                 frame_rate: float = DEFAULT_REMOTE_FRAME_RATE):
+        """
+        An Arc attached to another host, driven via a RemoteBridge.
+        The Arc's ring and LED counts are provided by the bridge.
+
+        Args:
+            host (str): The host running the RemoteBridge.
+            port (int, optional): The bridge's TCP port. Defaults to 12100.
+            prefix (str, optional): The OSC prefix used for this Arc's handlers. Defaults to "monome".
+            frame_rate (float, optional): The maximum rate at which frames are sent. Defaults to 120.
+        """
+        self._init_remote(host, port, frame_rate)
+        super().__init__(prefix=prefix)
+        self.ring_count, self.led_count = self.remote_shape
+        self.frame = np.zeros(self.remote_shape, dtype=np.uint8)
+        self._start_remote()
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Serve local monome devices to remote clients")
+    parser.add_argument("--host", type=str, default="0.0.0.0", help="Interface to listen on")
+    parser.add_argument("--port", type=int, default=DEFAULT_REMOTE_PORT, help="TCP port to listen on")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    bridge = RemoteBridge(args.host, args.port)
+    print("Listening on port %d..." % bridge.port)
+
+    while True:
+        time.sleep(1)
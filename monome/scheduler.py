@@ -0,0 +1,104 @@
+from __future__ import annotations
+
+from singleton_decorator import singleton
+from dataclasses import dataclass
+import threading
+import logging
+
+from typing import Any, Callable, Optional, TYPE_CHECKING
+if TYPE_CHECKING:
+    from .device import MonomeDevice
+
+from .clock import Clock
+
+DEFAULT_TICK_RATE = 30.0
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class TickCallback:
+    callback: Callable[[float], None]
+    device: MonomeDevice
+    page: Optional[Any] = None
+
+
+#--------------------------------------------------------------------------------
+# TickScheduler is a singleton class: all animated pages and rings in a process
+# share one clock thread.
+#--------------------------------------------------------------------------------
+
+@singleton
+class TickScheduler:
+    def __init__(self, rate: float = DEFAULT_TICK_RATE):
+        """
+        Calls registered tick(dt) callbacks at a fixed rate from a single shared thread.
+
+        On each tick, the callbacks for each device are called within a device.batch(), so
+        that all of their drawing is flushed as one update per device per tick. Callbacks
+        registered with a page are skipped while that page is not the current page.
+        The clock thread is only started once a callback is registered, and is stopped
+        when the last callback is removed.
+
+        Args:
+            rate (float, optional): The tick rate, in Hz. Defaults to 30.
+        """
+        self.callbacks: list[TickCallback] = []
+        self.lock = threading.Lock()
+        self.clock = Clock(1.0 / rate, self._tick, lookahead=0)
+        self.last_tick_ns: Optional[int] = None
+
+    def get_rate(self) -> float:
+        return 1.0 / self.clock.interval
+
+    def set_rate(self, rate: float):
+        self.clock.interval = 1.0 / rate
+
+    rate = property(get_rate, set_rate)
+
+    def add_tick_callback(self, callback: Callable[[float], None], device: MonomeDevice, page: Any = None):
+        """
+        Register a callback to be called on every tick.
+
+        Args:
+            callback (Callable): Called with the time since the previous tick, in seconds.
+            device (MonomeDevice): The device that the callback draws to.
+            page (optional): If specified, the callback is only called while `page.is_current` is True.
+        """
+        with self.lock:
+            self.callbacks.append(TickCallback(callback, device, page))
+            if not self.clock.running:
+                self.last_tick_ns = None
+                self.clock.start()
+
+    def remove_tick_callback(self, callback: Callable[[float], None]):
+        """
+        Unregister a callback previously passed to add_tick_callback().
+        """
+        with self.lock:
+            callbacks = [entry for entry in self.callbacks if entry.callback != callback]
+            if len(callbacks) == len(self.callbacks):
+                raise ValueError("Tick callback not found")
+            self.callbacks = callbacks
+            if not callbacks:
+                # Don't wait for the clock thread, which may be the caller, or may be
+                # blocked on the lock in a callback.
+                self.clock.stop(wait=False)
+
+    def _tick(self, tick: int, time_ns: int):
+        dt = 0.0 if self.last_tick_ns is None else (time_ns - self.last_tick_ns) / 1e9
+        self.last_tick_ns = time_ns
+
+        callbacks_by_device: dict[int, list[TickCallback]] = {}
+        for entry in self.callbacks:
+            if entry.page is not None and not entry.page.is_current:
+                continue
+            callbacks_by_device.setdefault(id(entry.device), []).append(entry)
+
+        for entries in callbacks_by_device.values():
+            with entries[0].device.batch():
+                for entry in entries:
+                    try:
+                        entry.callback(dt)
+                    except Exception:
+                        logger.exception("TickScheduler: Exception in tick callback")
@@ -0,0 +1,218 @@
+from collections import deque
+import threading
+import logging
+import time
+
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+PRIORITY_INTERACTIVE = 0
+PRIORITY_BULK = 1
+
+# A region covering the whole device. A replacing update to REGION_ALL supersedes
+# every pending LED update.
+REGION_ALL = "all"
+
+# A region is a rectangle of LEDs, (x, y, width, height), or REGION_ALL.
+# Datagrams without a region (such as intensity changes) are never merged.
+Region = tuple[int, int, int, int]
+
+DEFAULT_SEND_RATE = 1000
+DEFAULT_SEND_BYTE_RATE = 256 * 1024
+
+# The duration of traffic that may be sent in a single burst after the queue is idle
+SEND_QUEUE_BURST_DURATION = 0.01
+
+
+class SendQueue:
+    def __init__(self,
+                 client,
+                 rate: float = DEFAULT_SEND_RATE,
+                 byte_rate: float = DEFAULT_SEND_BYTE_RATE):
+        """
+        An outbound queue for a single device, which sends datagrams from a dedicated thread
+        at no more than `rate` datagrams and `byte_rate` bytes per second.
+
+        Datagrams have one of two priorities. Interactive datagrams (such as LED feedback for
+        a key press) are always sent before bulk datagrams (such as animation redraws).
+
+        Each LED datagram is tagged with the rectangular region of the device it updates:
+        for example, an 8x8 quad of a grid, or a ring of an arc. A datagram that sets every
+        LED in its region supersedes any pending datagrams within that region, which are
+        dropped. When an interactive datagram is queued, any pending bulk datagrams that
+        overlap it are promoted ahead of it, so that updates are never applied out of order.
+
+        Args:
+            client: The client to send datagrams through, which must implement send(data).
+            rate (float, optional): The maximum number of datagrams per second. Defaults to 1000.
+            byte_rate (float, optional): The maximum number of bytes per second. Defaults to 256KB.
+        """
+        if rate <= 0 or byte_rate <= 0:
+            raise ValueError("SendQueue: rate and byte_rate must be positive")
+        self.client = client
+        self.rate = rate
+        self.byte_rate = byte_rate
+
+        self.queues = [deque(), deque()]
+        self.condition = threading.Condition()
+        self.datagrams_sent = 0
+        self.datagrams_merged = 0
+
+        self._tokens = self._capacity
+        self._tokens_bytes = self._capacity_bytes
+        self._refill_time = time.perf_counter()
+        self._sending = False
+        self._running = True
+        self.thread = threading.Thread(target=self._run, daemon=True)
+        self.thread.start()
+
+    @property
+    def _capacity(self) -> float:
+        return max(1.0, self.rate * SEND_QUEUE_BURST_DURATION)
+
+    @property
+    def _capacity_bytes(self) -> float:
+        return self.byte_rate * SEND_QUEUE_BURST_DURATION
+
+    def __len__(self):
+        with self.condition:
+            return len(self.queues[PRIORITY_INTERACTIVE]) + len(self.queues[PRIORITY_BULK])
+
+    def enqueue(self,
+                data: bytes,
+                priority: int = PRIORITY_BULK,
+                region: Optional[Region] = None,
+                replaces: bool = False):
+        """
+        Queue a datagram for sending.
+
+        Args:
+            data (bytes): The datagram.
+            priority (int, optional): PRIORITY_INTERACTIVE or PRIORITY_BULK. Defaults to PRIORITY_BULK.
+            region (Region, optional): The region of LEDs that the datagram updates, as
+                                       (x, y, width, height) or REGION_ALL.
+            replaces (bool, optional): Whether the datagram sets every LED in `region`,
+                                       superseding earlier datagrams within it. Defaults to False.
+        """
+        with self.condition:
+            if not self._running:
+                raise RuntimeError("SendQueue is closed")
+            if replaces and region is not None:
+                self._drop_region(region)
+            if priority == PRIORITY_INTERACTIVE and region is not None:
+                self._promote_region(region)
+            self.queues[priority].append((region, data))
+            self.condition.notify()
+
+    @staticmethod
+    def _contains(outer: Region, inner: Optional[Region]) -> bool:
+        if inner is None:
+            return False
+        if outer == REGION_ALL:
+            return True
+        if inner == REGION_ALL:
+            return False
+        return (outer[0] <= inner[0] and inner[0] + inner[2] <= outer[0] + outer[2] and
+                outer[1] <= inner[1] and inner[1] + inner[3] <= outer[1] + outer[3])
+
+    @staticmethod
+    def _intersects(a: Region, b: Optional[Region]) -> bool:
+        if b is None:
+            return False
+        if a == REGION_ALL or b == REGION_ALL:
+            return True
+        return (a[0] < b[0] + b[2] and b[0] < a[0] + a[2] and
+                a[1] < b[1] + b[3] and b[1] < a[1] + a[3])
+
+    def _drop_region(self, region: Region):
+        for queue in self.queues:
+            retained = [entry for entry in queue if not self._contains(region, entry[0])]
+            if len(retained) < len(queue):
+                self.datagrams_merged += len(queue) - len(retained)
+                queue.clear()
+                queue.extend(retained)
+
+    def _promote_region(self, region: Region):
+        bulk = self.queues[PRIORITY_BULK]
+        if not bulk:
+            return
+        promoted = [entry for entry in bulk if self._intersects(region, entry[0])]
+        if promoted:
+            retained = [entry for entry in bulk if not self._intersects(region, entry[0])]
+            self.queues[PRIORITY_INTERACTIVE].extend(promoted)
+            bulk.clear()
+            bulk.extend(retained)
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """
+        Block until every queued datagram has been sent.
+
+        Args:
+            timeout (float, optional): The maximum time to wait, in seconds.
+
+        Returns:
+            bool: True if the queue was emptied, False if the timeout elapsed.
+        """
+        with self.condition:
+            return self.condition.wait_for(lambda: not (self._sending or any(self.queues)), timeout)
+
+    def close(self, flush: bool = True):
+        """
+        Stop the send thread.
+
+        Args:
+            flush (bool, optional): If True, send any queued datagrams first. Defaults to True.
+        """
+        if flush:
+            self.flush()
+        with self.condition:
+            self._running = False
+            self.condition.notify_all()
+        self.thread.join()
+
+    def _refill(self):
+        now = time.perf_counter()
+        elapsed = now - self._refill_time
+        self._refill_time = now
+        self._tokens = min(self._capacity, self._tokens + elapsed * self.rate)
+        self._tokens_bytes = min(self._capacity_bytes, self._tokens_bytes + elapsed * self.byte_rate)
+
+    def _wait_duration(self, size: int) -> float:
+        """
+        Returns the time until a datagram of `size` bytes can be sent within the rate limits.
+        A datagram larger than the burst capacity is sent once the byte budget is full.
+        """
+        size = min(size, self._capacity_bytes)
+        return max(0.0,
+                   (1.0 - self._tokens) / self.rate,
+                   (size - self._tokens_bytes) / self.byte_rate)
+
+    def _run(self):
+        while True:
+            with self.condition:
+                self._sending = False
+                self.condition.notify_all()
+                self.condition.wait_for(lambda: any(self.queues) or not self._running)
+                if not self._running:
+                    return
+                self._refill()
+                queue = self.queues[PRIORITY_INTERACTIVE] or self.queues[PRIORITY_BULK]
+                wait_duration = self._wait_duration(len(queue[0][1]))
+                if wait_duration > 0:
+                    #--------------------------------------------------------------------------------
+                    # Wait outside of the critical section, and re-select the next datagram
+                    # afterwards, so that an interactive datagram queued in the meantime
+                    # (or a merge that drops the pending one) is respected.
+                    #--------------------------------------------------------------------------------
+                    self.condition.wait(wait_duration)
+                    continue
+                region, data = queue.popleft()
+                self._tokens -= 1
+                self._tokens_bytes -= len(data)
+                self._sending = True
+            try:
+                self.client.send(data)
+                self.datagrams_sent += 1
+            except Exception:
+                logger.exception("SendQueue: Exception sending datagram")
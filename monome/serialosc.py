@@ -1,14 +1,12 @@
-from pythonosc.dispatcher import Dispatcher
-from pythonosc.osc_server import ThreadingOSCUDPServer
-from pythonosc.udp_client import SimpleUDPClient
 from singleton_decorator import singleton
 from dataclasses import dataclass
-import threading
 import datetime
 import logging
 import time
 
 from .exceptions import NoDevicesFoundError
+from .transport import OSCTransport
+from .dispatch import OSCDispatcher, UnknownMessageLogger
 
 SERIALOSC_HOST = "127.0.0.1"
 SERIALOSC_SERVER_PORT = 12002
@@ -35,7 +33,8 @@ class DeviceSpec:
 @singleton
 class SerialOSC:
     def __init__(self):
-        dispatcher = Dispatcher()
+        dispatcher = OSCDispatcher()
+        self._unknown_message_logger = UnknownMessageLogger("SerialOSC")
 
         dispatcher.map("/serialosc/device", self._osc_handle_device_listed)
         dispatcher.map("/serialosc/add", self._osc_handle_device_added)
@@ -43,16 +42,15 @@ class SerialOSC:
         dispatcher.set_default_handler(self._osc_handle_unknown_message)
 
         #--------------------------------------------------------------------------------
-        # Listen on a random UDP port
+        # Receive and send via the process-wide shared transport socket
         #--------------------------------------------------------------------------------
-        self.server = ThreadingOSCUDPServer((SERIALOSC_HOST, 0), dispatcher)
-        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
-        self.thread.start()
-        self.server_port = self.server.socket.getsockname()[1]
+        self.transport = OSCTransport()
+        self.transport.add_endpoint(dispatcher, port=SERIALOSC_SERVER_PORT, prefix="serialosc")
+        self.server_port = self.transport.port
 
-        self.client = SimpleUDPClient(SERIALOSC_HOST, SERIALOSC_SERVER_PORT)
-        self.client.send_message("/serialosc/list", [SERIALOSC_HOST, self.server_port])
         self.available_devices: list[DeviceSpec] = []
+        self.client = self.transport.client(SERIALOSC_SERVER_PORT, SERIALOSC_HOST)
+        self.client.send_message("/serialosc/list", [SERIALOSC_HOST, self.server_port])
 
     def await_devices(self, timeout: float = 0.5):
         """
@@ -75,7 +73,7 @@ class SerialOSC:
         self.client.send_message("/serialosc/notify", [SERIALOSC_HOST, self.server_port])
 
     def _osc_handle_unknown_message(self, address, *args):
-        logger.warning("SerialOSC: No handler for message: %s %s" % (address, args))
+        self._unknown_message_logger.log(address, args)
 
     def _osc_handle_device_listed(self, address, device_id, device_model, port):
         logger.info("Discovered serial OSC device: %s (model %s, port %d)" % (device_id, device_model, port))
@@ -5,13 +5,159 @@
 #------------------------------------------------------------------------
 from signalflow import *
 from .arc import Arc
+from .arc.event import ArcRotationEvent
+from .grid import Grid, GridKeyEvent
+import numpy as np
+import threading
 import logging
+import time
+
+from typing import Optional
 
 logger = logging.getLogger(__name__)
 
-shared_arc = None
+shared_arc_bridge = None
+shared_grid_bridge = None
+
+ARC_CONTROL_LED_INTENSITY = 7
+CONTROL_REFRESH_RATE = 30.0
+
+# Used until an AudioGraph has been created
+DEFAULT_BLOCK_DURATION = 256 / 44100
+
+
+class SignalFlowBridge:
+    def __init__(self,
+                 graph: Optional[AudioGraph] = None,
+                 refresh_rate: float = CONTROL_REFRESH_RATE):
+        """
+        Base class for bridges between a monome device and a SignalFlow graph.
+
+        An update thread wakes once per audio block and calls update(), which subclasses
+        implement to push parameter changes to the graph. Redraws are rate-limited to
+        `refresh_rate` via should_draw(). update() is called with `lock` held, which
+        subclasses also hold when adding or removing controls from other threads.
+
+        Args:
+            graph (AudioGraph, optional): The graph whose block size sets the update rate.
+                                          Defaults to the shared graph, once created.
+            refresh_rate (float, optional): The maximum LED redraw rate, in Hz. Defaults to 30.
+        """
+        self.graph = graph
+        self.refresh_rate = refresh_rate
+        self.last_draw_time = 0.0
+        self.lock = threading.Lock()
+
+        self.thread = threading.Thread(target=self._run, daemon=True)
+        self.thread.start()
+
+    @property
+    def block_duration(self) -> float:
+        """
+        The duration of one audio output block, in seconds.
+        """
+        graph = self.graph if self.graph is not None else AudioGraph.get_shared_graph()
+        if graph is None:
+            return DEFAULT_BLOCK_DURATION
+        return graph.output_buffer_size / graph.sample_rate
+
+    def should_draw(self) -> bool:
+        """
+        Returns True, and resets the refresh interval, if the device may be redrawn now.
+        """
+        now = time.monotonic()
+        if now - self.last_draw_time >= 1.0 / self.refresh_rate:
+            self.last_draw_time = now
+            return True
+        return False
+
+    def _run(self):
+        while True:
+            time.sleep(self.block_duration)
+            try:
+                with self.lock:
+                    self.update()
+            except Exception:
+                logger.exception("%s: Exception during update" % self.__class__.__name__)
+
+    def update(self):
+        raise NotImplementedError("Subclasses must implement update() method")
+
+
+class ArcControlBridge (SignalFlowBridge):
+    def __init__(self,
+                 arc: Optional[Arc] = None,
+                 graph: Optional[AudioGraph] = None,
+                 refresh_rate: float = CONTROL_REFRESH_RATE):
+        """
+        Connects the rings of an Arc to ArcControl patches in a SignalFlow graph.
+
+        A single handler receives rotation events and dispatches them by ring index.
+        Deltas are accumulated without locking: the receive thread is the only writer of
+        `delta_received`, and otherwise only the update thread writes `delta_applied`.
+        Once per audio block, the outstanding deltas are applied to the controls'
+        parameter values, and changed rings are redrawn at most `refresh_rate` times
+        per second. Controls are added and removed under the bridge's lock, so that
+        deltas received before a control was added are never applied to it.
+
+        Args:
+            arc (Arc, optional): The Arc to use. Defaults to a new Arc.
+            graph (AudioGraph, optional): The graph whose block size sets the update rate.
+                                          Defaults to the shared graph, once created.
+            refresh_rate (float, optional): The maximum ring redraw rate, in Hz. Defaults to 30.
+        """
+        if arc is None:
+            arc = Arc()
+        self.arc = arc
+        self.controls: list[Optional[ArcControl]] = [None] * self.arc.ring_count
+        self.delta_received = np.zeros(self.arc.ring_count)
+        self.delta_applied = np.zeros(self.arc.ring_count)
+        self.rings_to_draw: set[int] = set()
+
+        self.arc.add_handler(self._handle_rotation)
+        super().__init__(graph, refresh_rate)
+
+    def add_control(self, control: "ArcControl"):
+        with self.lock:
+            if self.controls[control.ring] is not None:
+                raise ValueError("Ring %d is already assigned to an ArcControl" % control.ring)
+            self.controls[control.ring] = control
+            self.delta_applied[control.ring] = self.delta_received[control.ring]
+            self.rings_to_draw.add(control.ring)
+
+    def remove_control(self, control: "ArcControl"):
+        with self.lock:
+            if self.controls[control.ring] is not control:
+                raise ValueError("ArcControl is not assigned to ring %d" % control.ring)
+            self.controls[control.ring] = None
+
+    def _handle_rotation(self, event: ArcRotationEvent):
+        self.delta_received[event.ring] += event.delta
+
+    def update(self):
+        """
+        Apply accumulated deltas to their controls, and redraw changed rings if the
+        refresh interval has elapsed. Called once per audio block by the update thread.
+        """
+        delta_received = self.delta_received.copy()
+        deltas = delta_received - self.delta_applied
+        self.delta_applied = delta_received
+
+        for ring in np.flatnonzero(deltas):
+            control = self.controls[ring]
+            if control is not None:
+                control._apply_delta(deltas[ring])
+                self.rings_to_draw.add(int(ring))
+
+        if self.rings_to_draw and self.should_draw():
+            rings_to_draw = self.rings_to_draw
+            self.rings_to_draw = set()
+            for ring in rings_to_draw:
+                control = self.controls[ring]
+                if control is not None:
+                    control.draw()
+
 
-# TODO: Throw an error when two ArcControls use the same ring
 class ArcControl(Patch):
     def __init__(self,
                  ring: int,
@@ -19,11 +165,13 @@ class ArcControl(Patch):
                  range_max: float = 1.0,
                  initial: float = None,
                  mode: str = "absolute",
-                 curve: str = "linear"):
+                 curve: str = "linear",
+                 bridge: Optional[ArcControlBridge] = None):
         super().__init__()
-        global shared_arc
+        global shared_arc_bridge
 
         assert mode in ["absolute"]
+        assert curve in ["linear", "exponential"]
         self.value = self.add_input("value")
         self.value_smoothed = Smooth(self.value, 0.999)
         self.set_output(self.value_smoothed)
@@ -40,47 +188,262 @@ class ArcControl(Patch):
             self._value_norm = 0.5
         self.mode = mode
 
-        if shared_arc is None:
-            shared_arc = Arc()
-        self.arc = shared_arc
-
-        self.update()
+        if bridge is None:
+            if shared_arc_bridge is None:
+                shared_arc_bridge = ArcControlBridge()
+            bridge = shared_arc_bridge
+        self.bridge = bridge
+        self.arc = bridge.arc
 
-        @self.arc.handler
-        def handle_encoder(event_ring: int, delta: int):
-            if event_ring == ring:
-                # normalise to 0..1
-                delta = delta / 7
-                # scale down to 0.05 max
-                delta = delta * 0.05
-                self._value_norm += delta
-                self._value_norm = clip(self._value_norm, 0, 1)
+        self._update_input()
+        self.bridge.add_control(self)
 
-                self.update()
+    def _apply_delta(self, delta: float):
+        # Normalise to 0..1, and scale down to 0.05 max per maximal encoder tick
+        self._value_norm = clip(self._value_norm + (delta / 7) * 0.05, 0, 1)
+        self._update_input()
 
-    def update(self):
-        #--------------------------------------------------------------------------------
-        # Update the Arc LED display
-        #--------------------------------------------------------------------------------
-        ring_ones = int(64 * self._value_norm)
-        ring_zeros = 64 - ring_ones
-        led_intensity = 7
-        self.arc.ring_map(self.ring, ([led_intensity] * ring_ones) + ([0] * ring_zeros))
-
-        #--------------------------------------------------------------------------------
-        # Update the SignalFlow node
-        #--------------------------------------------------------------------------------
+    def _update_input(self):
         if self.curve == "exponential":
             value_scaled = scale_lin_exp(self._value_norm, 0, 1, self.range_min, self.range_max)
         elif self.curve == "linear":
             value_scaled = scale_lin_lin(self._value_norm, 0, 1, self.range_min, self.range_max)
         self.set_input("value", value_scaled)
 
+    def update(self):
+        """
+        Push the current value to the SignalFlow node, and redraw the ring.
+        """
+        self._update_input()
+        self.draw()
+
+    def draw(self):
+        led_count = self.arc.led_count
+        ring_ones = int(led_count * self._value_norm)
+        levels = np.where(np.arange(led_count) < ring_ones, ARC_CONTROL_LED_INTENSITY, 0)
+        self.arc.ring_map(self.ring, levels)
+
+
+class GridControlBridge (SignalFlowBridge):
+    def __init__(self,
+                 grid: Optional[Grid] = None,
+                 graph: Optional[AudioGraph] = None,
+                 refresh_rate: float = CONTROL_REFRESH_RATE):
+        """
+        Connects regions of a Grid to GridToggleControl, GridFaderControl and GridSequencerRow
+        objects in a SignalFlow graph.
+
+        The state of every key lives in `cells`, a shared uint8 array written only by the
+        receive thread. Once per audio block, it is compared with the state last pushed to
+        the graph, and only the controls whose cells changed are updated. LED feedback is
+        rendered from the same array, and flushed as a single framebuffer update of the
+        changed quads at most `refresh_rate` times per second.
+
+        Args:
+            grid (Grid, optional): The Grid to use. Defaults to a new Grid.
+            graph (AudioGraph, optional): The graph whose block size sets the update rate.
+                                          Defaults to the shared graph, once created.
+            refresh_rate (float, optional): The maximum LED redraw rate, in Hz. Defaults to 30.
+        """
+        if grid is None:
+            grid = Grid()
+        self.grid = grid
+        self.cells = np.zeros((grid.height, grid.width), dtype=np.uint8)
+        self.cells_applied = self.cells.copy()
+        self.control_map = np.full((grid.height, grid.width), -1, dtype=np.int32)
+        self.controls: list = []
+        self.frame_dirty = True
+
+        self.led_intensity_high = 15
+        self.led_intensity_low = 3
+
+        self.grid.add_handler(self._handle_key)
+        super().__init__(graph, refresh_rate)
+
+    def add_control(self, control):
+        with self.lock:
+            region = self.control_map[control.region]
+            if region.size != control.height * control.width:
+                raise ValueError("Control extends beyond the edges of the Grid")
+            if np.any(region != -1):
+                raise ValueError("Grid region is already assigned to a control")
+            region[:] = len(self.controls)
+            self.controls.append(control)
+            self.cells[control.region] = control._initial_cells()
+            control._update(self.cells[control.region])
+            self.frame_dirty = True
+
+    def _handle_key(self, event: GridKeyEvent):
+        if not event.down:
+            return
+        index = self.control_map[event.y, event.x]
+        if index >= 0:
+            self.controls[index]._handle_key(self.cells, event.x, event.y)
+
+    def update(self):
+        """
+        Push changed control values to the graph, and flush the LED frame if the refresh
+        interval has elapsed. Called once per audio block by the update thread.
+        """
+        cells = self.cells.copy()
+        changed = cells != self.cells_applied
+        if np.any(changed):
+            self.cells_applied = cells
+            for index in np.unique(self.control_map[changed]):
+                if index >= 0:
+                    control = self.controls[index]
+                    control._update(cells[control.region])
+            self.frame_dirty = True
+
+        if self.frame_dirty and self.should_draw():
+            self.frame_dirty = False
+            mask = self.control_map >= 0
+            frame = self.grid.frame.copy()
+            frame[mask] = np.where(cells[mask], self.led_intensity_high, self.led_intensity_low)
+            self.grid.led_level_frame(frame)
+
+
+def _get_shared_grid_bridge() -> GridControlBridge:
+    global shared_grid_bridge
+    if shared_grid_bridge is None:
+        shared_grid_bridge = GridControlBridge()
+    return shared_grid_bridge
+
+
+class GridToggleControl(Patch):
+    def __init__(self,
+                 x: int,
+                 y: int,
+                 initial: bool = False,
+                 bridge: Optional[GridControlBridge] = None):
+        """
+        A key that toggles the patch's output between 0 and 1.
+        """
+        super().__init__()
+        self.value = self.add_input("value", float(initial))
+        self.set_output(self.value)
+        self.x = x
+        self.y = y
+        self.width = 1
+        self.height = 1
+        self.initial = initial
+        self.bridge = bridge if bridge is not None else _get_shared_grid_bridge()
+        self.bridge.add_control(self)
+
+    @property
+    def region(self) -> tuple[slice, slice]:
+        return slice(self.y, self.y + 1), slice(self.x, self.x + 1)
+
+    def _initial_cells(self) -> np.ndarray:
+        return int(self.initial)
+
+    def _handle_key(self, cells: np.ndarray, x: int, y: int):
+        cells[y, x] ^= 1
+
+    def _update(self, cells: np.ndarray):
+        self.set_input("value", float(cells[0, 0]))
+
+
+class GridFaderControl(Patch):
+    def __init__(self,
+                 y: int,
+                 x: int = 0,
+                 width: int = None,
+                 range_min: float = 0.0,
+                 range_max: float = 1.0,
+                 initial: float = None,
+                 curve: str = "linear",
+                 bridge: Optional[GridControlBridge] = None):
+        """
+        A horizontal fader occupying part or all of a row, similar to GridPageHorizontalLevels.
+        Pressing a key sets the fader's level to that key's position.
+        """
+        super().__init__()
+        assert curve in ["linear", "exponential"]
+        self.bridge = bridge if bridge is not None else _get_shared_grid_bridge()
+        self.value = self.add_input("value")
+        self.value_smoothed = Smooth(self.value, 0.999)
+        self.set_output(self.value_smoothed)
+        self.x = x
+        self.y = y
+        self.width = width if width is not None else self.bridge.grid.width - x
+        self.height = 1
+        self.range_min = range_min
+        self.range_max = range_max
+        self.curve = curve
+        if initial is not None:
+            if self.curve == "exponential":
+                self.initial_norm = scale_exp_lin(initial, range_min, range_max, 0, 1)
+            elif self.curve == "linear":
+                self.initial_norm = scale_lin_lin(initial, range_min, range_max, 0, 1)
+        else:
+            self.initial_norm = 0.0
+        self.bridge.add_control(self)
+
+    @property
+    def region(self) -> tuple[slice, slice]:
+        return slice(self.y, self.y + 1), slice(self.x, self.x + self.width)
+
+    def _initial_cells(self) -> np.ndarray:
+        level = int(round(self.initial_norm * (self.width - 1)))
+        return np.arange(self.width) <= level
+
+    def _handle_key(self, cells: np.ndarray, x: int, y: int):
+        cells[y, self.x:x + 1] = 1
+        cells[y, x + 1:self.x + self.width] = 0
+
+    def _update(self, cells: np.ndarray):
+        level = max(0, np.count_nonzero(cells) - 1)
+        value_norm = level / max(1, self.width - 1)
+        if self.curve == "exponential":
+            value_scaled = scale_lin_exp(value_norm, 0, 1, self.range_min, self.range_max)
+        elif self.curve == "linear":
+            value_scaled = scale_lin_lin(value_norm, 0, 1, self.range_min, self.range_max)
+        self.set_input("value", value_scaled)
+
+
+class GridSequencerRow:
+    def __init__(self,
+                 y: int,
+                 x: int = 0,
+                 length: int = None,
+                 bridge: Optional[GridControlBridge] = None):
+        """
+        A row of step toggles, exposed as a single-channel SignalFlow Buffer with one
+        sample per step (1.0 for active steps, 0.0 otherwise), suitable for indexing
+        from a clocked counter.
+        """
+        self.bridge = bridge if bridge is not None else _get_shared_grid_bridge()
+        self.x = x
+        self.y = y
+        self.width = length if length is not None else self.bridge.grid.width - x
+        self.height = 1
+        self.buffer = Buffer(1, self.width)
+        self.bridge.add_control(self)
+
+    @property
+    def region(self) -> tuple[slice, slice]:
+        return slice(self.y, self.y + 1), slice(self.x, self.x + self.width)
+
+    @property
+    def steps(self) -> np.ndarray:
+        return self.bridge.cells[self.region][0].copy()
+
+    def _initial_cells(self) -> np.ndarray:
+        return 0
+
+    def _handle_key(self, cells: np.ndarray, x: int, y: int):
+        cells[y, x] ^= 1
+
+    def _update(self, cells: np.ndarray):
+        self.buffer.data[0][:] = cells[0]
+
+
 if __name__ == "__main__":
     graph = AudioGraph()
-    
+
     for index, frequency in enumerate([100, 201, 403, 805]):
         sine = SineOscillator(frequency + 5.5) * 0.25 * ArcControl(index)
         StereoPanner(sine).play()
-        
-    graph.wait()
\ No newline at end of file
+
+    graph.wait()
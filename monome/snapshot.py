@@ -0,0 +1,50 @@
+import numpy as np
+import threading
+
+from typing import Union
+
+
+class SnapshotBuffer:
+    def __init__(self, values: Union[np.ndarray, list]):
+        """
+        Publishes consistent, immutable snapshots of state that is mutated on one thread
+        and read from others.
+
+        Each publish() copies the state into a new read-only array, then replaces the
+        reference to the published array in a single assignment. Readers only ever take
+        that reference, so they never need a lock, and never see a partially-updated
+        (torn) state: an array, once published, is never written to again.
+
+        Publishing is serialised by `lock`, so that state mutated from several threads is
+        published in the order that it was copied. Callers that build the state to publish,
+        rather than passing the live array, should hold `lock` while building it.
+
+        Args:
+            values (np.ndarray | list): The initial state.
+        """
+        self.generation = 0
+        self.lock = threading.RLock()
+        self._published = self._freeze(values)
+
+    @staticmethod
+    def _freeze(values: Union[np.ndarray, list]) -> np.ndarray:
+        snapshot = np.array(values, copy=True)
+        snapshot.flags.writeable = False
+        return snapshot
+
+    def publish(self, values: Union[np.ndarray, list]):
+        """
+        Publish a new state.
+
+        Args:
+            values (np.ndarray | list): The new state.
+        """
+        with self.lock:
+            self._published = self._freeze(values)
+            self.generation += 1
+
+    def snapshot(self) -> np.ndarray:
+        """
+        Returns the most recently published state, as a read-only array.
+        """
+        return self._published
@@ -0,0 +1,78 @@
+import threading
+import logging
+import time
+
+from typing import Callable, Optional
+
+from .clock import Clock
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_TIMER_WHEEL_RESOLUTION = 0.005
+DEFAULT_TIMER_WHEEL_SLOTS = 512
+
+
+class TimerWheel:
+    def __init__(self,
+                 resolution: float = DEFAULT_TIMER_WHEEL_RESOLUTION,
+                 slots: int = DEFAULT_TIMER_WHEEL_SLOTS):
+        """
+        A hashed timer wheel, which runs many short timeouts from a single clock thread.
+
+        Each timeout is placed in the slot for its deadline tick. On each tick, only the
+        timeouts in the current slot are examined. Timeouts cannot be cancelled: instead,
+        callbacks should check whether the state they were scheduled for still holds,
+        which makes scheduling a timeout as cheap as appending to a list.
+
+        Args:
+            resolution (float, optional): The tick interval, in seconds. Defaults to 5ms.
+            slots (int, optional): The number of slots in the wheel. Defaults to 512.
+        """
+        self.resolution_ns = int(resolution * 1e9)
+        self.slots: list[list] = [[] for _ in range(slots)]
+        self.lock = threading.Lock()
+        self.tick_count = time.perf_counter_ns() // self.resolution_ns
+        self.clock = Clock(resolution, self._handle_clock_tick, lookahead=0)
+
+    def start(self):
+        self.clock.start()
+
+    def stop(self):
+        self.clock.stop()
+
+    def schedule(self, delay: float, callback: Callable, *args):
+        """
+        Call `callback(*args)` on the wheel's thread after `delay` seconds, rounded up
+        to the wheel's resolution.
+        """
+        deadline_tick = -(-(time.perf_counter_ns() + int(delay * 1e9)) // self.resolution_ns)
+        with self.lock:
+            deadline_tick = max(deadline_tick, self.tick_count + 1)
+            self.slots[deadline_tick % len(self.slots)].append((deadline_tick, callback, args))
+
+    def advance(self, time_ns: Optional[int] = None):
+        """
+        Fire every timeout whose deadline is at or before `time_ns`.
+        """
+        if time_ns is None:
+            time_ns = time.perf_counter_ns()
+        target_tick = time_ns // self.resolution_ns
+        due = []
+        with self.lock:
+            # After a long stall, visiting each slot once is enough to find every due timeout
+            first_tick = max(self.tick_count + 1, target_tick - len(self.slots) + 1)
+            for tick in range(first_tick, target_tick + 1):
+                slot = self.slots[tick % len(self.slots)]
+                if not slot:
+                    continue
+                due.extend(entry for entry in slot if entry[0] <= target_tick)
+                slot[:] = [entry for entry in slot if entry[0] > target_tick]
+            self.tick_count = max(self.tick_count, target_tick)
+        for _, callback, args in sorted(due, key=lambda entry: entry[0]):
+            try:
+                callback(*args)
+            except Exception:
+                logger.exception("TimerWheel: Exception in timeout callback")
+
+    def _handle_clock_tick(self, tick: int, time_ns: int):
+        self.advance()
@@ -0,0 +1,240 @@
+from pythonosc.osc_message_builder import OscMessageBuilder
+from singleton_decorator import singleton
+import numpy as np
+import threading
+import logging
+import socket
+import time
+
+from typing import Optional, Union
+
+from .dispatch import OSCDispatcher
+from .event import set_receive_time
+
+TRANSPORT_HOST = "127.0.0.1"
+TRANSPORT_BUFFER_SIZE = 65536
+
+logger = logging.getLogger(__name__)
+
+
+def _osc_string(value: str) -> bytes:
+    data = value.encode("ascii") + b"\0"
+    return data + b"\0" * (-len(data) % 4)
+
+
+class OSCIntMessageBuffer:
+    def __init__(self, address: str, count: int):
+        """
+        A preallocated OSC message with a fixed address and `count` int32 arguments.
+        The arguments are written directly into the message's payload, as big-endian
+        int32 values, in a single vectorised conversion.
+
+        Args:
+            address (str): The OSC address.
+            count (int): The number of int32 arguments.
+        """
+        header = _osc_string(address) + _osc_string("," + "i" * count)
+        self.buffer = bytearray(len(header) + 4 * count)
+        self.buffer[:len(header)] = header
+        self.payload = np.frombuffer(self.buffer, dtype=">i4", offset=len(header))
+        self.view = memoryview(self.buffer)
+
+    def encode(self, args: list[int], values: np.ndarray) -> memoryview:
+        """
+        Write the arguments into the buffer, and return a view of the complete message.
+        The view is only valid until the next call to encode().
+
+        Args:
+            args (list[int]): Leading integer arguments.
+            values (np.ndarray): An array of integer arguments following `args`.
+
+        Returns:
+            memoryview: The encoded message.
+        """
+        count = len(args)
+        self.payload[:count] = args
+        self.payload[count:] = values
+        return self.view
+
+
+class OSCTransportClient:
+    def __init__(self, transport: "OSCTransport", host: str, port: int):
+        """
+        Sends OSC messages to a single remote port via the shared transport socket.
+        Exposes the same send_message() interface as python-osc's SimpleUDPClient.
+
+        Args:
+            transport (OSCTransport): The shared transport.
+            host (str): The remote host.
+            port (int): The remote port.
+        """
+        self.transport = transport
+        self.host = host
+        self.port = port
+        self._int_message_buffers = threading.local()
+
+    def send_message(self, address: str, value: Union[int, float, str, list] = None):
+        self.send(self.build_message(address, value))
+
+    def send(self, data: Union[bytes, memoryview]):
+        self.transport.send(data, self.host, self.port)
+
+    def build_int_message(self, address: str, args: list[int], values: np.ndarray) -> memoryview:
+        """
+        Encode a message whose arguments are all int32, without creating intermediate Python
+        objects for `values`. The message is written into a preallocated buffer, owned by
+        the calling thread, and is only valid until the thread's next call with the same
+        address and argument count.
+
+        Args:
+            address (str): The OSC address.
+            args (list[int]): Leading integer arguments.
+            values (np.ndarray): An array of integer arguments following `args`.
+
+        Returns:
+            memoryview: The encoded message.
+        """
+        buffers = getattr(self._int_message_buffers, "buffers", None)
+        if buffers is None:
+            buffers = self._int_message_buffers.buffers = {}
+        key = (address, len(args) + len(values))
+        buffer = buffers.get(key)
+        if buffer is None:
+            buffer = buffers[key] = OSCIntMessageBuffer(address, key[1])
+        return buffer.encode(args, values)
+
+    def build_message(self, address: str, value: Union[int, float, str, list] = None) -> bytes:
+        builder = OscMessageBuilder(address=address)
+        if value is None:
+            values = []
+        elif not isinstance(value, (list, tuple)):
+            values = [value]
+        else:
+            values = value
+        for val in values:
+            builder.add_arg(val)
+        return builder.build().dgram
+
+
+#--------------------------------------------------------------------------------
+# OSCTransport is a singleton class: all devices in a process share one bound
+# UDP socket and one receive thread.
+#--------------------------------------------------------------------------------
+
+@singleton
+class OSCTransport:
+    def __init__(self, host: str = TRANSPORT_HOST):
+        """
+        A process-wide UDP transport, multiplexing all serialosc traffic over one socket.
+
+        Incoming datagrams are demultiplexed to the dispatcher registered for their source
+        port. If no dispatcher is registered for the source port, the address prefix is used
+        instead, provided that exactly one endpoint is registered with that prefix.
+
+        Datagrams are received and dispatched on a single thread, so the handlers of every
+        device run one at a time, in the order that their datagrams arrive. A slow handler
+        delays the input of all devices, so long-running work should be passed to another
+        thread.
+
+        Args:
+            host (str, optional): The host to bind to. Defaults to "127.0.0.1".
+        """
+        self.host = host
+        self.socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.socket.bind((host, 0))
+        self.port = self.socket.getsockname()[1]
+
+        self.endpoints_by_port: dict[int, OSCDispatcher] = {}
+        self.endpoints_by_prefix: dict[str, list[OSCDispatcher]] = {}
+        self.lock = threading.Lock()
+
+        self.thread = threading.Thread(target=self._run, daemon=True)
+        self.thread.start()
+
+    def add_endpoint(self, dispatcher: OSCDispatcher, port: int, prefix: Optional[str] = None):
+        """
+        Route datagrams received from `port` (or addressed to `prefix`) to `dispatcher`.
+
+        Args:
+            dispatcher (OSCDispatcher): The dispatcher that handles the endpoint's messages.
+            port (int): The remote port that the endpoint sends from.
+            prefix (str, optional): The OSC address prefix used by the endpoint, without slashes.
+        """
+        with self.lock:
+            self.endpoints_by_port[port] = dispatcher
+            if prefix is not None:
+                self.endpoints_by_prefix.setdefault(prefix, []).append(dispatcher)
+
+    def remove_endpoint(self, dispatcher: OSCDispatcher):
+        """
+        Stop routing datagrams to `dispatcher`.
+
+        Args:
+            dispatcher (OSCDispatcher): A dispatcher previously passed to add_endpoint().
+        """
+        with self.lock:
+            for port, endpoint in list(self.endpoints_by_port.items()):
+                if endpoint is dispatcher:
+                    del self.endpoints_by_port[port]
+            for prefix, endpoints in list(self.endpoints_by_prefix.items()):
+                if dispatcher in endpoints:
+                    endpoints.remove(dispatcher)
+                if not endpoints:
+                    del self.endpoints_by_prefix[prefix]
+
+    def client(self, port: int, host: str = TRANSPORT_HOST) -> OSCTransportClient:
+        """
+        Returns a client that sends to the given remote port through the shared socket.
+
+        Args:
+            port (int): The remote port.
+            host (str, optional): The remote host. Defaults to "127.0.0.1".
+
+        Returns:
+            OSCTransportClient: The client.
+        """
+        return OSCTransportClient(self, host, port)
+
+    def send(self, data: Union[bytes, memoryview], host: str, port: int):
+        self.socket.sendto(data, (host, port))
+
+    def _dispatcher_for_datagram(self, data: bytes, client_address: tuple) -> Optional[OSCDispatcher]:
+        with self.lock:
+            dispatcher = self.endpoints_by_port.get(client_address[1])
+            if dispatcher is not None:
+                return dispatcher
+            if data[:1] == b"/":
+                prefix_end = data.find(b"/", 1)
+                if prefix_end > 0:
+                    prefix = data[1:prefix_end].decode("ascii", errors="replace")
+                    endpoints = self.endpoints_by_prefix.get(prefix, [])
+                    if len(endpoints) == 1:
+                        return endpoints[0]
+        return None
+
+    def _run(self):
+        while True:
+            try:
+                data, client_address = self.socket.recvfrom(TRANSPORT_BUFFER_SIZE)
+            except OSError as e:
+                if self.socket.fileno() < 0:
+                    return
+                # For example, Windows reports WSAECONNRESET on a UDP socket after a
+                # datagram is sent to a closed port. This must not stop the receive thread.
+                logger.warning("OSCTransport: Error receiving datagram: %s" % e)
+                continue
+            receive_time_ns = time.perf_counter_ns()
+            dispatcher = self._dispatcher_for_datagram(data, client_address)
+            if dispatcher is None:
+                logger.warning("OSCTransport: No endpoint for datagram from %s:%d" % client_address)
+                continue
+            set_receive_time(receive_time_ns)
+            try:
+                dispatcher.call_handlers_for_packet(data, client_address)
+            except Exception:
+                #--------------------------------------------------------------------------------
+                # Handlers run on the shared receive thread, so an exception in one
+                # device's handler must not stop delivery to the others.
+                #--------------------------------------------------------------------------------
+                logger.exception("OSCTransport: Exception in handler for datagram from %s:%d" % client_address)
+            set_receive_time(None)
@@ -1,4 +1,5 @@
 from decimal import Decimal, ROUND_HALF_UP
+import numpy as np
 
 def round_to_integer(value: float) -> int:
     """
@@ -12,4 +13,25 @@ def round_to_integer(value: float) -> int:
     Returns:
         int: The rounded integer.
     """
-    return int(Decimal(value).to_integral_value(rounding=ROUND_HALF_UP))
\ No newline at end of file
+    return int(Decimal(value).to_integral_value(rounding=ROUND_HALF_UP))
+
+def as_level_array(levels) -> np.ndarray:
+    """
+    Returns `levels` as a one-dimensional array of integers, without copying if possible.
+    Accepts any object supporting the buffer protocol (bytes, bytearray, memoryview,
+    array.array, or a NumPy array), in which case the buffer is viewed in place,
+    as well as lists of integers.
+
+    Args:
+        levels: The levels.
+
+    Returns:
+        np.ndarray: The levels.
+    """
+    if isinstance(levels, np.ndarray):
+        return levels.reshape(-1)
+    try:
+        view = memoryview(levels)
+    except TypeError:
+        return np.asarray(levels, dtype=np.int32).reshape(-1)
+    return np.asarray(view).reshape(-1)
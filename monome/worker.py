@@ -0,0 +1,370 @@
+from __future__ import annotations
+
+from multiprocessing import shared_memory
+import multiprocessing
+import numpy as np
+import threading
+import logging
+import time
+
+from typing import Callable, Optional
+
+from .recording import EVENT_RECORD_DTYPE, EVENT_TYPE_GRID_KEY, EVENT_TYPE_ENC_DELTA, EVENT_TYPE_ENC_KEY
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_WORKER_REFRESH_RATE = 60.0
+DEFAULT_WORKER_EVENT_CAPACITY = 4096
+WORKER_EVENT_POLL_INTERVAL = 0.001
+WORKER_STARTUP_TIMEOUT = 10.0
+
+# Shared memory blocks begin with a 64-byte header of uint64 counters, so that the
+# data that follows is aligned, and the counters do not share a cache line with it.
+SHARED_HEADER_SIZE = 64
+
+
+class SharedEventRing:
+    def __init__(self, name: Optional[str] = None, capacity: int = DEFAULT_WORKER_EVENT_CAPACITY):
+        """
+        A single-producer, single-consumer ring buffer of input events in shared memory,
+        stored as records of EVENT_RECORD_DTYPE.
+
+        The producer writes a record, then increments the write count. The consumer keeps
+        its own read count, so no locks are needed between processes. If the consumer falls
+        `capacity` or more events behind, the oldest events are dropped.
+
+        Args:
+            name (str, optional): The name of an existing ring to attach to. If None, a new ring is created.
+            capacity (int, optional): The number of events in a new ring. Must be a power of two.
+        """
+        if name is None:
+            if capacity & (capacity - 1):
+                raise ValueError("SharedEventRing: capacity must be a power of two")
+            size = SHARED_HEADER_SIZE + capacity * EVENT_RECORD_DTYPE.itemsize
+            self.shm = shared_memory.SharedMemory(create=True, size=size)
+            self.owner = True
+        else:
+            self.shm = shared_memory.SharedMemory(name=name)
+            self.owner = False
+        self.header = np.ndarray((2,), dtype=np.uint64, buffer=self.shm.buf)
+        if self.owner:
+            self.header[:] = (0, capacity)
+        self.capacity = int(self.header[1])
+        self.records = np.ndarray((self.capacity,), dtype=EVENT_RECORD_DTYPE,
+                                  buffer=self.shm.buf, offset=SHARED_HEADER_SIZE)
+        self.read_count = 0
+
+    @property
+    def name(self) -> str:
+        return self.shm.name
+
+    def record(self, event_type: int, a: int, b: int, c: int = 0, timestamp: Optional[int] = None):
+        """
+        Append an event. Has the same interface as EventRecorder.record().
+        Must only be called from a single thread of the producer process.
+        """
+        if timestamp is None:
+            timestamp = time.perf_counter_ns()
+        write_count = int(self.header[0])
+        self.records[write_count & (self.capacity - 1)] = (timestamp, event_type, 0, a, b, c)
+        self.header[0] = write_count + 1
+
+    def read(self) -> np.ndarray:
+        """
+        Returns the events written since the previous read, as a structured array of EVENT_RECORD_DTYPE.
+        """
+        # The producer may be writing the next event over the oldest one, so at most
+        # capacity - 1 events can be read.
+        write_count = int(self.header[0])
+        read_count = self.read_count
+        if write_count - read_count >= self.capacity:
+            logger.warning("SharedEventRing: Dropped %d events" % (write_count - read_count - self.capacity + 1))
+            read_count = write_count - self.capacity + 1
+        if read_count == write_count:
+            return self.records[:0].copy()
+        records = self.records[np.arange(read_count, write_count) & (self.capacity - 1)]
+        self.read_count = write_count
+
+        # If the producer lapped the ring while the records were being copied, drop
+        # those that it may have overwritten.
+        overwritten = int(self.header[0]) - self.capacity + 1 - read_count
+        if overwritten > 0:
+            logger.warning("SharedEventRing: Dropped %d events" % min(overwritten, len(records)))
+            records = records[overwritten:]
+        return records
+
+    def close(self):
+        self.header = self.records = None
+        self.shm.close()
+        if self.owner:
+            self.shm.unlink()
+
+
+class SharedFrame:
+    def __init__(self, name: Optional[str] = None, shape: Optional[tuple] = None):
+        """
+        An LED frame in shared memory, written by one process and read by another.
+
+        Writes are guarded by a sequence counter, which is odd while a write is in progress.
+        A reader copies the frame and retries if the counter changed or was odd, so it never
+        sees a torn frame, and the writer never waits for the reader.
+
+        Args:
+            name (str, optional): The name of an existing frame to attach to. If None, a new frame is created.
+            shape (tuple, optional): The shape of a new frame.
+        """
+        if name is None:
+            size = SHARED_HEADER_SIZE + int(np.prod(shape))
+            self.shm = shared_memory.SharedMemory(create=True, size=size)
+            self.owner = True
+        else:
+            self.shm = shared_memory.SharedMemory(name=name)
+            self.owner = False
+        self.header = np.ndarray((3,), dtype=np.uint64, buffer=self.shm.buf)
+        if self.owner:
+            self.header[:] = (0, *shape)
+        self.shape = (int(self.header[1]), int(self.header[2]))
+        self.frame = np.ndarray(self.shape, dtype=np.uint8, buffer=self.shm.buf, offset=SHARED_HEADER_SIZE)
+
+    @property
+    def name(self) -> str:
+        return self.shm.name
+
+    @property
+    def generation(self) -> int:
+        return int(self.header[0]) // 2
+
+    def write(self, frame: np.ndarray):
+        sequence = int(self.header[0])
+        self.header[0] = sequence + 1
+        self.frame[:] = frame
+        self.header[0] = sequence + 2
+
+    def read(self, out: np.ndarray) -> int:
+        """
+        Copy a consistent frame into `out`.
+
+        Returns:
+            int: The generation of the frame.
+        """
+        while True:
+            sequence = int(self.header[0])
+            if sequence % 2 == 0:
+                out[:] = self.frame
+                if int(self.header[0]) == sequence:
+                    return sequence // 2
+            time.sleep(0)
+
+    def close(self):
+        self.header = self.frame = None
+        self.shm.close()
+        if self.owner:
+            self.shm.unlink()
+
+
+def _run_worker(device_class: type,
+                device_kwargs: dict,
+                setup: Optional[Callable],
+                refresh_rate: float,
+                events_name: str,
+                connection,
+                stop_event):
+    try:
+        device = device_class(**device_kwargs)
+        events = SharedEventRing(name=events_name)
+        connection.send(device.frame.shape)
+        shared_frame = SharedFrame(name=connection.recv())
+
+        #--------------------------------------------------------------------------------
+        # Raw input events are forwarded from the device's dispatcher, ahead of its own
+        # handlers, so that they reach the parent regardless of the device class and its
+        # pages, even if a handler in the child raises an exception.
+        #--------------------------------------------------------------------------------
+        prefix = device.prefix
+        device.dispatcher.map(f"/{prefix}/grid/key",
+                              lambda address, x, y, down: events.record(EVENT_TYPE_GRID_KEY, x, y, down),
+                              first=True)
+        device.dispatcher.map(f"/{prefix}/enc/delta",
+                              lambda address, ring, delta: events.record(EVENT_TYPE_ENC_DELTA, ring, delta),
+                              first=True)
+        device.dispatcher.map(f"/{prefix}/enc/key",
+                              lambda address, key, down: events.record(EVENT_TYPE_ENC_KEY, key, down),
+                              first=True)
+
+        if setup is not None:
+            setup(device)
+    except Exception as e:
+        connection.send(e)
+        return
+    connection.send(None)
+
+    frame = np.zeros(shared_frame.shape, dtype=np.uint8)
+    generation = 0
+    while not stop_event.wait(1.0 / refresh_rate):
+        if shared_frame.generation == generation:
+            continue
+        generation = shared_frame.read(frame)
+        with device.batch():
+            device.frame[:] = frame
+
+    events.close()
+    shared_frame.close()
+
+
+class DeviceWorker:
+    def __init__(self,
+                 device_class: type,
+                 setup: Optional[Callable] = None,
+                 refresh_rate: float = DEFAULT_WORKER_REFRESH_RATE,
+                 event_capacity: int = DEFAULT_WORKER_EVENT_CAPACITY,
+                 **device_kwargs):
+        """
+        Runs a device's I/O, page state and rendering in a dedicated child process, so that
+        its responsiveness does not depend on the load of the main process.
+
+        Input events are passed to the parent through a shared-memory ring buffer, and are
+        delivered to handlers on a background thread, or can be read in bulk with read_events().
+        LED frames written with set_frame() are passed to the child through shared memory,
+        and the child sends the regions that have changed, at up to `refresh_rate` frames
+        per second.
+
+        The LEDs are drawn by one side only. Until the parent first calls set_frame(), the
+        child owns the frame, and it is drawn by the device and any pages added by `setup`.
+        From then on, the parent owns it: each frame replaces the whole of the device's
+        frame, overwriting anything drawn in the child.
+
+        The child is started with the "spawn" method, so `device_class` and `setup` must be
+        importable by name, and the main script must be guarded by `if __name__ == "__main__"`.
+
+        Example:
+            def setup(gridui):
+                gridui.add_page("faders")
+
+            worker = DeviceWorker(GridUI, setup=setup)
+
+        Args:
+            device_class (type): The class of device to create in the child: Grid, GridUI, Arc or ArcUI.
+            setup (Callable, optional): A function called in the child with the device,
+                                        for example to add pages. Defaults to None.
+            refresh_rate (float, optional): The maximum rate at which frames are sent. Defaults to 60.
+            event_capacity (int, optional): The capacity of the event ring buffer. Defaults to 4096.
+            **device_kwargs: Arguments passed to `device_class`.
+        """
+        self.handlers: list[Callable] = []
+        self.events = SharedEventRing(capacity=event_capacity)
+
+        context = multiprocessing.get_context("spawn")
+        self._stop_event = context.Event()
+        connection, child_connection = context.Pipe()
+        self.process = context.Process(target=_run_worker,
+                                       args=(device_class, device_kwargs, setup, refresh_rate,
+                                             self.events.name, child_connection, self._stop_event),
+                                       daemon=True)
+        self.process.start()
+
+        try:
+            if not connection.poll(WORKER_STARTUP_TIMEOUT):
+                raise RuntimeError("DeviceWorker: Timed out waiting for device")
+            shape = connection.recv()
+            if isinstance(shape, Exception):
+                raise shape
+            self.shared_frame = SharedFrame(shape=shape)
+            connection.send(self.shared_frame.name)
+            error = connection.recv()
+            if error is not None:
+                self.shared_frame.close()
+                raise error
+        except Exception:
+            self.process.terminate()
+            self.events.close()
+            raise
+
+        self.frame = np.zeros(shape, dtype=np.uint8)
+        self._event_thread: Optional[threading.Thread] = None
+
+    #--------------------------------------------------------------------------------
+    # Output
+    #--------------------------------------------------------------------------------
+
+    def set_frame(self, frame: Optional[np.ndarray] = None):
+        """
+        Publish a frame of LED levels to the child. The child sends only the regions
+        that differ from the device. Once called, the parent owns the device's frame,
+        and anything drawn by pages in the child is overwritten.
+
+        Args:
+            frame (np.ndarray, optional): The levels, of the device's frame shape.
+                                          Defaults to the worker's `frame` array.
+        """
+        if frame is not None:
+            frame = np.asarray(frame, dtype=np.uint8)
+            if frame.shape != self.frame.shape:
+                raise ValueError("set_frame: frame must have shape %s" % (self.frame.shape,))
+            self.frame[:] = frame
+        self.shared_frame.write(self.frame)
+
+    #--------------------------------------------------------------------------------
+    # Input
+    #--------------------------------------------------------------------------------
+
+    def read_events(self) -> np.ndarray:
+        """
+        Returns the input events received since the previous read, as a structured array
+        of EVENT_RECORD_DTYPE. Cannot be used while handlers are registered.
+        """
+        if self.handlers:
+            raise RuntimeError("read_events() cannot be used while handlers are registered")
+        return self.events.read()
+
+    def add_handler(self, handler: Callable):
+        """
+        Add a handler to receive GridKeyEvent, ArcRotationEvent and ArcKeyEvent objects,
+        on a background thread of the parent process.
+
+        Args:
+            handler (Callable): A function that is called when an event is received.
+        """
+        self.handlers.append(handler)
+        if self._event_thread is None:
+            self._event_thread = threading.Thread(target=self._run_events, daemon=True)
+            self._event_thread.start()
+
+    def handler(self, handler: Callable):
+        """
+        Used for the @worker.handler decorator.
+        """
+        self.add_handler(handler)
+
+    def _run_events(self):
+        from .grid.event import GridKeyEvent
+        from .arc.event import ArcRotationEvent, ArcKeyEvent
+
+        while not self._stop_event.is_set():
+            records = self.events.read()
+            for record in records.tolist():
+                timestamp, event_type, _, a, b, c = record
+                if event_type == EVENT_TYPE_GRID_KEY:
+                    event = GridKeyEvent(a, b, c, time_ns=timestamp)
+                elif event_type == EVENT_TYPE_ENC_DELTA:
+                    event = ArcRotationEvent(a, b, time_ns=timestamp)
+                else:
+                    event = ArcKeyEvent(a, b, time_ns=timestamp)
+                for handler in self.handlers:
+                    handler(event)
+            if len(records) == 0:
+                time.sleep(WORKER_EVENT_POLL_INTERVAL)
+
+    #--------------------------------------------------------------------------------
+    # Lifecycle
+    #--------------------------------------------------------------------------------
+
+    def close(self):
+        """
+        Stop the child process and release shared memory.
+        """
+        self._stop_event.set()
+        self.process.join()
+        if self._event_thread is not None:
+            self._event_thread.join()
+        self.events.close()
+        self.shared_frame.close()